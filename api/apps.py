@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from django.contrib.auth.models import User
+        from rest_framework.authtoken.models import Token
+
+        from api.authentication import (forget_token, forget_user_tokens,
+                                        render_metrics)
+        from taskmaster import metrics
+        post_delete.connect(forget_token, sender=Token,
+                            dispatch_uid='api_forget_token')
+        post_save.connect(forget_user_tokens, sender=User,
+                          dispatch_uid='api_forget_user_tokens')
+        metrics.collectors.append(render_metrics)
@@ -0,0 +1,283 @@
+"""
+This module contains the asynchronous task endpoints of the API.
+They serve the same representations as the TaskViewSet with Django
+asynchronous views. Django 5.0 runs the queries of its asynchronous
+ORM through sync_to_async, in one thread per process, so the views
+still wait for that thread to query the database. What they gain
+under ASGI is that the rest of a request, such as the token cache
+lookups and sending the response to a slow client, runs on the event
+loop without taking a thread. Requests are authenticated with
+the tokens of the API, looked up in the token cache first.
+"""
+
+import functools
+import json
+import math
+from http import HTTPStatus
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from rest_framework.authtoken.models import Token
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from api.authentication import tokens
+from api.pagination import TaskCursorPagination
+from api.serializers import TaskReadSerializer, TaskSerializer
+from api.views import PreconditionFailed, if_match_fails, make_etag
+from tasks.models import Task
+from tasks.pagination import (ORDERINGS, RELEVANCE, InvalidCursor,
+                              KeysetPaginator)
+from tasks.search import get_search_backend
+
+
+async def authenticate(request):
+    """
+    Return the active user of the token of the Authorization header,
+    or None.
+    """
+    keyword, _, key = request.headers.get('Authorization', '').partition(
+        ' ')
+    key = key.strip()
+    if keyword != 'Token' or not key:
+        return None
+    token = await tokens.aget(key)
+    if token is not None:
+        return token.user
+    try:
+        token = await Token.objects.select_related('user').aget(key=key)
+    except Token.DoesNotExist:
+        return None
+    if not token.user.is_active:
+        return None
+    await tokens.aset(token)
+    return token.user
+
+
+def token_required(view):
+    """
+    Decorator of asynchronous views responding with 401
+    to the requests without a valid token.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await authenticate(request)
+        if request.user is None:
+            response = error_response(
+                'Authentication credentials were not provided or are'
+                ' invalid.', HTTPStatus.UNAUTHORIZED)
+            response['WWW-Authenticate'] = 'Token'
+            return response
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def error_response(detail, status):
+    return JsonResponse({'detail': detail}, status=status)
+
+
+def parse_json(request):
+    """
+    Return the JSON object of the request body, or None.
+    """
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def get_page_size(request):
+    param = TaskCursorPagination.page_size_query_param
+    try:
+        page_size = int(request.GET[param])
+    except (KeyError, ValueError):
+        return TaskCursorPagination.page_size
+    if page_size <= 0:
+        return TaskCursorPagination.page_size
+    return min(page_size, TaskCursorPagination.max_page_size)
+
+
+def task_data(task):
+    return TaskReadSerializer(TaskReadSerializer.get_row(task)).data
+
+
+async def get_list_etag(request):
+    """
+    Asynchronous version of `TaskViewSet.get_list_etag()`,
+    returning the same ETag for the same list.
+    """
+    user_id = request.user.pk
+    aggregate = await Task.objects.filter(author_id=user_id).aaggregate(
+        Max('updated_at'), Count('id'))
+    last_update, count = aggregate.values()
+    return make_etag(user_id, last_update, count, sorted(request.GET.lists()))
+
+
+async def get_numbered_page(request, queryset):
+    """
+    Return the data of the page of the `page` query parameter,
+    numbered like the TaskPagination of the TaskViewSet, or None
+    if there is no such page.
+    """
+    page_size = get_page_size(request)
+    count = await queryset.acount()
+    page_count = max(math.ceil(count / page_size), 1)
+    number = request.GET.get('page', '1')
+    number = page_count if number == 'last' else number
+    try:
+        number = int(number)
+    except ValueError:
+        return None
+    if not 1 <= number <= page_count:
+        return None
+    start = (number - 1) * page_size
+    rows = [row async for row in queryset[start:start + page_size]]
+    url = request.build_absolute_uri()
+    next_url = previous = None
+    if number < page_count:
+        next_url = replace_query_param(url, 'page', number + 1)
+    if number == 2:
+        previous = remove_query_param(url, 'page')
+    elif number > 2:
+        previous = replace_query_param(url, 'page', number - 1)
+    return {
+        'count': count,
+        'next': next_url,
+        'previous': previous,
+        'results': TaskReadSerializer(rows, many=True).data,
+    }
+
+
+async def get_cursor_page(request, queryset, ordering):
+    """
+    Return the data of the page next to the `cursor` query parameter,
+    paginated with cursors like the TaskViewSet.
+    """
+    paginator = KeysetPaginator(queryset, ordering, get_page_size(request))
+    page = await paginator.apage(request.GET.get('cursor'))
+    url = request.build_absolute_uri()
+    return {
+        'next': page.next_cursor and replace_query_param(
+            url, 'cursor', page.next_cursor),
+        'previous': page.previous_cursor and replace_query_param(
+            url, 'cursor', page.previous_cursor),
+        'results': TaskReadSerializer(page.object_list, many=True).data,
+    }
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+@token_required
+async def task_list(request):
+    """
+    List the tasks of the user, or create a task.
+    Like the TaskViewSet, the list is filtered by the `search` query
+    parameter, ordered by the `ordering` query parameter and paginated
+    with cursors, or ordered by relevance and paginated with page numbers
+    when searching without an ordering, and returned with an ETag.
+    """
+    if request.method == 'POST':
+        return await create_task(request)
+    etag = await get_list_etag(request)
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        response['ETag'] = etag
+        return response
+    queryset = Task.objects.filter(author=request.user)
+    search_query = request.GET.get('search')
+    if search_query:
+        queryset = get_search_backend().search(queryset, search_query)
+    queryset = queryset.values(*TaskReadSerializer.fields)
+    ordering = request.GET.get('ordering')
+    if ordering not in ORDERINGS:
+        ordering = RELEVANCE if search_query else '-created_at'
+    if ordering == RELEVANCE:
+        data = await get_numbered_page(request, queryset)
+        if data is None:
+            return error_response('Invalid page.', HTTPStatus.NOT_FOUND)
+    else:
+        try:
+            data = await get_cursor_page(request, queryset, ordering)
+        except InvalidCursor as error:
+            return error_response(str(error), HTTPStatus.NOT_FOUND)
+    response = JsonResponse(data)
+    response['ETag'] = etag
+    return response
+
+
+async def create_task(request):
+    data = parse_json(request)
+    if data is None:
+        return error_response('Invalid JSON object.', HTTPStatus.BAD_REQUEST)
+    serializer = TaskSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=HTTPStatus.BAD_REQUEST)
+    task = await Task.objects.acreate(author=request.user,
+                                      **serializer.validated_data)
+    return JsonResponse(task_data(task), status=HTTPStatus.CREATED)
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'PUT', 'PATCH', 'DELETE'])
+@token_required
+async def task_detail(request, pk):
+    """
+    Return, update or delete a task of the user.
+    Like the TaskViewSet, the responses have an ETag, and updates
+    and deletions are refused with 412 if the If-Match header does not
+    match the ETag of the task.
+    """
+    if request.method != 'GET':
+        return await sync_to_async(change_task)(request, pk)
+    try:
+        task = await Task.objects.filter(author=request.user).only(
+            *TaskSerializer.Meta.fields).aget(pk=pk)
+    except Task.DoesNotExist:
+        return error_response('Not found.', HTTPStatus.NOT_FOUND)
+    etag = make_etag(task.pk, task.updated_at)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(task_data(task))
+    response['ETag'] = etag
+    return response
+
+
+def change_task(request, pk):
+    """
+    Update or delete a task of the user, in a transaction locking
+    the task from the check of the If-Match header to the write,
+    so another request cannot change it in between.
+    """
+    with transaction.atomic():
+        try:
+            task = Task.objects.select_for_update().filter(
+                author=request.user).only(
+                *TaskSerializer.Meta.fields).get(pk=pk)
+        except Task.DoesNotExist:
+            return error_response('Not found.', HTTPStatus.NOT_FOUND)
+        if if_match_fails(request, make_etag(task.pk, task.updated_at)):
+            return error_response(PreconditionFailed.default_detail,
+                                  HTTPStatus.PRECONDITION_FAILED)
+        if request.method == 'DELETE':
+            task.delete()
+            return HttpResponse(status=HTTPStatus.NO_CONTENT)
+        data = parse_json(request)
+        if data is None:
+            return error_response('Invalid JSON object.',
+                                  HTTPStatus.BAD_REQUEST)
+        serializer = TaskSerializer(task, data=data,
+                                    partial=request.method == 'PATCH')
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors,
+                                status=HTTPStatus.BAD_REQUEST)
+        for field, value in serializer.validated_data.items():
+            setattr(task, field, value)
+        task.save()
+    response = JsonResponse(task_data(task))
+    response['ETag'] = make_etag(task.pk, task.updated_at)
+    return response
@@ -0,0 +1,143 @@
+"""
+This module contains the cached token authentication of the API.
+The users of the tokens are cached in the process memory, and also in
+the Django cache named by the API_TOKEN_CACHE setting if it is set,
+so authenticating a request does not query the database.
+A token is removed from the caches when it is deleted, as on logout,
+and the tokens of a user when the user is saved, as on deactivation.
+Other processes forget them when they expire from their memory,
+after API_TOKEN_CACHE_TTL seconds.
+"""
+
+import copy
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from taskmaster.lru import LRUCache
+from taskmaster.metrics import render_counter
+
+TOKEN_CACHE_SIZE = 100000
+
+
+class TokenCache:
+    """
+    Two-level cache of the tokens with their users, by token key.
+    The cached instances are copied when they are returned,
+    so a request changing its user does not change the cache.
+    """
+    def __init__(self, maxsize=TOKEN_CACHE_SIZE, ttl=None):
+        self.local = LRUCache(maxsize=maxsize,
+                              ttl=ttl or settings.API_TOKEN_CACHE_TTL)
+
+    @property
+    def shared(self):
+        alias = settings.API_TOKEN_CACHE
+        return caches[alias] if alias else None
+
+    @staticmethod
+    def make_key(key):
+        # The keys of the shared cache may be visible to other services.
+        return 'token:' + hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Return the token of the key with its user, or None.
+        """
+        token = self.local.get(key)
+        if token is None and self.shared is not None:
+            token = self.shared.get(self.make_key(key))
+            if token is not None:
+                self.local.set(key, token)
+        return self.copy(token)
+
+    async def aget(self, key):
+        """
+        Asynchronous version of `get()`.
+        """
+        token = self.local.get(key)
+        if token is None and self.shared is not None:
+            token = await self.shared.aget(self.make_key(key))
+            if token is not None:
+                self.local.set(key, token)
+        return self.copy(token)
+
+    def set(self, token):
+        self.local.set(token.key, token)
+        if self.shared is not None:
+            self.shared.set(self.make_key(token.key), token,
+                            settings.API_TOKEN_CACHE_TTL)
+
+    async def aset(self, token):
+        self.local.set(token.key, token)
+        if self.shared is not None:
+            await self.shared.aset(self.make_key(token.key), token,
+                                   settings.API_TOKEN_CACHE_TTL)
+
+    def delete(self, key):
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(self.make_key(key))
+
+    def clear(self):
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    @staticmethod
+    def copy(token):
+        if token is None:
+            return None
+        token = copy.copy(token)
+        token.user = copy.copy(token.user)
+        return token
+
+
+tokens = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication looking up the tokens in the token cache
+    before the database.
+    """
+    def authenticate_credentials(self, key):
+        token = tokens.get(key)
+        if token is not None:
+            return token.user, token
+        user, token = super().authenticate_credentials(key)
+        tokens.set(token)
+        return user, token
+
+
+def forget_token(sender, instance, **kwargs):
+    """
+    Remove a deleted token from the cache.
+    """
+    tokens.delete(instance.key)
+
+
+def forget_user_tokens(sender, instance, **kwargs):
+    """
+    Remove the tokens of a saved user from the cache, so a deactivated
+    user is refused and the others get their current data.
+    """
+    for key in Token.objects.filter(user_id=instance.pk).values_list(
+            'key', flat=True):
+        tokens.delete(key)
+
+
+def render_metrics():
+    """
+    Return the hits and misses of the token cache of the process
+    in the Prometheus format.
+    """
+    return [
+        *render_counter('taskmaster_token_cache_hits_total',
+                        'Token cache hits.', tokens.local.hits),
+        *render_counter('taskmaster_token_cache_misses_total',
+                        'Token cache misses.', tokens.local.misses),
+    ]
@@ -1,7 +1,71 @@
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from tasks.pagination import InvalidCursor, KeysetPaginator
 
 
 class TaskPagination(pagination.PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 1000
+
+
+class TaskCursorPagination(pagination.BasePagination):
+    """
+    Keyset pagination of tasks in the order returned by
+    the `get_ordering` method of the view.
+    The response contains links to the next and previous pages
+    instead of the page count.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = remove_query_param(request.build_absolute_uri(),
+                                           'page')
+        paginator = KeysetPaginator(queryset, view.get_ordering(),
+                                    self.get_page_size(request))
+        try:
+            self.page = paginator.page(
+                request.query_params.get(self.cursor_query_param))
+        except InvalidCursor as error:
+            raise NotFound(str(error))
+        return self.page.object_list
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param,
+                                   cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_link(self.page.next_cursor),
+            'previous': self.get_link(self.page.previous_cursor),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True,
+                         'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True,
+                             'format': 'uri'},
+                'results': schema,
+            },
+        }
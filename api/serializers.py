@@ -1,14 +1,23 @@
 """
 This module contains serializers for the 'tasks' application.
-It includes serializers for the User and Task models.
+It includes serializers for the User and Task models
+and a fast read-only serializer of tasks.
 """
 
-from rest_framework import serializers
+import datetime
+
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework import serializers
 
 from tasks.models import Task
 
 
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+BULK_MAX_OPERATIONS = 1000
+
+
 class UserSerializer(serializers.ModelSerializer):
     """
     Serializer for the User model.
@@ -23,11 +32,88 @@ class TaskSerializer(serializers.ModelSerializer):
     """
     Serializer for the Task model.
     """
-    created_at = serializers.DateTimeField(format='%Y-%m-%d %H:%M:%S')
-    updated_at = serializers.DateTimeField(format='%Y-%m-%d %H:%M:%S')
+    created_at = serializers.DateTimeField(format=DATETIME_FORMAT,
+                                           read_only=True)
+    updated_at = serializers.DateTimeField(format=DATETIME_FORMAT,
+                                           read_only=True)
+    due_at = serializers.DateTimeField(format=DATETIME_FORMAT,
+                                       required=False, allow_null=True)
 
     class Meta:
         model = Task
         fields = ['id', 'title', 'created_at', 'updated_at', 'description',
-                  'completed', 'author']
+                  'completed', 'due_at', 'author']
         read_only_fields = ['author']
+
+
+class TaskBulkSerializer(serializers.Serializer):
+    """
+    Serializer of a batch of task operations: tasks to create,
+    partial updates of tasks identified by their `id`,
+    and ids of tasks to delete.
+    """
+    create = serializers.ListField(child=serializers.DictField(),
+                                   required=False, default=list)
+    update = serializers.ListField(child=serializers.DictField(),
+                                   required=False, default=list)
+    delete = serializers.ListField(child=serializers.IntegerField(),
+                                   required=False, default=list)
+
+    def validate(self, attrs):
+        count = sum(len(items) for items in attrs.values())
+        if count > BULK_MAX_OPERATIONS:
+            raise serializers.ValidationError(
+                f'A batch may contain at most {BULK_MAX_OPERATIONS}'
+                f' operations.')
+        return attrs
+
+
+def format_datetime(value, field_timezone):
+    """
+    Format the datetime like DRF DateTimeField with DATETIME_FORMAT does:
+    aware values are converted to the timezone, naive ones made aware.
+    """
+    if not value:
+        return None
+    if field_timezone is not None:
+        if value.tzinfo is not None:
+            value = value.astimezone(field_timezone)
+        else:
+            value = timezone.make_aware(value, field_timezone)
+    elif value.tzinfo is not None:
+        value = timezone.make_naive(value, datetime.timezone.utc)
+    # Same text as value.strftime(DATETIME_FORMAT), but faster.
+    return value.isoformat(' ', 'seconds')[:19]
+
+
+class TaskReadSerializer:
+    """
+    Read-only serializer producing the same representation
+    as TaskSerializer from the rows of `QuerySet.values(*fields)`.
+    It skips the field-by-field machinery of DRF serializers
+    and is used by the list and retrieve actions.
+    """
+    fields = TaskSerializer.Meta.fields
+    datetime_fields = ['created_at', 'updated_at', 'due_at']
+
+    def __init__(self, rows, many=False):
+        self.rows = rows
+        self.many = many
+
+    @classmethod
+    def get_row(cls, task):
+        """
+        Return the row of a Task instance.
+        """
+        return {name: task.serializable_value(name) for name in cls.fields}
+
+    @property
+    def data(self):
+        field_timezone = (timezone.get_current_timezone()
+                          if settings.USE_TZ else None)
+        rows = self.rows if self.many else [self.rows]
+        data = [{name: row[name] for name in self.fields} for row in rows]
+        for name in self.datetime_fields:
+            for item in data:
+                item[name] = format_datetime(item[name], field_timezone)
+        return data if self.many else data[0]
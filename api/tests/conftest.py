@@ -0,0 +1,27 @@
+"""
+This module contains pytest fixtures for the 'api' application.
+"""
+
+import pytest
+from rest_framework.test import APIClient
+
+from api.authentication import tokens
+
+
+@pytest.fixture(autouse=True)
+def clear_tokens():
+    """
+    Pytest fixture emptying the token cache after each test.
+    """
+    yield
+    tokens.clear()
+
+
+@pytest.fixture
+def api_client(author):
+    """
+    Pytest fixture for creating an API client authenticated as the author.
+    """
+    client = APIClient()
+    client.force_authenticate(author)
+    return client
@@ -0,0 +1,165 @@
+"""
+This module contains tests for the asynchronous task endpoints of the API.
+"""
+
+import base64
+import json
+from http import HTTPStatus
+from urllib.parse import urlencode
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from tasks.models import DeletedTask, Task
+
+LIST_URL = reverse('api:async-task-list')
+
+
+def detail_url(task_id):
+    return reverse('api:async-task-detail', args=[task_id])
+
+
+@pytest.fixture
+def async_client(author):
+    """
+    Pytest fixture for calling the asynchronous views
+    with the token of the author.
+    """
+    token = Token.objects.create(user=author)
+    client = AsyncClient()
+
+    def request(method, url, data=None, headers=None, **extra):
+        if data is not None:
+            extra.update(data=json.dumps(data),
+                         content_type='application/json')
+        headers = {'Authorization': f'Token {token.key}', **(headers or {})}
+        return async_to_sync(getattr(client, method))(
+            url, headers=headers, **extra)
+
+    return request
+
+
+def test_requests_without_token_are_unauthorized(db):
+    """
+    Test that the asynchronous views require a token.
+    """
+    response = async_to_sync(AsyncClient().get)(
+        LIST_URL, headers={'Authorization': 'Token invalid'})
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert response['WWW-Authenticate'] == 'Token'
+
+
+def test_list_is_paginated_like_the_viewset(async_client, api_client, author,
+                                            django_user_model):
+    """
+    Test that the list contains the tasks of the user only,
+    paginated with cursors, like the list of the TaskViewSet.
+    """
+    Task.objects.bulk_create([Task(title=f'Task {number}', author=author)
+                              for number in range(3)])
+    Task.objects.create(
+        title='Other task',
+        author=django_user_model.objects.create(username='other'))
+
+    first_page = async_client('get', f'{LIST_URL}?page_size=2')
+    data = first_page.json()
+    second_page = async_client('get', data['next'])
+
+    assert data['results'] == api_client.get(
+        reverse('api:task-list'), {'page_size': 2}).data['results']
+    assert len(second_page.json()['results']) == 1
+    assert second_page.json()['next'] is None
+    for cursor in [b'invalid', b'[null, 1, false]',
+                   b'["2024-01-01", Infinity, false]']:
+        cursor = base64.urlsafe_b64encode(cursor).decode()
+        response = async_client('get', f'{LIST_URL}?cursor={cursor}')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize('params', [
+    {'search': 'report', 'page_size': 2},
+    {'search': 'report', 'page_size': 2, 'page': 2},
+    {'search': 'report', 'ordering': 'title'},
+    {'ordering': '-updated_at'},
+])
+def test_list_is_searched_like_the_viewset(async_client, api_client, author,
+                                           params):
+    """
+    Test that the list is searched, ordered and paginated
+    like the list of the TaskViewSet, with the same ETag.
+    """
+    Task.objects.bulk_create(
+        [Task(title=f'Report {number}', author=author)
+         for number in range(3)]
+        + [Task(title='Shopping', description='Weekly report', author=author),
+           Task(title='Call', author=author)])
+    query = urlencode(params)
+
+    response = async_client('get', f'{LIST_URL}?{query}')
+    url = reverse('api:task-list')
+    expected = api_client.get(url, params)
+    not_modified = async_client('get', f'{LIST_URL}?{query}',
+                                headers={'If-None-Match': response['ETag']})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == json.loads(
+        json.dumps(expected.data).replace(url, LIST_URL))
+    assert response['ETag'] == expected['ETag']
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_create_update_and_delete(async_client, author):
+    """
+    Test that a task is created, updated with If-Match and deleted
+    through the asynchronous views.
+    """
+    response = async_client('post', LIST_URL, {'title': 'New task'})
+    assert response.status_code == HTTPStatus.CREATED
+    task_id = response.json()['id']
+    assert async_client('post', LIST_URL, {'title': ''}).status_code == (
+        HTTPStatus.BAD_REQUEST)
+
+    etag = async_client('get', detail_url(task_id))['ETag']
+    assert async_client('get', detail_url(task_id),
+                        headers={'If-None-Match': etag}).status_code == (
+        HTTPStatus.NOT_MODIFIED)
+    response = async_client('patch', detail_url(task_id), {'completed': True},
+                            headers={'If-Match': etag})
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['completed'] is True
+    response = async_client('patch', detail_url(task_id), {'title': 'Late'},
+                            headers={'If-Match': etag})
+    assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+
+    response = async_client('delete', detail_url(task_id))
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    assert not Task.objects.exists()
+    assert DeletedTask.objects.get().task_id == task_id
+    assert async_client('get', detail_url(task_id)).status_code == (
+        HTTPStatus.NOT_FOUND)
+
+
+def test_tokens_are_cached(async_client, author):
+    """
+    Test that the token is read from the database by the first request
+    only, and refused once deleted.
+    """
+    with CaptureQueriesContext(connection) as first:
+        async_client('get', LIST_URL)
+    with CaptureQueriesContext(connection) as second:
+        response = async_client('get', LIST_URL)
+    Token.objects.filter(user=author).delete()
+
+    assert response.status_code == HTTPStatus.OK
+    assert len([query for query in first.captured_queries
+                if 'authtoken_token' in query['sql']]) == 1
+    assert not [query for query in second.captured_queries
+                if 'authtoken_token' in query['sql']]
+    assert async_client('get', LIST_URL).status_code == (
+        HTTPStatus.UNAUTHORIZED)
@@ -0,0 +1,98 @@
+"""
+This module contains tests for the cached token authentication of the API.
+"""
+
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.authentication import tokens
+
+LIST_URL = reverse('api:task-list')
+
+
+@pytest.fixture
+def token(author):
+    return Token.objects.create(user=author)
+
+
+@pytest.fixture
+def token_client(token):
+    """
+    Pytest fixture for an API client sending the token of the author.
+    """
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    return client
+
+
+def get_token_queries(client):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(LIST_URL)
+    assert response.status_code == HTTPStatus.OK
+    return [query['sql'] for query in queries
+            if 'authtoken_token' in query['sql']]
+
+
+def test_token_is_looked_up_once(token_client):
+    """
+    Test that the token is read from the database by the first request
+    only.
+    """
+    assert len(get_token_queries(token_client)) == 1
+    assert get_token_queries(token_client) == []
+
+
+def test_token_is_shared_through_cache(token_client, settings):
+    """
+    Test that a token cached in the shared cache is used
+    by the processes which have not cached it in their memory.
+    """
+    settings.API_TOKEN_CACHE = 'default'
+    get_token_queries(token_client)
+    tokens.local.clear()
+
+    assert get_token_queries(token_client) == []
+
+
+def test_logout_forgets_token(token_client):
+    """
+    Test that a token deleted by the logout of djoser is refused.
+    """
+    get_token_queries(token_client)
+
+    response = token_client.post(reverse('api:logout'))
+
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    assert token_client.get(LIST_URL).status_code == (
+        HTTPStatus.UNAUTHORIZED)
+
+
+def test_deactivated_user_is_refused(token_client, author):
+    """
+    Test that the token of a deactivated user is refused.
+    """
+    get_token_queries(token_client)
+
+    author.is_active = False
+    author.save()
+
+    assert token_client.get(LIST_URL).status_code == (
+        HTTPStatus.UNAUTHORIZED)
+
+
+def test_cached_user_is_not_shared_between_requests(token_client, token):
+    """
+    Test that the requests get their own copies of the cached user.
+    """
+    get_token_queries(token_client)
+
+    first, second = tokens.get(token.key), tokens.get(token.key)
+
+    assert first.user == second.user
+    assert first.user is not second.user
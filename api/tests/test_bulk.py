@@ -0,0 +1,110 @@
+"""
+This module contains tests for the bulk task operations of the API.
+"""
+
+from http import HTTPStatus
+
+from django.urls import reverse
+
+from api.serializers import TaskSerializer
+from tasks.models import Task
+
+URL = reverse('api:task-bulk')
+
+
+def test_bulk_operations(api_client, author, django_user_model,
+                         django_assert_max_num_queries):
+    """
+    Test that tasks are created, updated and deleted in one request,
+    with a result for every operation.
+    """
+    tasks = Task.objects.bulk_create(
+        [Task(title=f'Task {number}', author=author) for number in range(3)])
+    other_task = Task.objects.create(
+        title='Other task',
+        author=django_user_model.objects.create(username='other'))
+    data = {
+        'create': [{'title': 'New task', 'description': 'New'},
+                   {'title': 'x' * 201}],
+        'update': [{'id': tasks[0].pk, 'completed': True},
+                   {'id': other_task.pk, 'completed': True},
+                   {'id': tasks[1].pk, 'title': ''}],
+        'delete': [tasks[2].pk, other_task.pk],
+    }
+
+    with django_assert_max_num_queries(10):
+        response = api_client.post(URL, data, format='json')
+
+    results = response.data
+    assert response.status_code == HTTPStatus.OK
+    assert [result['status'] for result in results['create']] == [201, 400]
+    assert results['create'][0]['data']['title'] == 'New task'
+    assert 'title' in results['create'][1]['errors']
+    assert [result['status'] for result in results['update']] == [
+        200, 404, 400]
+    assert results['update'][0]['data']['completed'] is True
+    assert [result['status'] for result in results['delete']] == [204, 404]
+    assert set(Task.objects.filter(author=author).values_list(
+        'title', 'completed')) == {('Task 0', True), ('Task 1', False),
+                                   ('New task', False)}
+    assert Task.objects.filter(pk=other_task.pk, completed=False).exists()
+
+
+def test_bulk_update_changes_updated_at(api_client, task):
+    """
+    Test that bulk updates refresh the update time of the tasks.
+    """
+    updated_at = Task.objects.get(pk=task.pk).updated_at
+
+    api_client.post(URL, {'update': [{'id': task.pk, 'completed': True}]},
+                    format='json')
+
+    assert Task.objects.get(pk=task.pk).updated_at > updated_at
+
+
+def test_bulk_operations_are_limited(api_client, author):
+    """
+    Test that too large batches are rejected.
+    """
+    data = {'delete': list(range(1001))}
+
+    response = api_client.post(URL, data, format='json')
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_bulk_update_rejects_boolean_ids(api_client, task):
+    """
+    Test that true and false are not taken for the ids 1 and 0.
+    """
+    response = api_client.post(
+        URL, {'update': [{'id': True, 'completed': True},
+                         {'id': False, 'completed': True}]}, format='json')
+
+    assert [result['status'] for result in response.data['update']] == [
+        400, 400]
+    assert not Task.objects.filter(completed=True).exists()
+
+
+def test_bulk_validation_builds_fields_once(api_client, author, monkeypatch):
+    """
+    Test that the fields of the task serializer are built once
+    per kind of operation, not once per task.
+    """
+    tasks = Task.objects.bulk_create(
+        [Task(title=f'Task {number}', author=author) for number in range(5)])
+    calls = []
+    get_fields = TaskSerializer.get_fields
+    monkeypatch.setattr(TaskSerializer, 'get_fields',
+                        lambda self: calls.append(self) or get_fields(self))
+
+    response = api_client.post(URL, {
+        'create': [{'title': f'New {number}'} for number in range(5)],
+        'update': [{'id': task.pk, 'completed': True} for task in tasks],
+    }, format='json')
+
+    assert [result['status'] for result in response.data['create']] == [
+        201] * 5
+    assert [result['status'] for result in response.data['update']] == [
+        200] * 5
+    assert len(calls) == 2
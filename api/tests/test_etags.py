@@ -0,0 +1,147 @@
+"""
+This module contains tests for the ETags of the task endpoints of the API.
+"""
+
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from tasks.models import Task
+
+LIST_URL = reverse('api:task-list')
+
+
+def detail_url(task):
+    return reverse('api:task-detail', args=[task.pk])
+
+
+def test_unchanged_list_is_not_modified(api_client, task):
+    """
+    Test that the list is not sent again while the tasks are unchanged,
+    reading only the aggregate of the ETag.
+    """
+    etag = api_client.get(LIST_URL)['ETag']
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(LIST_URL, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response['ETag'] == etag
+    assert not response.content
+    task_queries = [query['sql'] for query in queries
+                    if 'tasks_task' in query['sql']]
+    assert len(task_queries) == 1
+    assert 'COUNT(' in task_queries[0]
+
+
+def test_list_etag_changes_with_tasks_and_parameters(api_client, author,
+                                                     task):
+    """
+    Test that the ETag of the list changes when a task is created,
+    updated or deleted, and with the query parameters.
+    """
+    etags = [api_client.get(LIST_URL)['ETag'],
+             api_client.get(LIST_URL, {'ordering': 'created_at'})['ETag']]
+    new_task = Task.objects.create(title='New', author=author)
+    etags.append(api_client.get(LIST_URL)['ETag'])
+    task.completed = True
+    task.save()
+    etags.append(api_client.get(LIST_URL)['ETag'])
+    new_task.delete()
+    etags.append(api_client.get(LIST_URL)['ETag'])
+
+    assert len(set(etags)) == len(etags)
+    response = api_client.get(LIST_URL, HTTP_IF_NONE_MATCH=etags[0])
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_unchanged_task_is_not_modified(api_client, task):
+    """
+    Test that a task is not sent again until it is updated.
+    """
+    etag = api_client.get(detail_url(task))['ETag']
+
+    response = api_client.get(detail_url(task), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    api_client.patch(detail_url(task), {'completed': True})
+    response = api_client.get(detail_url(task), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response.data['completed'] is True
+
+
+def test_update_with_if_match(api_client, task):
+    """
+    Test that a task is updated only if it has not changed
+    since the client got its ETag.
+    """
+    etag = api_client.get(detail_url(task))['ETag']
+
+    response = api_client.patch(detail_url(task), {'title': 'First'},
+                                HTTP_IF_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    new_etag = response['ETag']
+    assert new_etag == api_client.get(detail_url(task))['ETag']
+    response = api_client.put(
+        detail_url(task), {'title': 'Second', 'description': 'Second'},
+        HTTP_IF_MATCH=etag)
+    assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+    response = api_client.delete(detail_url(task), HTTP_IF_MATCH=etag)
+    assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+    task.refresh_from_db()
+    assert task.title == 'First'
+    response = api_client.delete(detail_url(task), HTTP_IF_MATCH=new_etag)
+    assert response.status_code == HTTPStatus.NO_CONTENT
+
+
+def test_list_etag_changes_without_signals(api_client, author, task):
+    """
+    Test that the ETag of the list changes with the tasks changed
+    without signals, as by other processes or bulk updates.
+    """
+    etag = api_client.get(LIST_URL)['ETag']
+
+    Task.objects.filter(pk=task.pk).update(completed=True,
+                                           updated_at=timezone.now())
+    response = api_client.get(LIST_URL, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+@pytest.mark.parametrize('url_name', ['api:task-detail',
+                                      'api:async-task-detail'])
+def test_if_match_with_compressed_responses(load_production_settings,
+                                            settings, author, url_name):
+    """
+    Test that the weak ETag of a response compressed by the production
+    middleware matches the task in the If-Match header.
+    """
+    production = load_production_settings(
+        DJANGO_SECRET_KEY='secret', DJANGO_ALLOWED_HOSTS='testserver',
+        BOT_WEBHOOK_SECRET='webhook-secret')
+    settings.MIDDLEWARE = production.MIDDLEWARE
+    task = Task.objects.create(title='Task', description='x' * 500,
+                               author=author)
+    token = Token.objects.create(user=author)
+    client = APIClient(HTTP_ACCEPT_ENCODING='gzip',
+                       HTTP_AUTHORIZATION=f'Token {token.key}')
+    url = reverse(url_name, args=[task.pk])
+
+    response = client.get(url)
+    etag = response['ETag']
+    assert response['Content-Encoding'] == 'gzip'
+    assert etag.startswith('W/')
+    response = client.patch(url, {'title': 'First'}, format='json',
+                            HTTP_IF_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    response = client.patch(url, {'title': 'Second'}, format='json',
+                            HTTP_IF_MATCH=etag)
+    assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+    task.refresh_from_db()
+    assert task.title == 'First'
@@ -0,0 +1,124 @@
+"""
+This module contains tests for the export of tasks in the API.
+"""
+
+import csv
+import json
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from tasks import export
+from tasks.models import Task
+
+
+def export_url(export_format):
+    return reverse('api:task-export', args=[export_format])
+
+
+@pytest.fixture
+def tasks(author, django_user_model):
+    """
+    Pytest fixture creating tasks of the author and of another user.
+    """
+    Task.objects.bulk_create(
+        [Task(title=f'Task {number}', description='Line 1\nLine "2"',
+              author=author) for number in range(5)])
+    Task.objects.create(
+        title='Other task',
+        author=django_user_model.objects.create(username='other'))
+    return list(Task.objects.filter(author=author).order_by(
+        '-created_at', '-id'))
+
+
+def read(response):
+    return b''.join(response.streaming_content).decode()
+
+
+def test_export_ndjson_streams_tasks_in_chunks(api_client, tasks,
+                                               monkeypatch,
+                                               django_assert_num_queries):
+    """
+    Test that the NDJSON export streams one line per task of the user,
+    reading the tasks from the database in chunks.
+    """
+    monkeypatch.setattr(export, 'EXPORT_CHUNK_SIZE', 2)
+
+    response = api_client.get(export_url('ndjson'))
+    with django_assert_num_queries(1):
+        lines = read(response).splitlines()
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.streaming
+    assert response['Content-Type'] == 'application/x-ndjson'
+    assert response['Content-Disposition'] == (
+        'attachment; filename="tasks.ndjson"')
+    rows = [json.loads(line) for line in lines]
+    assert [row['id'] for row in rows] == [task.pk for task in tasks]
+    assert rows[0] == {
+        'id': tasks[0].pk, 'title': tasks[0].title,
+        'description': 'Line 1\nLine "2"', 'completed': False,
+        'due_at': None,
+        'created_at': tasks[0].created_at.isoformat(),
+        'updated_at': tasks[0].updated_at.isoformat(),
+    }
+
+
+def test_export_json_and_csv(api_client, tasks):
+    """
+    Test that the JSON export is an array of the tasks
+    and the CSV export has a header and a row per task.
+    """
+    rows = json.loads(read(api_client.get(export_url('json'))))
+    csv_rows = list(csv.DictReader(
+        read(api_client.get(export_url('csv'))).splitlines(True)))
+
+    assert [row['title'] for row in rows] == [task.title for task in tasks]
+    assert [row['title'] for row in csv_rows] == [
+        task.title for task in tasks]
+    assert csv_rows[0]['description'] == 'Line 1\nLine "2"'
+
+
+def test_export_without_tasks(api_client, author):
+    """
+    Test that an export without tasks is still a valid file.
+    """
+    assert json.loads(read(api_client.get(export_url('json')))) == []
+    assert read(api_client.get(export_url('ndjson'))) == ''
+
+
+def test_export_requires_authentication(client, db):
+    """
+    Test that anonymous users cannot export tasks.
+    """
+    response = client.get(export_url('csv'))
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_export_streams_asynchronously_under_asgi(author, tasks,
+                                                  monkeypatch):
+    """
+    Test that under ASGI the export is streamed from an asynchronous
+    iterator, which Django does not read into a list.
+    """
+    monkeypatch.setattr(export, 'EXPORT_CHUNK_SIZE', 2)
+    token = Token.objects.create(user=author)
+
+    async def get_export():
+        response = await AsyncClient().get(
+            export_url('ndjson'), headers={
+                'Authorization': f'Token {token.key}'})
+        content = [line async for line in response.streaming_content]
+        return response, b''.join(content).decode()
+
+    response, content = async_to_sync(get_export)()
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.is_async
+    assert [json.loads(line)['id'] for line in content.splitlines()] == [
+        task.pk for task in tasks]
@@ -0,0 +1,113 @@
+"""
+This module contains tests for the import of tasks in the API.
+"""
+
+from http import HTTPStatus
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.cache import task_lists
+from tasks.models import Task
+
+
+def import_url(import_format):
+    return reverse('api:task-import', args=[import_format])
+
+
+def test_import_csv_body(api_client, author):
+    """
+    Test that the tasks of a CSV body are created for the user,
+    and that the invalid rows are reported with their line.
+    """
+    version = task_lists.get_version(author.pk)
+    body = ('title,description,completed\n'
+            'Shopping,"buy milk\nand bread",true\n'
+            ',no title,false\n'
+            f'{"x" * 201},too long,false\n'
+            'Cleaning,,maybe\n'
+            'Reading,,\n')
+
+    response = api_client.generic('POST', import_url('csv'), body,
+                                  content_type='text/csv')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.data['created'] == 2
+    assert response.data['error_count'] == 3
+    assert [(error['line'], list(error['errors']))
+            for error in response.data['errors']] == [
+        (4, ['title']), (5, ['title']), (6, ['completed'])]
+    assert list(Task.objects.filter(author=author).order_by('pk').values_list(
+        'title', 'description', 'completed')) == [
+        ('Shopping', 'buy milk\nand bread', True), ('Reading', '', False)]
+    assert task_lists.get_version(author.pk) != version
+
+
+def test_import_ndjson_upload(api_client, author):
+    """
+    Test that the tasks of an uploaded NDJSON file are created,
+    and that invalid lines are reported.
+    """
+    upload = SimpleUploadedFile('tasks.ndjson', (
+        b'{"title": "Shopping", "description": null, "completed": true}\n'
+        b'\n'
+        b'not json\n'
+        b'{"title": "Cleaning", "completed": 1}\n'
+        b'{"title": "Reading", "id": 5}\n'
+        b'{"title": "Writing", "due_at": "tomorrow"}\n'))
+
+    response = api_client.post(import_url('ndjson'), {'file': upload},
+                               format='multipart')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.data['created'] == 2
+    assert [error['line'] for error in response.data['errors']] == [3, 4, 6]
+    assert sorted(Task.objects.values_list('title', flat=True)) == [
+        'Reading', 'Shopping']
+
+
+def test_import_export_round_trip(api_client, author):
+    """
+    Test that an export of the tasks can be imported again.
+    """
+    due_at = timezone.now()
+    Task.objects.create(title='Shopping', description='buy, "milk"',
+                        completed=True, due_at=due_at, author=author)
+    export = b''.join(api_client.get(
+        reverse('api:task-export', args=['csv'])).streaming_content)
+
+    response = api_client.generic('POST', import_url('csv'), export,
+                                  content_type='text/csv')
+
+    assert response.data['created'] == 1
+    assert Task.objects.filter(title='Shopping', description='buy, "milk"',
+                               completed=True, due_at=due_at).count() == 2
+
+
+def test_imported_tasks_are_searchable(api_client, author):
+    """
+    Test that the imported tasks are added to the search index,
+    and that the tasks created afterwards are still indexed.
+    """
+    api_client.generic('POST', import_url('csv'),
+                       'title,description\nShopping,buy milk\n',
+                       content_type='text/csv')
+    Task.objects.create(title='Milk', author=author)
+
+    response = api_client.get(reverse('api:task-list'), {'search': 'milk'})
+
+    assert sorted(task['title'] for task in response.data['results']) == [
+        'Milk', 'Shopping']
+
+
+def test_import_without_title_column(api_client):
+    """
+    Test that a CSV file without a title column is refused.
+    """
+    response = api_client.generic('POST', import_url('csv'),
+                                  'name\nShopping\n',
+                                  content_type='text/csv')
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert not Task.objects.exists()
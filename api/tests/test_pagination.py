@@ -0,0 +1,96 @@
+"""
+This module contains tests for the pagination of the task API.
+"""
+
+import base64
+import json
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+
+from tasks.models import Task
+
+TASK_COUNT = 25
+
+
+def make_cursor(data):
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+@pytest.fixture
+def tasks(db, author):
+    """
+    Pytest fixture for creating tasks, half of them completed.
+    """
+    return [Task.objects.create(title=f'Task {number}',
+                                completed=number % 2 == 0, author=author)
+            for number in range(TASK_COUNT)]
+
+
+def walk(api_client, url, params, link):
+    """
+    Follow the pagination links and return the ids of all listed tasks.
+    """
+    response = api_client.get(url, params)
+    ids = []
+    while True:
+        assert response.status_code == HTTPStatus.OK
+        assert 'count' not in response.data
+        ids.append([task['id'] for task in response.data['results']])
+        if not response.data[link]:
+            return ids
+        response = api_client.get(response.data[link])
+
+
+@pytest.mark.parametrize('ordering', ['-created_at', 'updated_at',
+                                      '-completed', 'completed'])
+def test_cursor_pagination_walks_all_tasks(api_client, tasks, ordering):
+    """
+    Test that the cursor pages list every task once in the chosen order,
+    forwards and backwards.
+    """
+    url = reverse('api:task-list')
+    field = ordering.lstrip('-')
+    expected = sorted(tasks, key=lambda task: (getattr(task, field), task.pk),
+                      reverse=ordering.startswith('-'))
+
+    pages = walk(api_client, url, {'ordering': ordering, 'page_size': 10},
+                 'next')
+    last_page = api_client.get(url, {'ordering': ordering, 'page_size': 10})
+    for _ in range(2):
+        last_page = api_client.get(last_page.data['next'])
+    pages_backwards = walk(api_client, last_page.data['previous'], {},
+                           'previous')
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert sum(pages, []) == [task.pk for task in expected]
+    assert pages_backwards == pages[1::-1]
+
+
+@pytest.mark.parametrize('cursor', [
+    'bad', make_cursor([None, 1, False]),
+    make_cursor(['2024-01-01', 1.5, False]),
+    make_cursor(['2024-01-01', True, False]),
+    base64.urlsafe_b64encode(b'["2024-01-01", Infinity, false]').decode(),
+])
+def test_invalid_cursor(api_client, tasks, cursor):
+    """
+    Test that an invalid cursor is reported as not found.
+    """
+    response = api_client.get(reverse('api:task-list'), {'cursor': cursor})
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_search_results_use_page_numbers(api_client, tasks):
+    """
+    Test that search results ordered by relevance are paginated
+    with page numbers.
+    """
+    response = api_client.get(reverse('api:task-list'),
+                              {'search': 'task', 'page': 2})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.data['count'] == TASK_COUNT
+    assert len(response.data['results']) == 10
@@ -0,0 +1,33 @@
+"""
+This module contains tests for the serializers of the API.
+"""
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from api.serializers import TaskReadSerializer, TaskSerializer
+from tasks.models import Task
+
+
+@pytest.mark.parametrize('time_zone', ['Europe/Moscow', 'UTC'])
+def test_read_serializer_renders_same_json(db, author, settings, time_zone):
+    """
+    Test that the fast read-only serializer renders the same JSON
+    as the model serializer.
+    """
+    settings.TIME_ZONE = time_zone
+    Task.objects.create(title='Task', description='Description',
+                        author=author)
+    Task.objects.create(title='Ünïcode "task"', completed=True,
+                        author=author)
+    tasks = Task.objects.order_by('pk')
+    renderer = JSONRenderer()
+
+    expected = renderer.render(TaskSerializer(tasks, many=True).data)
+    rows = tasks.values(*TaskReadSerializer.fields)
+
+    assert renderer.render(
+        TaskReadSerializer(rows, many=True).data) == expected
+    assert renderer.render(TaskReadSerializer(
+        TaskReadSerializer.get_row(tasks[0])).data) == renderer.render(
+            TaskSerializer(tasks[0]).data)
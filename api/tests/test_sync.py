@@ -0,0 +1,185 @@
+"""
+This module contains tests for the synchronization of tasks in the API.
+"""
+
+import base64
+import datetime
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import sync
+from tasks.models import DeletedTask, Task
+
+URL = reverse('api:task-sync')
+
+
+@pytest.fixture
+def no_overlap(monkeypatch):
+    """
+    Pytest fixture moving the overlap of the synchronization
+    out of the way, so only the changes after a cursor are returned.
+    """
+    monkeypatch.setattr(sync, 'SYNC_OVERLAP', datetime.timedelta(0))
+
+
+def test_first_sync_returns_all_tasks(api_client, author, django_user_model,
+                                      no_overlap):
+    """
+    Test that a synchronization without cursor returns all the tasks
+    of the user and no deleted task.
+    """
+    tasks = Task.objects.bulk_create(
+        [Task(title=f'Task {number}', author=author) for number in range(3)])
+    Task.objects.create(
+        title='Other task',
+        author=django_user_model.objects.create(username='other'))
+    Task.objects.create(title='Deleted', author=author).delete()
+
+    response = api_client.get(URL)
+
+    assert response.status_code == HTTPStatus.OK
+    assert sorted(task['id'] for task in response.data['tasks']) == [
+        task.pk for task in tasks]
+    assert response.data['deleted'] == []
+    assert response.data['has_more'] is False
+
+
+def test_sync_returns_changes_since_cursor(api_client, author_client, author,
+                                           no_overlap):
+    """
+    Test that only the tasks created, updated or deleted
+    after the cursor, through the API or the website, are returned.
+    """
+    unchanged, updated, deleted = Task.objects.bulk_create(
+        [Task(title=f'Task {number}', author=author) for number in range(3)])
+    cursor = api_client.get(URL).data['cursor']
+
+    author_client.post(reverse('tasks:task_update', args=[updated.pk]),
+                       {'title': 'Updated', 'description': 'Updated'})
+    author_client.post(reverse('tasks:task_delete', args=[deleted.pk]))
+    api_client.post(reverse('api:task-bulk'),
+                    {'create': [{'title': 'Created'}]}, format='json')
+    response = api_client.get(URL, {'cursor': cursor})
+
+    assert response.status_code == HTTPStatus.OK
+    assert [task['title'] for task in response.data['tasks']] == [
+        'Updated', 'Created']
+    assert response.data['deleted'] == [deleted.pk]
+    response = api_client.get(URL, {'cursor': response.data['cursor']})
+    assert response.data['tasks'] == []
+    assert response.data['deleted'] == []
+
+
+def test_sync_overlaps_recent_changes(api_client, author):
+    """
+    Test that the recent changes are sent again,
+    in case concurrent changes were committed late.
+    """
+    Task.objects.create(title='Task', author=author)
+
+    cursor = api_client.get(URL).data['cursor']
+    response = api_client.get(URL, {'cursor': cursor})
+
+    assert [task['title'] for task in response.data['tasks']] == ['Task']
+
+
+def test_sync_is_paginated(api_client, author, monkeypatch, no_overlap):
+    """
+    Test that the changes are returned in pages
+    until `has_more` is false.
+    """
+    monkeypatch.setattr(sync, 'SYNC_PAGE_SIZE', 2)
+    tasks = Task.objects.bulk_create(
+        [Task(title=f'Task {number}', author=author) for number in range(5)])
+
+    ids = []
+    cursor = None
+    for _ in range(3):
+        data = api_client.get(URL, {'cursor': cursor} if cursor else {}).data
+        ids += [task['id'] for task in data['tasks']]
+        cursor = data['cursor']
+    assert data['has_more'] is False
+    assert sorted(ids) == [task.pk for task in tasks]
+
+
+def test_sync_invalid_cursor(api_client, author):
+    """
+    Test that an invalid cursor is not found.
+    """
+    response = api_client.get(URL, {'cursor': 'invalid'})
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize('deleted_since', [
+    None, '2024-01-01T00:00:00', '2024-01-01'])
+def test_sync_invalid_deletion_cursor(api_client, author, deleted_since):
+    """
+    Test that a deletion cursor without an aware datetime is not found.
+    """
+    task_cursor = api_client.get(URL).data['cursor'].split('.')[0]
+    deletion_cursor = base64.urlsafe_b64encode(
+        json.dumps([deleted_since, 0, False]).encode()).decode()
+
+    response = api_client.get(
+        URL, {'cursor': f'{task_cursor}.{deletion_cursor}'})
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_sync_expired_cursor(api_client, author, monkeypatch):
+    """
+    Test that a cursor older than the retention of the deleted tasks
+    is gone, and that old deleted tasks are purged.
+    """
+    cursor = api_client.get(URL).data['cursor']
+    Task.objects.create(title='Deleted', author=author).delete()
+    later = timezone.now() + sync.DELETED_TASK_RETENTION * 2
+    monkeypatch.setattr(timezone, 'now', lambda: later)
+
+    response = api_client.get(URL, {'cursor': cursor})
+    call_command('purge_deleted_tasks')
+
+    assert response.status_code == HTTPStatus.GONE
+    assert not DeletedTask.objects.exists()
+
+
+@pytest.mark.parametrize('delete', [
+    lambda author: author.delete(),
+    lambda author: type(author).objects.filter(pk=author.pk).delete(),
+])
+def test_deleting_author_does_not_record_deleted_tasks(author, delete):
+    """
+    Test that the tasks deleted with their author,
+    alone or in a queryset of users, are not recorded.
+    """
+    Task.objects.create(title='Task', author=author)
+
+    delete(author)
+
+    assert not DeletedTask.objects.exists()
+
+
+def test_queryset_deletion_records_tasks_at_once(author):
+    """
+    Test that the tasks deleted by a queryset are recorded
+    with a single insert.
+    """
+    tasks = Task.objects.bulk_create(
+        [Task(title=f'Task {number}', author=author) for number in range(5)])
+
+    with CaptureQueriesContext(connection) as queries:
+        Task.objects.filter(author=author).delete()
+
+    inserts = [query for query in queries
+               if query['sql'].startswith('INSERT')]
+    assert len(inserts) == 1
+    assert sorted(DeletedTask.objects.values_list('task_id', flat=True)) == [
+        task.pk for task in tasks]
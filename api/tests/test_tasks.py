@@ -0,0 +1,55 @@
+"""
+This module contains tests for the task endpoints of the API.
+It includes tests for limiting the tasks to those of the current user.
+"""
+
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+
+from tasks.models import Task
+
+
+@pytest.fixture
+def other_task(db, django_user_model):
+    """
+    Pytest fixture for creating a task of another user.
+    """
+    other_user = django_user_model.objects.create(username='other')
+    return Task.objects.create(title='Other task', author=other_user)
+
+
+def test_list_only_contains_own_tasks(api_client, task, other_task):
+    """
+    Test that the task list only contains the tasks of the current user.
+    """
+    response = api_client.get(reverse('api:task-list'))
+
+    assert [item['id'] for item in response.data['results']] == [task.pk]
+
+
+@pytest.mark.parametrize('method', ['get', 'patch', 'delete'])
+def test_tasks_of_other_users_are_not_found(api_client, other_task, method):
+    """
+    Test that the tasks of other users can be neither read,
+    nor changed, nor deleted.
+    """
+    url = reverse('api:task-detail', args=[other_task.pk])
+
+    response = getattr(api_client, method)(url, {'completed': True})
+
+    other_task.refresh_from_db()
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert other_task.completed is False
+
+
+def test_retrieve_uses_single_query(api_client, task,
+                                    django_assert_num_queries):
+    """
+    Test that a task is retrieved without fetching its author.
+    """
+    with django_assert_num_queries(1):
+        response = api_client.get(reverse('api:task-detail', args=[task.pk]))
+
+    assert response.data['title'] == task.title
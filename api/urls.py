@@ -3,11 +3,13 @@ This module defines the URL routes for the 'api' application.
 The routes are defined using a combination of Django's path function
 and Django Rest Framework's DefaultRouter.
 The DefaultRouter automatically generates the URL routes for the UserViewSet
-and TaskViewSet viewsets.
+and TaskViewSet viewsets, and the asynchronous task views have their own
+routes under `async/`.
 """
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from api.async_views import task_detail, task_list
 from api.views import UserViewSet, TaskViewSet
 
 app_name = 'api'
@@ -18,6 +20,8 @@ router.register(r'tasks', TaskViewSet, basename='task')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('async/tasks/', task_list, name='async-task-list'),
+    path('async/tasks/<int:pk>/', task_detail, name='async-task-detail'),
     path('auth/', include('djoser.urls')),
     path('auth/', include('djoser.urls.authtoken')),
 ]
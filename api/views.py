@@ -4,14 +4,89 @@ It includes a viewset for interacting with User objects
 and a viewset for interacting with Task objects.
 """
 
-from rest_framework import viewsets
+import hashlib
+
+from rest_framework import status, viewsets
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.serializers import as_serializer_error
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_etags, quote_etag
 
+from tasks.cache import task_lists
+from tasks.export import (CONTENT_TYPES, EXPORT_FORMATS, aexport_tasks,
+                          export_tasks)
+from tasks.imports import (IMPORT_FORMATS, InvalidImportFile, decode_lines,
+                           import_tasks)
 from tasks.models import Task
-from api.serializers import UserSerializer, TaskSerializer
+from api.serializers import (UserSerializer, TaskSerializer,
+                             TaskBulkSerializer, TaskReadSerializer)
 from api.permissions import IsAuthor
-from api.pagination import TaskPagination
+from api.pagination import TaskCursorPagination, TaskPagination
+from tasks.pagination import ORDERINGS, RELEVANCE, InvalidCursor
+from tasks.search import get_search_backend
+from tasks.sync import ExpiredCursor, get_changes
+
+
+# Methods of the requests changing a task whose If-Match header is checked.
+CONDITIONAL_METHODS = ['PUT', 'PATCH', 'DELETE']
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The task has changed.'
+    default_code = 'precondition_failed'
+
+
+def make_etag(*values):
+    """
+    Return a strong ETag made of the hash of the values.
+    """
+    return quote_etag(hashlib.md5(repr(values).encode()).hexdigest())
+
+
+def if_match_fails(request, etag):
+    """
+    Return whether the If-Match header of the request does not match
+    the ETag. GZipMiddleware makes the ETags of the compressed responses
+    weak, so the ETags of the header are compared without their W/
+    prefix, unlike the strong comparison of Django.
+    """
+    header = request.headers.get('If-Match')
+    if header is None:
+        return False
+    etags = [value.removeprefix('W/') for value in parse_etags(header)]
+    return '*' not in etags and etag not in etags
+
+
+def validate_item(serializer, item):
+    """
+    Return the data of the item validated by the serializer and None,
+    or None and the validation errors. The serializer is not bound
+    to the item, so it is reused for a whole batch and its fields
+    are built once.
+    """
+    try:
+        return serializer.run_validation(item), None
+    except ValidationError as error:
+        return None, as_serializer_error(error)
+
+
+def is_task_id(value):
+    """
+    Return whether the value is an integer, but not the JSON true or false
+    which Python also considers as integers.
+    """
+    return isinstance(value, int) and not isinstance(value, bool)
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -28,14 +103,134 @@ class UserViewSet(viewsets.ModelViewSet):
 class TaskViewSet(viewsets.ModelViewSet):
     """
     ViewSet for viewing and editing Task instances.
-    Only the author of a task
-    or an authenticated user can interact with this viewset.
-    The tasks are paginated using the TaskPagination class.
+    Authenticated users can only see and edit their own tasks:
+    the queryset is limited to the tasks of the current user,
+    so the tasks of other users are not found.
+    The tasks are ordered by the `ordering` query parameter
+    and paginated with cursors using the TaskCursorPagination class.
+    The list can be filtered with the `search` query parameter,
+    the results are then ordered by relevance unless another ordering
+    is chosen, and paginated with page numbers
+    using the TaskPagination class.
+    The `sync` action returns the changes since a cursor,
+    the `export` action streams all the tasks as a file
+    and the `import` action creates tasks from a file.
+    Lists and tasks are returned with an ETag: a request with
+    a matching If-None-Match header gets an empty 304 response,
+    and updates and deletions with an If-Match header which does not
+    match the current ETag of the task are refused with a 412 response.
     """
-    queryset = Task.objects.all().order_by('-created_at')
+    queryset = Task.objects.order_by('-created_at')
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated, IsAuthor]
-    pagination_class = TaskPagination
+    pagination_class = TaskCursorPagination
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.get_ordering() == RELEVANCE:
+                self._paginator = TaskPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_ordering(self):
+        """
+        Return the ordering of the task list chosen in the query parameters.
+        """
+        ordering = self.request.query_params.get('ordering')
+        if ordering in ORDERINGS:
+            return ordering
+        if self.request.query_params.get('search'):
+            return RELEVANCE
+        return '-created_at'
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Task.objects.none()
+        queryset = super().get_queryset().filter(
+            author=self.request.user).only(*TaskSerializer.Meta.fields)
+        search_query = self.request.query_params.get('search')
+        if self.action == 'list' and search_query:
+            queryset = get_search_backend().search(queryset, search_query)
+        if (self.request.method in CONDITIONAL_METHODS
+                and 'If-Match' in self.request.headers):
+            # The task cannot change between the check and the update
+            # of the transaction.
+            queryset = queryset.select_for_update()
+        return queryset
+
+    def get_list_etag(self):
+        """
+        Return the ETag of the task list, computed from the last update
+        time and the number of the tasks of the user, read from the
+        (author, updated_at) index on every request so changes made
+        by other processes are seen, and from the query parameters.
+        """
+        user_id = self.request.user.pk
+        last_update, count = Task.objects.filter(author_id=user_id).aggregate(
+            Max('updated_at'), Count('id')).values()
+        return make_etag(user_id, last_update, count,
+                         sorted(self.request.query_params.lists()))
+
+    @staticmethod
+    def get_task_etag(task):
+        return make_etag(task.pk, task.updated_at)
+
+    def list(self, request, *args, **kwargs):
+        """
+        List the tasks from plain rows with the fast read-only serializer.
+        """
+        etag = self.get_list_etag()
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            response['ETag'] = etag
+            return response
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *TaskReadSerializer.fields)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(
+                TaskReadSerializer(page, many=True).data)
+        else:
+            response = Response(TaskReadSerializer(queryset, many=True).data)
+        response['ETag'] = etag
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Return the task with the fast read-only serializer.
+        """
+        task = self.get_object()
+        etag = self.get_task_etag(task)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = Response(
+                TaskReadSerializer(TaskReadSerializer.get_row(task)).data)
+        response['ETag'] = etag
+        return response
+
+    def get_object(self):
+        """
+        Return the task, refusing to change it with a 412 response
+        if the If-Match header does not match the ETag of the task.
+        """
+        task = super().get_object()
+        if self.request.method in CONDITIONAL_METHODS and if_match_fails(
+                self.request, self.get_task_etag(task)):
+            raise PreconditionFailed()
+        return task
+
+    @transaction.atomic
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        task = response.data.serializer.instance
+        response['ETag'] = self.get_task_etag(task)
+        return response
+
+    @transaction.atomic
+    def destroy(self, request, *args, **kwargs):
+        return super().destroy(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         """
@@ -43,3 +238,168 @@ class TaskViewSet(viewsets.ModelViewSet):
         as the author of the task.
         """
         serializer.save(author=self.request.user)
+
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def sync(self, request):
+        """
+        Return the tasks created or updated and the ids of the tasks
+        deleted since the `cursor` query parameter, or all the tasks
+        without it, with the cursor of the next synchronization.
+        While `has_more` is true, the next changes can be fetched
+        right away. An expired cursor gets a 410 response,
+        the client then synchronizes from scratch.
+        """
+        try:
+            changes = get_changes(request.user, TaskReadSerializer.fields,
+                                  request.query_params.get('cursor'))
+        except ExpiredCursor as error:
+            return Response({'detail': str(error)},
+                            status=status.HTTP_410_GONE)
+        except InvalidCursor as error:
+            raise NotFound(str(error))
+        return Response({
+            'tasks': TaskReadSerializer(changes.tasks, many=True).data,
+            'deleted': changes.deleted,
+            'cursor': changes.cursor,
+            'has_more': changes.has_more,
+        })
+
+    @action(detail=False, methods=['get'], pagination_class=None,
+            url_path=f'export/(?P<export_format>{"|".join(EXPORT_FORMATS)})')
+    def export(self, request, export_format):
+        """
+        Stream all the tasks of the user as a JSON, NDJSON or CSV file,
+        read from the database in chunks, so exports of any size
+        are served in constant memory. Under ASGI the file is streamed
+        from an asynchronous iterator, since Django would read
+        a synchronous one into a list.
+        """
+        if isinstance(request._request, ASGIRequest):
+            lines = aexport_tasks(request.user.pk, export_format)
+        else:
+            lines = export_tasks(request.user.pk, export_format)
+        response = StreamingHttpResponse(
+            lines, content_type=CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = (
+            f'attachment; filename="tasks.{export_format}"')
+        return response
+
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser],
+            url_path=f'import/(?P<import_format>{"|".join(IMPORT_FORMATS)})',
+            url_name='import')
+    def import_tasks(self, request, import_format):
+        """
+        Create tasks from a CSV or NDJSON file, uploaded as the `file`
+        field of a multipart form or sent as the request body.
+        The file is read line by line and the valid rows are inserted
+        in batches. The response contains the number of the created
+        tasks and the errors of the invalid rows.
+        """
+        if request.content_type.startswith('multipart/'):
+            file = request.FILES.get('file')
+            if file is None:
+                return Response({'file': ['No file was submitted.']},
+                                status=status.HTTP_400_BAD_REQUEST)
+        else:
+            # The body is read as a stream, without loading it in memory.
+            file = request._request
+        try:
+            result = import_tasks(request.user.pk, decode_lines(file),
+                                  import_format)
+        except InvalidImportFile as error:
+            return Response({'detail': str(error)},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(result.as_dict())
+
+    @action(detail=False, methods=['post'],
+            serializer_class=TaskBulkSerializer)
+    def bulk(self, request):
+        """
+        Create, partially update and delete tasks in a single transaction.
+        Every operation is validated on its own and the response contains
+        its status, with the task or the validation errors.
+        """
+        serializer = TaskBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        operations = serializer.validated_data
+        with transaction.atomic():
+            results = {
+                'create': self.create_tasks(operations['create']),
+                'update': self.update_tasks(operations['update']),
+                'delete': self.delete_tasks(operations['delete']),
+            }
+            # Bulk creations and updates send no post_save signal.
+            task_lists.invalidate(request.user.pk)
+        return Response(results)
+
+    def create_tasks(self, items):
+        results = []
+        tasks = []
+        serializer = TaskSerializer()
+        for item in items:
+            data, errors = validate_item(serializer, item)
+            if errors is None:
+                task = Task(author=self.request.user, **data)
+                tasks.append(task)
+                results.append({'status': status.HTTP_201_CREATED,
+                                'task': task})
+            else:
+                results.append({'status': status.HTTP_400_BAD_REQUEST,
+                                'errors': errors})
+        Task.objects.bulk_create(tasks)
+        for result in results:
+            if 'task' in result:
+                result['data'] = TaskReadSerializer(
+                    TaskReadSerializer.get_row(result.pop('task'))).data
+        return results
+
+    def update_tasks(self, items):
+        ids = [item.get('id') for item in items]
+        tasks = self.get_queryset().in_bulk(
+            [task_id for task_id in ids if is_task_id(task_id)])
+        results = []
+        fields = set()
+        now = timezone.now()
+        serializer = TaskSerializer(partial=True)
+        for task_id, item in zip(ids, items):
+            if not is_task_id(task_id):
+                results.append({
+                    'id': task_id, 'status': status.HTTP_400_BAD_REQUEST,
+                    'errors': {'id': ['A valid integer is required.']}})
+                continue
+            task = tasks.get(task_id)
+            if task is None:
+                results.append({'id': task_id,
+                                'status': status.HTTP_404_NOT_FOUND})
+                continue
+            data, errors = validate_item(serializer, item)
+            if errors is not None:
+                results.append({'id': task_id,
+                                'status': status.HTTP_400_BAD_REQUEST,
+                                'errors': errors})
+                continue
+            for field, value in data.items():
+                setattr(task, field, value)
+                fields.add(field)
+            # bulk_update() does not set auto_now fields.
+            task.updated_at = now
+            results.append({'id': task_id, 'status': status.HTTP_200_OK,
+                            'task': task})
+        updated = [result['task'] for result in results if 'task' in result]
+        if updated:
+            Task.objects.bulk_update(updated, [*fields, 'updated_at'])
+        for result in results:
+            if 'task' in result:
+                result['data'] = TaskReadSerializer(
+                    TaskReadSerializer.get_row(result.pop('task'))).data
+        return results
+
+    def delete_tasks(self, ids):
+        queryset = self.get_queryset().filter(pk__in=ids)
+        existing = set(queryset.values_list('pk', flat=True))
+        if existing:
+            queryset.delete()
+        return [{'id': task_id,
+                 'status': (status.HTTP_204_NO_CONTENT if task_id in existing
+                            else status.HTTP_404_NOT_FOUND)}
+                for task_id in ids]
@@ -0,0 +1,8 @@
+"""
+Benchmarks of the Task Manager.
+Every module is a script run from the project root, for example:
+
+    python -m benchmarks.indexes --users 1000 --tasks-per-user 1000
+
+The benchmarks create their own database and never touch db.sqlite3.
+"""
@@ -0,0 +1,126 @@
+"""
+Benchmark of the task API served under ASGI.
+It drives the ASGI application of the project in-process with many
+concurrent requests, comparing the synchronous views of the TaskViewSet,
+which Django runs in a thread, with the asynchronous views of the API.
+The throughput and the latency percentiles are reported per endpoint
+and concurrency level.
+"""
+
+import asyncio
+import logging
+import time
+
+from benchmarks.utils import (create_database, make_parser, percentile,
+                              seed, setup_django)
+
+setup_django()
+
+from django.contrib.auth.models import User
+from django.core.asgi import get_asgi_application
+from rest_framework.authtoken.models import Token
+
+from tasks.models import Task
+
+ENDPOINTS = {
+    'sync list': '/api/v1/tasks/',
+    'async list': '/api/v1/async/tasks/',
+    'sync retrieve': '/api/v1/tasks/{task_id}/',
+    'async retrieve': '/api/v1/async/tasks/{task_id}/',
+}
+
+
+async def request(application, path, token):
+    """
+    Make a GET request to the ASGI application and return its status.
+    """
+    path, _, query_string = path.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query_string.encode(),
+        'headers': [(b'host', b'localhost'),
+                    (b'authorization', f'Token {token}'.encode())],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    status = None
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # The request is complete: wait like a client keeping the
+        # connection open until the application stops listening.
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await application(scope, receive, send)
+    return status
+
+
+async def run(application, paths, token, concurrency, requests):
+    """
+    Make `requests` requests with `concurrency` concurrent clients
+    and return the total duration and the latencies in milliseconds.
+    """
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def client():
+        for number in remaining:
+            started_at = time.perf_counter()
+            status = await request(application, paths[number % len(paths)],
+                                   token)
+            latencies.append((time.perf_counter() - started_at) * 1000)
+            if status != 200:
+                raise RuntimeError(f'Unexpected status {status}')
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - started_at, latencies
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.set_defaults(users=20, tasks_per_user=500, repeat=500)
+    parser.add_argument('--concurrency', type=int, nargs='+',
+                        default=[1, 10, 100])
+    options = parser.parse_args()
+
+    create_database(options.database)
+    user_ids = seed(options.users, options.tasks_per_user)
+    user = User.objects.get(pk=user_ids[0])
+    token, _ = Token.objects.get_or_create(user=user)
+    task_ids = list(Task.objects.filter(author=user).values_list(
+        'pk', flat=True)[:100])
+    application = get_asgi_application()
+    # Under high concurrency most requests are slow, since they wait.
+    logging.getLogger('taskmaster.metrics').setLevel(logging.ERROR)
+
+    for concurrency in options.concurrency:
+        for name, path in ENDPOINTS.items():
+            paths = [path.format(task_id=task_id) for task_id in task_ids]
+            # Warm up the lazy imports and the connections.
+            asyncio.run(run(application, paths, token.key, concurrency,
+                            concurrency))
+            duration, latencies = asyncio.run(run(
+                application, paths, token.key, concurrency, options.repeat))
+            print(f'{name:<16} concurrency {concurrency:4}'
+                  f'  {options.repeat / duration:8.1f} requests/s'
+                  f'  p50 {percentile(latencies, 50):8.2f} ms'
+                  f'  p95 {percentile(latencies, 95):8.2f} ms'
+                  f'  p99 {percentile(latencies, 99):8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark of the token authentication of the API.
+It authenticates requests with the tokens of seeded users, with the
+TokenAuthentication of DRF, which reads the token and its user from
+the database, and with the cached token authentication, first with
+every token missing from the cache and then with all of them cached.
+"""
+
+from benchmarks.utils import (create_database, format_summary, make_parser,
+                              measure, seed, setup_django)
+
+setup_django()
+
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from api.authentication import CachedTokenAuthentication, tokens
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.set_defaults(users=1000, tasks_per_user=1, repeat=10000)
+    options = parser.parse_args()
+    create_database(options.database)
+    user_ids = seed(options.users, options.tasks_per_user)
+    Token.objects.bulk_create([Token(key=Token.generate_key(),
+                                     user_id=user_id)
+                               for user_id in user_ids])
+    factory = APIRequestFactory()
+    requests = [factory.get('/api/v1/tasks/',
+                            HTTP_AUTHORIZATION=f'Token {key}')
+                for key in Token.objects.values_list('key', flat=True)]
+
+    for name, authentication in [
+            ('TokenAuthentication', TokenAuthentication()),
+            ('cached, cold', CachedTokenAuthentication()),
+            ('cached, warm', CachedTokenAuthentication())]:
+        position = iter(range(options.repeat))
+
+        def authenticate():
+            request = requests[next(position) % len(requests)]
+            authentication.authenticate(request)
+
+        if name == 'cached, cold':
+            tokens.clear()
+            repeat = min(options.repeat, len(requests))
+        else:
+            repeat = options.repeat
+        print(format_summary(name, measure(authenticate, repeat)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark of the bulk task operations of the API.
+It compares creating, completing and deleting tasks with one request
+per task and with a single request to the bulk endpoint.
+"""
+
+import time
+
+from benchmarks.utils import (create_database, make_api_client, make_parser,
+                              setup_django)
+
+setup_django()
+
+from django.contrib.auth.models import User
+
+from tasks.models import Task
+
+TASKS_URL = '/api/v1/tasks/'
+BULK_URL = '/api/v1/tasks/bulk/'
+
+
+def report(name, count, started_at):
+    elapsed = time.perf_counter() - started_at
+    print(f'{name:<40} {elapsed * 1000:10.1f} ms  {count / elapsed:10.0f}'
+          f' tasks/s')
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.add_argument('--batch', type=int, default=1000)
+    options = parser.parse_args()
+    create_database(options.database)
+    user = User.objects.create(username='user')
+    client = make_api_client(user)
+    batch = options.batch
+
+    started_at = time.perf_counter()
+    for number in range(batch):
+        client.post(TASKS_URL, {'title': f'Task {number}'}, format='json')
+    report('create one per request', batch, started_at)
+    ids = list(Task.objects.values_list('pk', flat=True))
+    started_at = time.perf_counter()
+    for task_id in ids:
+        client.patch(f'{TASKS_URL}{task_id}/', {'completed': True},
+                     format='json')
+    report('complete one per request', batch, started_at)
+    started_at = time.perf_counter()
+    for task_id in ids:
+        client.delete(f'{TASKS_URL}{task_id}/')
+    report('delete one per request', batch, started_at)
+
+    started_at = time.perf_counter()
+    client.post(BULK_URL, {'create': [{'title': f'Task {number}'}
+                                      for number in range(batch)]},
+                format='json')
+    report('create in bulk', batch, started_at)
+    ids = list(Task.objects.values_list('pk', flat=True))
+    started_at = time.perf_counter()
+    client.post(BULK_URL, {'update': [{'id': task_id, 'completed': True}
+                                      for task_id in ids]}, format='json')
+    report('complete in bulk', batch, started_at)
+    started_at = time.perf_counter()
+    client.post(BULK_URL, {'delete': ids}, format='json')
+    report('delete in bulk', batch, started_at)
+
+
+if __name__ == '__main__':
+    main()
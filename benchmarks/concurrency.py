@@ -0,0 +1,110 @@
+"""
+Benchmark of concurrent writes to a SQLite database.
+Threads, each with its own connection like the web and bot workers,
+create and complete tasks in transactions while other threads read
+task lists. It compares the default rollback journal with the tuning
+of the SQLITE_PRAGMAS setting, and counts the operations failed with
+"database is locked".
+"""
+
+import os
+import random
+import tempfile
+import threading
+import time
+
+from benchmarks.utils import create_database, make_parser, setup_django
+
+setup_django()
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+
+from tasks.models import Task
+
+MODES = {
+    'rollback journal': {'journal_mode': 'delete', 'synchronous': 'full',
+                         'busy_timeout': 5000, 'mmap_size': 0},
+    'tuned': settings.SQLITE_PRAGMAS,
+}
+
+
+def write(randomizer, user_id):
+    with transaction.atomic():
+        task = Task.objects.create(title='Task', author_id=user_id)
+        Task.objects.filter(pk=task.pk).update(completed=True)
+
+
+def read(randomizer, user_id):
+    list(Task.objects.filter(author_id=user_id).order_by(
+        '-created_at')[:10])
+
+
+def work(operation, user_ids, deadline, results, seed):
+    randomizer = random.Random(seed)
+    done = failed = 0
+    try:
+        while time.perf_counter() < deadline:
+            try:
+                operation(randomizer, randomizer.choice(user_ids))
+                done += 1
+            except OperationalError:
+                failed += 1
+    finally:
+        connection.close()
+    results.append((operation, done, failed))
+
+
+def run(writers, readers, user_ids, duration):
+    """
+    Run the threads for `duration` seconds and return the number
+    of writes, failed writes, reads and failed reads.
+    """
+    results = []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=work,
+                                args=(operation, user_ids, deadline, results,
+                                      number))
+               for number, operation in enumerate(
+                   [write] * writers + [read] * readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    totals = {write: [0, 0], read: [0, 0]}
+    for operation, done, failed in results:
+        totals[operation][0] += done
+        totals[operation][1] += failed
+    return (*totals[write], *totals[read])
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=5)
+    options = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        # Concurrent connections need a database file.
+        create_database(options.database
+                        or os.path.join(directory, 'benchmark.sqlite3'))
+        from django.contrib.auth.models import User
+        User.objects.bulk_create([User(username=f'user{number}')
+                                  for number in range(options.users)])
+        user_ids = list(User.objects.values_list('pk', flat=True))
+        for name, pragmas in MODES.items():
+            settings.SQLITE_PRAGMAS = pragmas
+            connection.close()
+            writes, failed_writes, reads, failed_reads = run(
+                options.writers, options.readers, user_ids,
+                options.duration)
+            print(f'{name:<20}'
+                  f' {writes / options.duration:8.0f} writes/s'
+                  f' ({failed_writes} locked)'
+                  f' {reads / options.duration:8.0f} reads/s'
+                  f' ({failed_reads} locked)')
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark of the export of the tasks of a user.
+It streams the export of users with more and more tasks in every
+format, from the synchronous iterator served under WSGI and from the
+asynchronous one served under ASGI, and reports its duration and its
+peak of allocated memory, which should not grow with the number
+of the tasks, compared with a list of the same tasks materialized
+at once.
+"""
+
+import time
+import tracemalloc
+
+from benchmarks.utils import create_database, make_parser, seed, setup_django
+
+setup_django()
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+
+from tasks.export import EXPORT_FORMATS, aexport_tasks, export_tasks
+from tasks.models import Task
+
+TASK_COUNTS = [1000, 10000, 100000]
+
+
+def measure_peak(function):
+    """
+    Call the function and return its duration in milliseconds
+    and its peak of allocated memory in KiB.
+    """
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    function()
+    duration = (time.perf_counter() - started_at) * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return duration, peak / 1024
+
+
+def consume(lines):
+    for _ in lines:
+        pass
+
+
+@async_to_sync
+async def aconsume(lines):
+    async for _ in lines:
+        pass
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.add_argument('--task-counts', type=int, nargs='+',
+                        default=TASK_COUNTS)
+    options = parser.parse_args()
+    create_database(options.database)
+
+    for count in options.task_counts:
+        User.objects.all().delete()
+        user_id = seed(1, count)[0]
+        for export_format in EXPORT_FORMATS:
+            duration, peak = measure_peak(
+                lambda: consume(export_tasks(user_id, export_format)))
+            print(f'{count:>7} tasks  {export_format:<7}'
+                  f'  {duration:9.1f} ms  peak {peak:9.1f} KiB')
+            duration, peak = measure_peak(
+                lambda: aconsume(aexport_tasks(user_id, export_format)))
+            print(f'{count:>7} tasks  {"a" + export_format:<7}'
+                  f'  {duration:9.1f} ms  peak {peak:9.1f} KiB')
+        duration, peak = measure_peak(
+            lambda: list(Task.objects.filter(author_id=user_id).values()))
+        print(f'{count:>7} tasks  {"list":<7}'
+              f'  {duration:9.1f} ms  peak {peak:9.1f} KiB')
+
+
+if __name__ == '__main__':
+    main()
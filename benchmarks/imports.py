@@ -0,0 +1,83 @@
+"""
+Benchmark of the import of tasks from files.
+It writes CSV and NDJSON files of generated tasks and imports them
+into a SQLite database file in WAL mode, reporting the rows imported
+per second, compared with one bulk_create() call per batch.
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.utils import create_database, make_parser, setup_django
+
+setup_django()
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from tasks.imports import IMPORT_BATCH_SIZE, decode_lines, import_tasks
+from tasks.models import Task
+
+
+def write_files(directory, rows):
+    """
+    Write the CSV and NDJSON files of the tasks and return their paths.
+    """
+    paths = {'csv': os.path.join(directory, 'tasks.csv'),
+             'ndjson': os.path.join(directory, 'tasks.ndjson')}
+    with open(paths['csv'], 'w', encoding='utf-8') as file:
+        file.write('title,description,completed\n')
+        for number in range(rows):
+            file.write(f'Task {number},Description of task {number},'
+                       f'{number % 2 == 0}\n')
+    with open(paths['ndjson'], 'w', encoding='utf-8') as file:
+        for number in range(rows):
+            file.write(json.dumps({
+                'title': f'Task {number}',
+                'description': f'Description of task {number}',
+                'completed': number % 2 == 0}) + '\n')
+    return paths
+
+
+def report(name, rows, started_at):
+    elapsed = time.perf_counter() - started_at
+    print(f'{name:<24} {elapsed * 1000:10.1f} ms  {rows / elapsed:10.0f}'
+          f' rows/s')
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+    options = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        # WAL mode needs a database file.
+        create_database(options.database
+                        or os.path.join(directory, 'benchmark.sqlite3'))
+        paths = write_files(directory, options.rows)
+        user_id = User.objects.create(username='user').pk
+
+        for import_format, path in paths.items():
+            started_at = time.perf_counter()
+            with open(path, 'rb') as file:
+                result = import_tasks(user_id, decode_lines(file),
+                                      import_format, options.batch_size)
+            report(f'import {import_format}', result.created, started_at)
+
+        started_at = time.perf_counter()
+        for start in range(0, options.rows, options.batch_size):
+            with transaction.atomic():
+                Task.objects.bulk_create([
+                    Task(title=f'Task {number}',
+                         description=f'Description of task {number}',
+                         completed=number % 2 == 0, author_id=user_id)
+                    for number in range(
+                        start, min(start + options.batch_size,
+                                   options.rows))])
+        report('bulk_create', options.rows, started_at)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark of the Task indexes.
+It seeds the database, then runs the author-scoped listing, sorting
+and title lookup queries with only the foreign key index on author,
+as before the composite indexes were added, and with the composite
+indexes, printing the query plans and the timings of both runs.
+"""
+
+from benchmarks.utils import (create_database, format_summary, make_parser,
+                              measure, seed, setup_django)
+
+setup_django()
+
+from django.db import connection, models
+
+from tasks.models import Task
+
+PAGE_SIZE = 10
+
+QUERIES = {
+    'list by created_at': lambda user_id: Task.objects.filter(
+        author_id=user_id).order_by('-created_at')[:PAGE_SIZE],
+    'list by updated_at': lambda user_id: Task.objects.filter(
+        author_id=user_id).order_by('-updated_at')[:PAGE_SIZE],
+    'list by completed': lambda user_id: Task.objects.filter(
+        author_id=user_id).order_by('-completed')[:PAGE_SIZE],
+    'count not completed': lambda user_id: Task.objects.filter(
+        author_id=user_id, completed=False),
+    'lookup by title': lambda user_id: Task.objects.filter(
+        author_id=user_id, title='Task 5'),
+}
+
+AUTHOR_INDEX = models.Index(fields=['author'], name='task_author_bench_idx')
+
+
+def run(user_ids, repeat):
+    for name, query in QUERIES.items():
+        user_id = user_ids[len(user_ids) // 2]
+        print(f'{name}: {query(user_id).explain()}')
+    for name, query in QUERIES.items():
+        position = iter(range(repeat))
+
+        def execute():
+            user_id = user_ids[next(position) % len(user_ids)]
+            queryset = query(user_id)
+            if name.startswith('count'):
+                queryset.count()
+            else:
+                list(queryset)
+
+        print(format_summary(name, measure(execute, repeat)))
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.set_defaults(users=1000, tasks_per_user=1000)
+    options = parser.parse_args()
+    create_database(options.database)
+    print(f'Seeding {options.users * options.tasks_per_user} tasks...')
+    user_ids = seed(options.users, options.tasks_per_user)
+
+    with connection.schema_editor() as editor:
+        for index in Task._meta.indexes:
+            editor.remove_index(Task, index)
+        editor.add_index(Task, AUTHOR_INDEX)
+    print('\nBefore: foreign key index on author only')
+    run(user_ids, options.repeat)
+
+    with connection.schema_editor() as editor:
+        editor.remove_index(Task, AUTHOR_INDEX)
+        for index in Task._meta.indexes:
+            editor.add_index(Task, index)
+    print('\nAfter: composite indexes')
+    run(user_ids, options.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+"""
+Benchmark of the requests served by the project.
+It seeds users and tasks, then drives the task list of the website
+with sorting and search, the list, retrieve, create and update actions
+of the API, and the bot handlers fed with synthetic updates through
+a fake Telegram Bot API. Every scenario is reported with the 50th, 95th
+and 99th percentiles of its latency, and the number of queries and
+the memory allocated per request.
+
+The results can be saved as a baseline and compared with it later,
+the command then exits with status 1 on a regression, so it can gate
+changes in CI:
+
+    python -m benchmarks.load --save-baseline benchmarks/baseline.json
+    python -m benchmarks.load --baseline benchmarks/baseline.json
+
+A query more than the baseline is a regression, as is a median latency
+or an allocation above the baseline by more than its tolerance.
+The tail latencies are too noisy to gate and are only reported.
+Latencies depend on the machine: record the baseline where it is checked.
+"""
+
+import itertools
+import json
+import sys
+import time
+import tracemalloc
+
+from benchmarks.utils import (create_database, make_api_client, make_parser,
+                              percentile, seed, setup_django)
+
+setup_django()
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from telebot import apihelper, types
+
+import bot as task_bot
+from tasks.cache import task_lists
+from tasks.models import Task
+from telegram_bot.ratelimit import SendRateLimiter
+from telegram_bot.users import user_ids as telegram_user_ids
+
+ALLOCATION_REPEAT = 20
+BOT_USER_ID = 1001
+LATENCY_SLACK_MS = 1
+
+
+class FakeResponse:
+    """
+    Successful response of the fake Telegram Bot API.
+    """
+    status_code = 200
+
+    def __init__(self, chat_id):
+        self.text = json.dumps({'ok': True, 'result': {
+            'message_id': 1, 'date': 0,
+            'chat': {'id': chat_id, 'type': 'private'}}})
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def send_request(method, url, params=None, files=None, **kwargs):
+    return FakeResponse(int((params or {}).get('chat_id', BOT_USER_ID)))
+
+
+def make_update(update_id, text):
+    """
+    Return an incoming text message update of the bot user.
+    """
+    message = {
+        'message_id': update_id,
+        'date': 0,
+        'chat': {'id': BOT_USER_ID, 'type': 'private'},
+        'from': {'id': BOT_USER_ID, 'is_bot': False, 'first_name': 'User'},
+        'text': text,
+    }
+    if text.startswith('/'):
+        message['entities'] = [{'type': 'bot_command', 'offset': 0,
+                                'length': len(text.split()[0])}]
+    return types.Update.de_json({'update_id': update_id, 'message': message})
+
+
+def make_scenarios(user, task_ids):
+    """
+    Return the scenarios as (name, function) pairs. The functions
+    take the number of the iteration and make one request.
+    """
+    api_client = make_api_client(user)
+    web_client = Client()
+    web_client.force_login(user)
+    updates = itertools.count(1)
+
+    def web_list(params, cached=True):
+        def request(number):
+            if not cached:
+                task_lists.invalidate(user.pk)
+            web_client.get('/', params)
+        return request
+
+    def api_list(params):
+        return lambda number: api_client.get('/api/v1/tasks/', params)
+
+    def api_retrieve(number):
+        api_client.get(f'/api/v1/tasks/{task_ids[number % len(task_ids)]}/')
+
+    def api_create(number):
+        api_client.post('/api/v1/tasks/', {'title': f'New task {number}'},
+                        format='json')
+
+    def api_update(number):
+        api_client.patch(
+            f'/api/v1/tasks/{task_ids[number % len(task_ids)]}/',
+            {'completed': bool(number % 2)}, format='json')
+
+    def bot_list(number):
+        task_bot.bot.process_new_updates(
+            [make_update(next(updates), '/list_tasks')])
+
+    def bot_create(number):
+        task_bot.bot.process_new_updates(
+            [make_update(next(updates), '/create_task'),
+             make_update(next(updates), f'Task{number} created by the bot')])
+
+    return [
+        ('web list', web_list({})),
+        ('web list uncached', web_list({}, cached=False)),
+        ('web list sorted by completion',
+         web_list({'sort_by': 'completed'}, cached=False)),
+        ('web list search', web_list({'search': 'task 1'}, cached=False)),
+        ('web list search by relevance',
+         web_list({'search': 'task 1', 'sort_by': 'relevance'},
+                  cached=False)),
+        ('api list', api_list({})),
+        ('api list search', api_list({'search': 'description'})),
+        ('api retrieve', api_retrieve),
+        ('api create', api_create),
+        ('api update', api_update),
+        ('bot list', bot_list),
+        ('bot create', bot_create),
+    ]
+
+
+def run_scenario(request, repeat):
+    """
+    Run the request `repeat` times and return its statistics.
+    The allocations are measured in a separate run,
+    since tracing them slows the requests down.
+    """
+    durations = []
+    queries = 0
+    for number in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            started_at = time.perf_counter()
+            request(number)
+            durations.append((time.perf_counter() - started_at) * 1000)
+        queries += len(captured)
+    allocated = 0
+    tracemalloc.start()
+    for number in range(repeat, repeat + ALLOCATION_REPEAT):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        request(number)
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return {
+        'p50': percentile(durations, 50),
+        'p95': percentile(durations, 95),
+        'p99': percentile(durations, 99),
+        'queries': queries / repeat,
+        'allocated_kb': allocated / ALLOCATION_REPEAT / 1024,
+    }
+
+
+def format_result(name, result):
+    return (f'{name:<32} p50 {result["p50"]:7.2f} ms'
+            f'  p95 {result["p95"]:7.2f} ms  p99 {result["p99"]:7.2f} ms'
+            f'  {result["queries"]:5.1f} queries'
+            f'  {result["allocated_kb"]:8.1f} KiB')
+
+
+def compare(results, baseline, latency_tolerance, allocation_tolerance):
+    """
+    Return the regressions of the results against the baseline.
+    The median latency may also exceed the baseline by LATENCY_SLACK_MS,
+    so the variations of the fastest scenarios are not regressions.
+    """
+    limits = [('p50', latency_tolerance, LATENCY_SLACK_MS),
+              ('allocated_kb', allocation_tolerance, 0)]
+    regressions = []
+    for name, result in results.items():
+        expected = baseline['results'].get(name)
+        if expected is None:
+            continue
+        if result['queries'] > expected['queries']:
+            regressions.append(
+                f'{name}: {result["queries"]:.1f} queries per request,'
+                f' {expected["queries"]:.1f} in the baseline')
+        for metric, tolerance, slack in limits:
+            if result[metric] > expected[metric] * (1 + tolerance) + slack:
+                regressions.append(
+                    f'{name}: {metric} {result[metric]:.2f},'
+                    f' {expected[metric]:.2f} in the baseline')
+    return regressions
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.set_defaults(users=20, tasks_per_user=500, repeat=100)
+    parser.add_argument('--baseline',
+                        help='Compare the results with this baseline file.')
+    parser.add_argument('--save-baseline',
+                        help='Save the results to this baseline file.')
+    parser.add_argument('--latency-tolerance', type=float, default=0.5,
+                        help='Allowed relative increase of the median'
+                             ' latencies.')
+    parser.add_argument('--allocation-tolerance', type=float, default=0.2,
+                        help='Allowed relative increase of the allocations.')
+    options = parser.parse_args()
+    data_size = {'users': options.users,
+                 'tasks_per_user': options.tasks_per_user}
+    baseline = None
+    if options.baseline:
+        with open(options.baseline) as file:
+            baseline = json.load(file)
+        if baseline['data_size'] != data_size:
+            parser.error(f'the baseline was measured with'
+                         f' {baseline["data_size"]}')
+
+    create_database(options.database)
+    user_ids = seed(options.users, options.tasks_per_user)
+    user = User.objects.get(pk=user_ids[0])
+    # The bot is used by the second seeded user.
+    User.objects.filter(pk=user_ids[1]).update(username=str(BOT_USER_ID))
+    telegram_user_ids.clear()
+    task_ids = list(Task.objects.filter(author=user).order_by(
+        'pk').values_list('pk', flat=True))
+    apihelper.CUSTOM_REQUEST_SENDER = send_request
+    task_bot.bot.token = '1:BENCHMARK'
+    task_bot.bot.rate_limiter = SendRateLimiter(global_rate=10 ** 6,
+                                                chat_rate=10 ** 6)
+
+    results = {}
+    for name, request in make_scenarios(user, task_ids):
+        # Warm up the caches and the lazy imports.
+        request(-1)
+        results[name] = run_scenario(request, options.repeat)
+        print(format_result(name, results[name]))
+
+    if options.save_baseline:
+        with open(options.save_baseline, 'w') as file:
+            json.dump({'data_size': data_size, 'results': results}, file,
+                      indent=2)
+            file.write('\n')
+    if baseline is not None:
+        regressions = compare(results, baseline, options.latency_tolerance,
+                              options.allocation_tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
+        print('No regression.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark of the outbox of the bot.
+It sends messages to a fake Telegram Bot API served on a local port,
+answering after a delay like the real one, first one at a time
+as the handlers did, then through outboxes with more and more workers.
+It reports the time the handlers spend sending, the time until all
+the messages are delivered, and the connections opened to the server.
+The rate limits are lifted, so only the sending is measured.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.utils import make_parser, setup_django
+
+setup_django()
+
+from telebot import apihelper
+
+from telegram_bot.client import RateLimitedTeleBot
+from telegram_bot.ratelimit import SendRateLimiter
+
+WORKER_COUNTS = [1, 8, 32]
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.client_ports.add(self.client_address[1])
+        content = json.dumps({'ok': True, 'result': {
+            'message_id': 1, 'date': 0,
+            'chat': {'id': 1, 'type': 'private'}}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(latency):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.lock = threading.Lock()
+    server.client_ports = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    apihelper.API_URL = (
+        f'http://127.0.0.1:{server.server_address[1]}/bot{{0}}/{{1}}')
+    return server
+
+
+def run(server, name, messages, chats, num_workers=None):
+    """
+    Send the messages to the chats, through an outbox with the number
+    of workers if it is given, and report the timings.
+    """
+    server.client_ports.clear()
+    bot = RateLimitedTeleBot('1:BENCHMARK', threaded=False,
+                             rate_limiter=SendRateLimiter(
+                                 global_rate=10 ** 6, chat_rate=10 ** 6))
+    if num_workers:
+        bot.start_outbox(num_workers=num_workers, queue_size=messages)
+    started_at = time.perf_counter()
+    for number in range(messages):
+        bot.send_message(number % chats + 1, f'Message {number}')
+    handled_at = time.perf_counter()
+    if num_workers:
+        bot.outbox.join()
+        bot.stop_outbox()
+    delivered_at = time.perf_counter()
+    print(f'{name:<20} handlers {(handled_at - started_at) * 1000:9.1f} ms'
+          f'  delivered {(delivered_at - started_at) * 1000:9.1f} ms'
+          f'  {messages / (delivered_at - started_at):8.0f} messages/s'
+          f'  {len(server.client_ports):4} connections')
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--chats', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='Response time of the fake API in seconds.')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=WORKER_COUNTS)
+    options = parser.parse_args()
+    server = start_server(options.latency)
+    try:
+        run(server, 'synchronous', options.messages, options.chats)
+        for num_workers in options.workers:
+            run(server, f'outbox {num_workers} workers', options.messages,
+                options.chats, num_workers)
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
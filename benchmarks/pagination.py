@@ -0,0 +1,54 @@
+"""
+Benchmark of the task list pagination.
+It compares page-number pagination, which counts the tasks and skips
+the previous pages with OFFSET, with keyset pagination
+at increasing page depths of one user's task list.
+"""
+
+from benchmarks.utils import (create_database, format_summary, make_parser,
+                              measure, seed, setup_django)
+
+setup_django()
+
+from django.core.paginator import Paginator
+
+from tasks.models import Task
+from tasks.pagination import KeysetPaginator
+
+PAGE_SIZE = 10
+DEPTHS = [1, 100, 1000, 10000]
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.set_defaults(users=10, tasks_per_user=100000, repeat=50)
+    options = parser.parse_args()
+    create_database(options.database)
+    print(f'Seeding {options.users * options.tasks_per_user} tasks...')
+    user_ids = seed(options.users, options.tasks_per_user)
+    queryset = Task.objects.filter(author_id=user_ids[0]).order_by(
+        '-created_at')
+    keyset_paginator = KeysetPaginator(queryset, '-created_at', PAGE_SIZE)
+    for depth in DEPTHS:
+        if (depth - 1) * PAGE_SIZE >= options.tasks_per_user:
+            break
+        # The cursor a client following the next links would hold.
+        previous_task = queryset[(depth - 1) * PAGE_SIZE - 1] if (
+            depth > 1) else None
+        cursor = (keyset_paginator.encode_cursor(previous_task, False)
+                  if previous_task else None)
+
+        def offset_page():
+            list(Paginator(queryset, PAGE_SIZE).page(depth))
+
+        def keyset_page():
+            list(keyset_paginator.page(cursor))
+
+        print(format_summary(f'page {depth} with offset',
+                             measure(offset_page, options.repeat)))
+        print(format_summary(f'page {depth} with keyset',
+                             measure(keyset_page, options.repeat)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark of the production settings.
+It serves the same requests in a process with the development
+settings, then in a process with the production settings: pages
+of the task list of a logged in user and pages of the API task list,
+from clients accepting gzip. It reports their latency percentiles
+and response sizes. Then it runs the queries of the bot handlers
+outside of requests, as the bot and the reminder scheduler do, and
+reports the SQL queries kept in memory by debug mode and the growth
+of the peak resident memory of the process.
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.utils import (create_database, make_parser, percentile,
+                              seed, setup_django)
+
+SETTINGS_MODULES = ['taskmaster.settings', 'taskmaster.settings_production']
+PASSWORD = 'benchmark-password'
+
+
+def get_peak_rss():
+    # ru_maxrss is in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(options):
+    """
+    Serve the requests with the settings of DJANGO_SETTINGS_MODULE.
+    """
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.db import connection, reset_queries
+    from django.test import Client
+    from rest_framework.authtoken.models import Token
+
+    from tasks.models import Task
+
+    create_database(options.database)
+    user_ids = seed(options.users, options.tasks_per_user)
+    user = User.objects.get(pk=user_ids[0])
+    user.set_password(PASSWORD)
+    user.save()
+    token = Token.objects.create(user=user)
+    browser = Client(HTTP_HOST='localhost', HTTP_ACCEPT_ENCODING='gzip')
+    browser.login(username=user.username, password=PASSWORD)
+    api = Client(HTTP_HOST='localhost', HTTP_ACCEPT_ENCODING='gzip',
+                 HTTP_AUTHORIZATION=f'Token {token.key}')
+    scenarios = {
+        'task list page': lambda: browser.get('/'),
+        'API task list': lambda: api.get('/api/v1/tasks/',
+                                         {'page_size': 100}),
+    }
+    for scenario in scenarios.values():
+        assert scenario().status_code == 200
+
+    print(f'{os.environ["DJANGO_SETTINGS_MODULE"]} (DEBUG={settings.DEBUG})')
+    for name, scenario in scenarios.items():
+        durations = []
+        for _ in range(options.repeat):
+            started_at = time.perf_counter()
+            response = scenario()
+            durations.append((time.perf_counter() - started_at) * 1000)
+        print(f'  {name:<16} p50 {percentile(durations, 50):7.3f} ms'
+              f'  p95 {percentile(durations, 95):7.3f} ms'
+              f'  p99 {percentile(durations, 99):7.3f} ms'
+              f'  {len(response.content):7} bytes'
+              f' {response.get("Content-Encoding", "")}')
+
+    # Only requests reset the queries kept by debug mode.
+    reset_queries()
+    rss_before = get_peak_rss()
+    started_at = time.perf_counter()
+    count = options.repeat * 10
+    for number in range(count):
+        list(Task.objects.filter(author_id=user_ids[number % len(user_ids)])
+             .values('id', 'title', 'completed', 'created_at')[:30])
+    elapsed = time.perf_counter() - started_at
+    print(f'  worker queries   {count / elapsed:7.0f} queries/s'
+          f'  {len(connection.queries)} queries kept in memory,'
+          f' peak RSS {rss_before:.1f} MiB before, {get_peak_rss():.1f} MiB'
+          f' after')
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.set_defaults(users=10, tasks_per_user=1000, repeat=2000)
+    parser.add_argument('--worker', action='store_true',
+                        help=argparse.SUPPRESS)
+    options = parser.parse_args()
+    if options.worker:
+        run(options)
+        return
+    for module in SETTINGS_MODULES:
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': module,
+               'DJANGO_ALLOWED_HOSTS': 'localhost'}
+        env.setdefault('DJANGO_SECRET_KEY', 'benchmark-secret-key')
+        env.setdefault('BOT_WEBHOOK_SECRET', 'benchmark-webhook-secret')
+        subprocess.run([sys.executable, '-m', 'benchmarks.production',
+                        '--worker', *sys.argv[1:]], env=env, check=True)
+
+
+if __name__ == '__main__':
+    main()
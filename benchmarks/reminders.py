@@ -0,0 +1,79 @@
+"""
+Benchmark of the reminder scheduler.
+It seeds the database with tasks falling due every minute, then times
+the query finding the tasks due, as run every minute by a cron job,
+with no index on the due date, and the reads of the next window
+of reminders by the scheduler from the partial index. It also reports
+the reminders sent per second, without sending them to Telegram.
+"""
+
+import time
+from datetime import timedelta
+
+from benchmarks.utils import (create_database, format_summary, make_parser,
+                              measure, seed, setup_django)
+
+setup_django()
+
+from django.db import connection
+from django.db.models import F
+
+from tasks.models import Task
+from tasks.reminders import ReminderScheduler
+
+DUE_INDEX = next(index for index in Task._meta.indexes
+                 if index.name == 'task_due_at_idx')
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.set_defaults(users=1000, tasks_per_user=1000, repeat=20)
+    options = parser.parse_args()
+    create_database(options.database)
+    print(f'Seeding {options.users * options.tasks_per_user} tasks...')
+    seed(options.users, options.tasks_per_user)
+    # The tasks of the users are due from now on, a task per minute each.
+    Task.objects.update(due_at=F('created_at') + timedelta(days=365))
+    now = Task.objects.order_by('due_at').values_list(
+        'due_at', flat=True).first() + timedelta(minutes=1)
+    print(f'{Task.objects.filter(completed=False).count()} pending'
+          f' reminders')
+
+    def scan():
+        list(Task.objects.filter(due_at__lte=now, completed=False)
+             .values_list('pk', flat=True))
+
+    with connection.schema_editor() as editor:
+        editor.remove_index(Task, DUE_INDEX)
+    print(f'\ncron scan: {Task.objects.filter(due_at__lte=now).explain()}')
+    print(format_summary('cron scan without index',
+                         measure(scan, options.repeat)))
+    with connection.schema_editor() as editor:
+        editor.add_index(Task, DUE_INDEX)
+
+    sent = []
+    clock = [now]
+    scheduler = ReminderScheduler(sent.extend, clock=lambda: clock[0])
+    scheduler.checkpoint = (now - timedelta(minutes=1), 0)
+    print(f'\nscheduler window: {scheduler.get_pending().explain()}')
+
+    def load():
+        scheduler.heap.clear()
+        scheduler.scheduled.clear()
+        scheduler.load()
+
+    print(format_summary('scheduler window read from the index',
+                         measure(load, options.repeat)))
+
+    # Send the reminders of ten minutes at once, as after a restart.
+    clock[0] = now + timedelta(minutes=10)
+    started_at = time.perf_counter()
+    while scheduler.step() == 0:
+        pass
+    elapsed = time.perf_counter() - started_at
+    print(f'\n{len(sent)} reminders sent in {elapsed * 1000:.1f} ms,'
+          f' {len(sent) / elapsed:.0f} reminders/s')
+
+
+if __name__ == '__main__':
+    main()
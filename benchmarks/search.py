@@ -0,0 +1,41 @@
+"""
+Benchmark of the task search.
+It compares the substring search with the full-text search backend
+of the database for users with many tasks.
+"""
+
+from benchmarks.utils import (create_database, format_summary, make_parser,
+                              measure, seed, setup_django)
+
+setup_django()
+
+from tasks.models import Task
+from tasks.search import ContainsSearchBackend, get_search_backend
+
+PAGE_SIZE = 10
+QUERIES = ['task 42', 'descr', 'missing']
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.set_defaults(users=10, tasks_per_user=20000)
+    options = parser.parse_args()
+    create_database(options.database)
+    print(f'Seeding {options.users * options.tasks_per_user} tasks...')
+    user_ids = seed(options.users, options.tasks_per_user)
+    backends = {'contains': ContainsSearchBackend(),
+                'full-text': get_search_backend()}
+    for query in QUERIES:
+        for name, backend in backends.items():
+            def execute():
+                queryset = backend.search(
+                    Task.objects.filter(author_id=user_ids[0]), query)
+                queryset.count()
+                list(queryset[:PAGE_SIZE])
+
+            print(format_summary(f'{name} "{query}"',
+                                 measure(execute, options.repeat)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark of the task serializers.
+It compares rendering task lists to JSON with TaskSerializer
+and with the fast read-only TaskReadSerializer, including the query,
+and checks that both render the same bytes.
+"""
+
+from benchmarks.utils import (create_database, format_summary, make_parser,
+                              measure, seed, setup_django)
+
+setup_django()
+
+from rest_framework.renderers import JSONRenderer
+
+from api.serializers import TaskReadSerializer, TaskSerializer
+from tasks.models import Task
+
+SIZES = [10, 100, 1000]
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.set_defaults(users=1, tasks_per_user=max(SIZES))
+    options = parser.parse_args()
+    create_database(options.database)
+    user_ids = seed(options.users, options.tasks_per_user)
+    renderer = JSONRenderer()
+    for size in SIZES:
+        queryset = Task.objects.filter(author_id=user_ids[0]).order_by(
+            '-created_at', '-id')[:size]
+
+        def model_serializer():
+            return renderer.render(TaskSerializer(queryset, many=True).data)
+
+        def read_serializer():
+            rows = queryset.values(*TaskReadSerializer.fields)
+            return renderer.render(TaskReadSerializer(rows, many=True).data)
+
+        assert model_serializer() == read_serializer()
+        print(format_summary(f'{size} tasks with TaskSerializer',
+                             measure(model_serializer, options.repeat)))
+        print(format_summary(f'{size} tasks with TaskReadSerializer',
+                             measure(read_serializer, options.repeat)))
+
+
+if __name__ == '__main__':
+    main()
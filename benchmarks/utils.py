@@ -0,0 +1,159 @@
+"""
+This module contains helpers shared by the benchmarks:
+setting up a throwaway database, seeding it with users and tasks,
+and measuring and reporting timings.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import timedelta
+
+import django
+
+SEED_BATCH_SIZE = 10000
+
+
+def setup_django():
+    """
+    Configure Django for a standalone benchmark script.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'taskmaster.settings')
+    django.setup()
+
+
+def make_parser(description):
+    """
+    Return an argument parser with the options common to all benchmarks.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--tasks-per-user', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument(
+        '--database', default='',
+        help='Path of the SQLite database file to create,'
+             ' an in-memory database is used by default.')
+    return parser
+
+
+def create_database(path=''):
+    """
+    Create an empty database with all migrations applied
+    and make it the default connection.
+    """
+    from django.db import connection
+    if path:
+        connection.settings_dict['TEST']['NAME'] = path
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+def seed(users, tasks_per_user, batch_size=SEED_BATCH_SIZE):
+    """
+    Insert `users` users with `tasks_per_user` tasks each and return
+    the ids of the users.
+    Tasks are inserted with raw multi-row statements, since creating
+    millions of model instances would dominate the benchmark run time.
+    """
+    from django.contrib.auth.models import User
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    from tasks.models import Task
+
+    User.objects.bulk_create(
+        [User(username=f'user{number}') for number in range(users)],
+        batch_size=batch_size)
+    user_ids = list(User.objects.order_by('pk').values_list('pk', flat=True))
+    table = connection.ops.quote_name(Task._meta.db_table)
+    sql = (f'INSERT INTO {table} (title, description, completed,'
+           f' created_at, updated_at, author_id)'
+           f' VALUES (%s, %s, %s, %s, %s, %s)')
+    start = timezone.now() - timedelta(days=365)
+    rows = []
+    randomizer = random.Random(0)
+    with transaction.atomic(), connection.cursor() as cursor:
+        for number in range(tasks_per_user):
+            for user_id in user_ids:
+                created_at = start + timedelta(
+                    seconds=number * 60 + randomizer.random())
+                updated_at = created_at + timedelta(
+                    seconds=randomizer.randrange(10 ** 6))
+                rows.append((
+                    f'Task {number}', f'Description of task {number}',
+                    randomizer.random() < 0.5,
+                    connection.ops.adapt_datetimefield_value(created_at),
+                    connection.ops.adapt_datetimefield_value(updated_at),
+                    user_id))
+                if len(rows) == batch_size:
+                    cursor.executemany(sql, rows)
+                    rows = []
+        if rows:
+            cursor.executemany(sql, rows)
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+    return user_ids
+
+
+def make_api_client(user):
+    """
+    Return an API client authenticated with a token of the user,
+    like the real clients of the API.
+    """
+    from django.test.utils import setup_test_environment
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient
+
+    setup_test_environment()
+    token, _ = Token.objects.get_or_create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    return client
+
+
+def measure(func, repeat):
+    """
+    Call `func` `repeat` times and return the durations in milliseconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - started_at) * 1000)
+    return durations
+
+
+def percentile(durations, percent):
+    """
+    Return the given percentile of the durations.
+    """
+    ordered = sorted(durations)
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def summarize(durations):
+    """
+    Return the mean and the 50th, 95th and 99th percentiles
+    of the durations.
+    """
+    return {
+        'mean': statistics.fmean(durations),
+        'p50': percentile(durations, 50),
+        'p95': percentile(durations, 95),
+        'p99': percentile(durations, 99),
+    }
+
+
+def format_summary(name, durations):
+    """
+    Return a report line with the statistics of the durations.
+    """
+    summary = summarize(durations)
+    return (f'{name:<40} mean {summary["mean"]:8.3f} ms'
+            f'  p50 {summary["p50"]:8.3f} ms'
+            f'  p95 {summary["p95"]:8.3f} ms'
+            f'  p99 {summary["p99"]:8.3f} ms')
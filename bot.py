@@ -3,41 +3,63 @@ This module contains a Telegram bot for task management.
 The bot allows users to create, update, delete, and list tasks.
 Each task is associated with the user who created it,
 and users can only manage their own tasks.
+The handlers are profiled in the performance metrics.
 """
 
+import datetime
 import os
 import sys
-import time
+import tempfile
 
 import django
-import telebot
 from telebot import types
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'taskmaster.settings')
 django.setup()
-from django.contrib.auth.models import User
+from django.conf import settings
+from django.utils import timezone
 
+from taskmaster.metrics import (bot_handler_metrics, profiled,
+                                start_metrics_server)
+from tasks.cache import task_lists
+from tasks.export import EXPORT_FORMATS, export_tasks
 from tasks.models import Task
+from tasks.pagination import InvalidCursor, KeysetPaginator
+from telegram_bot import states
+from telegram_bot.client import RateLimitedTeleBot
+from telegram_bot.dispatcher import UpdateDispatcher
+from telegram_bot.users import get_telegram_id, get_user_id, resolve_user
 
-API_REQUEST_DELAY = 1
 MAX_TITLE_LENGTH = 200
+# Exports larger than this are written to a temporary file
+# instead of memory before they are uploaded.
+EXPORT_MEMORY_SIZE = 1024 * 1024
+# Telegram refuses longer messages, measured in UTF-16 code units.
+MAX_MESSAGE_LENGTH = 4096
+LIST_PAGE_SIZE = 30
+# Prefix of the callback data of the task list buttons, followed by
+# the direction, the creation time in microseconds and the id of the task
+# the page starts after. Telegram allows only 64 bytes of callback data.
+LIST_CALLBACK_PREFIX = 'tasks:'
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+# Due dates are entered and shown in the local time of the project.
+DUE_DATE_FORMAT = '%Y-%m-%d %H:%M'
 
 TOKEN = os.getenv('TELEGRAM_TOKEN')
-if not TOKEN:
-    print('Error: Telegram token not found.'
-          ' Please set the TELEGRAM_TOKEN environment variable.')
-    sys.exit(1)
-bot = telebot.TeleBot(TOKEN)
+# Handlers are run by the dispatcher workers, not by the TeleBot thread pool.
+bot = RateLimitedTeleBot(TOKEN, threaded=False)
+conversations = states.get_state_storage()
 
 
 @bot.message_handler(commands=['start'])
+@profiled(bot_handler_metrics)
 def send_welcome(message):
     """
     Handle the /start command.
     Create a new user if the user does not exist, and send a welcome message.
     """
-    user_id = message.from_user.id
-    user, created = User.objects.get_or_create(username=str(user_id))
+    conversations.delete(message.chat.id, message.from_user.id)
+    user_id, created = resolve_user(message.from_user.id)
     if created:
         bot.reply_to(
             message,
@@ -46,36 +68,32 @@ def send_welcome(message):
     else:
         bot.reply_to(message,
                      'Welcome back! You can continue managing your tasks.')
-    time.sleep(API_REQUEST_DELAY)
 
 
 @bot.message_handler(commands=['create_task'])
+@profiled(bot_handler_metrics)
 def create_task(message):
     """
     Handle the /create_task command.
     Ask the user to enter the title and description of the new task.
     """
+    conversations.set(message.chat.id, message.from_user.id,
+                      states.State(states.CREATE_TASK))
     markup = types.ForceReply(selective=False)
     bot.send_message(
         message.chat.id,
         'Enter the title of the new task'
         ' and the task description separated by a space:',
         reply_markup=markup)
-    time.sleep(API_REQUEST_DELAY)
 
 
-@bot.message_handler(
-    func=lambda message: message.reply_to_message is not None and
-    message.reply_to_message.text ==
-    'Enter the title of the new task'
-    ' and the task description separated by a space:')
-def save_new_task(message):
+@profiled(bot_handler_metrics)
+def save_new_task(message, state):
     """
     Handle the reply to the /create_task command.
     Create a new task with the title and description provided by the user.
     """
-    user_id = message.from_user.id
-    user, created = User.objects.get_or_create(username=str(user_id))
+    user_id = get_user_id(message.from_user.id)
     split_message = message.text.split(maxsplit=1)
     if len(split_message) == 2:
         task_title, task_description = split_message
@@ -83,138 +101,366 @@ def save_new_task(message):
             bot.reply_to(message, 'The task title is too long.')
             return
         Task.objects.create(title=task_title, description=task_description,
-                            author=user)
+                            author_id=user_id)
+        conversations.delete(message.chat.id, message.from_user.id)
         bot.reply_to(message, 'Task created.')
     else:
         bot.reply_to(
             message,
             'You did not specify the task title and task description.')
-    time.sleep(API_REQUEST_DELAY)
 
 
 @bot.message_handler(commands=['update_task'])
+@profiled(bot_handler_metrics)
 def update_task(message):
     """
     Handle the /update_task command.
     Ask the user to enter the title of the task to update
     and the new task text.
     """
+    conversations.set(message.chat.id, message.from_user.id,
+                      states.State(states.UPDATE_TASK))
     markup = types.ForceReply(selective=False)
     bot.send_message(
         message.chat.id,
         ('Enter the title of the task to update'
          ' and the new task text separated by a space:'),
         reply_markup=markup)
-    time.sleep(API_REQUEST_DELAY)
 
 
-@bot.message_handler(
-    func=lambda message: message.reply_to_message is not None and
-    message.reply_to_message.text ==
-    ('Enter the title of the task to update'
-     ' and the new task text separated by a space:'))
-def modify_task(message):
+@profiled(bot_handler_metrics)
+def modify_task(message, state):
     """
     Handle the reply to the /update_task command.
     Update the task with the new text provided by the user.
     """
-    user_id = message.from_user.id
-    user, created = User.objects.get_or_create(username=str(user_id))
+    user_id = get_user_id(message.from_user.id)
     split_message = message.text.split(maxsplit=1)
     if len(split_message) == 2:
         task_title, new_task_text = split_message
-        try:
-            task = Task.objects.get(title=task_title, author=user)
-            task.text = new_task_text
-            task.save()
-            bot.reply_to(message, 'Task updated.')
-        except Task.DoesNotExist:
+        task = Task.objects.filter(title=task_title,
+                                   author_id=user_id).first()
+        if task is None:
             bot.reply_to(message, 'Task not found.')
+            return
+        task.description = new_task_text
+        task.save()
+        conversations.delete(message.chat.id, message.from_user.id)
+        bot.reply_to(message, 'Task updated.')
     else:
         bot.reply_to(message,
                      'You did not specify the task title and new task text.')
-    time.sleep(API_REQUEST_DELAY)
+
+
+@bot.message_handler(commands=['due_task'])
+@profiled(bot_handler_metrics)
+def due_task(message):
+    """
+    Handle the /due_task command.
+    Ask the user to enter the title of the task and its due date.
+    """
+    conversations.set(message.chat.id, message.from_user.id,
+                      states.State(states.SET_DUE_DATE))
+    markup = types.ForceReply(selective=False)
+    bot.send_message(
+        message.chat.id,
+        ('Enter the title of the task and its due date'
+         ' as YYYY-MM-DD HH:MM separated by a space:'),
+        reply_markup=markup)
+
+
+@profiled(bot_handler_metrics)
+def save_due_date(message, state):
+    """
+    Handle the reply to the /due_task command.
+    Set the due date of the task, the bot reminds the user of the task
+    when it is due.
+    """
+    split_message = message.text.rsplit(maxsplit=2)
+    if len(split_message) != 3:
+        bot.reply_to(message,
+                     'You did not specify the task title and its due date.')
+        return
+    task_title, date, time = split_message
+    try:
+        due_at = timezone.make_aware(datetime.datetime.strptime(
+            f'{date} {time}', DUE_DATE_FORMAT))
+    except ValueError:
+        bot.reply_to(message,
+                     'Invalid due date, enter it as YYYY-MM-DD HH:MM.')
+        return
+    user_id = get_user_id(message.from_user.id)
+    task = Task.objects.filter(title=task_title, author_id=user_id).first()
+    if task is None:
+        bot.reply_to(message, 'Task not found.')
+        return
+    task.due_at = due_at
+    task.save()
+    conversations.delete(message.chat.id, message.from_user.id)
+    bot.reply_to(message, 'Due date set.')
 
 
 @bot.message_handler(commands=['delete_task'])
+@profiled(bot_handler_metrics)
 def delete_task(message):
     """
     Handle the /delete_task command.
     Ask the user to enter the title of the task to delete.
     """
+    conversations.set(message.chat.id, message.from_user.id,
+                      states.State(states.DELETE_TASK))
     markup = types.ForceReply(selective=False)
     bot.send_message(message.chat.id, 'Enter the title of the task to delete:',
                      reply_markup=markup)
-    time.sleep(API_REQUEST_DELAY)
 
 
-@bot.message_handler(
-    func=lambda message: message.reply_to_message is not None and
-    message.reply_to_message.text == 'Enter the title of the task to delete:')
-def confirm_task_deletion(message):
+@profiled(bot_handler_metrics)
+def confirm_task_deletion(message, state):
     """
     Handle the reply to the /delete_task command.
-    Ask the user to confirm the deletion of the task.
+    Ask the user to confirm the deletion of the task
+    and remember which task is to be deleted.
     """
-    user_id = message.from_user.id
-    user, created = User.objects.get_or_create(username=str(user_id))
+    user_id = get_user_id(message.from_user.id)
     task_title = message.text.strip()
-    try:
-        Task.objects.get(title=task_title, author=user)
-        markup = types.ForceReply(selective=False)
-        bot.send_message(
-            message.chat.id,
-            (f'Are you sure you want to delete the task "{task_title}"?'
-             f' Reply with Yes or No.'),
-            reply_markup=markup)
-    except Task.DoesNotExist:
+    task_id = Task.objects.filter(
+        title=task_title, author_id=user_id).values_list(
+            'pk', flat=True).first()
+    if task_id is None:
         bot.reply_to(message, 'Task not found.')
-    time.sleep(API_REQUEST_DELAY)
+        return
+    conversations.set(message.chat.id, message.from_user.id,
+                      states.State(states.CONFIRM_DELETION, task_id))
+    markup = types.ForceReply(selective=False)
+    bot.send_message(
+        message.chat.id,
+        (f'Are you sure you want to delete the task "{task_title}"?'
+         f' Reply with Yes or No.'),
+        reply_markup=markup)
 
 
-@bot.message_handler(
-    func=lambda message: message.reply_to_message is not None and
-    message.reply_to_message.text.startswith(
-        'Are you sure you want to delete the task'))
-def remove_task(message):
+@profiled(bot_handler_metrics)
+def remove_task(message, state):
     """
     Handle the reply to the task deletion confirmation.
     Delete the task if the user confirmed the deletion.
     """
-    if message.text.lower() == 'yes':
-        user_id = message.from_user.id
-        user, created = User.objects.get_or_create(username=str(user_id))
-        task_title = message.reply_to_message.text.replace(
-            'Are you sure you want to delete the task "', '').replace(
-                '"? Reply with Yes or No.', '').strip()
-        try:
-            task = Task.objects.get(title=task_title, author=user)
-            task.delete()
+    answer = message.text.strip().lower()
+    if answer == 'yes':
+        conversations.delete(message.chat.id, message.from_user.id)
+        user_id = get_user_id(message.from_user.id)
+        deleted, _ = Task.objects.filter(
+            pk=state.task_id, author_id=user_id).delete()
+        if deleted:
             bot.reply_to(message, 'Task deleted.')
-        except Task.DoesNotExist:
+        else:
             bot.reply_to(message, 'Task not found.')
-    elif message.text.lower() == 'no':
+    elif answer == 'no':
+        conversations.delete(message.chat.id, message.from_user.id)
         bot.reply_to(message, 'Task deletion cancelled.')
     else:
         bot.reply_to(message, 'Invalid response. Please reply with Yes or No.')
-    time.sleep(API_REQUEST_DELAY)
 
 
 @bot.message_handler(commands=['list_tasks'])
+@profiled(bot_handler_metrics)
 def list_tasks(message):
     """
     Handle the /list_tasks command.
-    Send a list of the user's tasks.
-    """
-    user_id = message.from_user.id
-    user = User.objects.get(username=str(user_id))
-    tasks = Task.objects.filter(author=user).order_by('-created_at')
-    if tasks.exists():
-        response = '\n'.join([f'{task.title}' for task in tasks])
-        bot.reply_to(message, response)
-    else:
-        bot.reply_to(message, 'No tasks.')
-    time.sleep(API_REQUEST_DELAY)
+    Send the first page of the user's tasks, with buttons
+    to the next pages. The pages are cached until a task of the user
+    changes.
+    """
+    conversations.delete(message.chat.id, message.from_user.id)
+    user_id = get_user_id(message.from_user.id)
+    text, buttons = task_lists.get_or_set(
+        user_id, ('bot', None), lambda: render_task_page(user_id))
+    bot.reply_to(message, text, reply_markup=make_keyboard(buttons))
 
 
-bot.polling()
+@bot.callback_query_handler(
+    func=lambda call: (call.data or '').startswith(LIST_CALLBACK_PREFIX))
+@profiled(bot_handler_metrics)
+def turn_task_page(call):
+    """
+    Handle the buttons of the task list.
+    Replace the list with the page the button points to.
+    """
+    user_id = get_user_id(call.from_user.id)
+    try:
+        text, buttons = task_lists.get_or_set(
+            user_id, ('bot', call.data),
+            lambda: render_task_page(user_id, call.data))
+    except InvalidCursor:
+        bot.answer_callback_query(call.id, 'Invalid page.')
+        return
+    bot.edit_message_text(text, call.message.chat.id,
+                          call.message.message_id,
+                          reply_markup=make_keyboard(buttons))
+    bot.answer_callback_query(call.id)
+
+
+def render_task_page(user_id, position=None):
+    """
+    Return the text of a page of the user's tasks, newest first,
+    and its buttons as (label, callback data) pairs.
+    `position` is the callback data of a button, or None for the first
+    page. Only the tasks of the page are read, and the page is shortened
+    if it does not fit in a message.
+    """
+    paginator = KeysetPaginator(
+        Task.objects.filter(author_id=user_id).values(
+            'id', 'title', 'completed', 'created_at'),
+        '-created_at', LIST_PAGE_SIZE)
+    backwards = False
+    cursor = None
+    if position is not None:
+        created_at, task_id, backwards = decode_position(position)
+        cursor = paginator.encode_cursor(
+            {'created_at': created_at, 'id': task_id}, backwards)
+    page = paginator.page(cursor)
+    rows = page.object_list
+    if not rows:
+        return 'No tasks.', []
+    lines = [f'[{"x" if row["completed"] else " "}] {row["title"]}'
+             for row in rows]
+    # Keep the tasks next to the page the user comes from.
+    count = fit_lines(lines[::-1] if backwards else lines)
+    has_next, has_previous = page.has_next(), page.has_previous()
+    if count < len(rows):
+        if backwards:
+            rows, lines, has_previous = rows[-count:], lines[-count:], True
+        else:
+            rows, lines, has_next = rows[:count], lines[:count], True
+    buttons = []
+    if has_previous:
+        buttons.append(('« Previous', encode_position(rows[0], True)))
+    if has_next:
+        buttons.append(('Next »', encode_position(rows[-1], False)))
+    return '\n'.join(lines), buttons
+
+
+def fit_lines(lines):
+    """
+    Return the number of the first lines fitting in a message.
+    """
+    length = -1
+    for count, line in enumerate(lines):
+        length += len(line.encode('utf-16-le')) // 2 + 1
+        if length > MAX_MESSAGE_LENGTH:
+            return count
+    return len(lines)
+
+
+def encode_position(row, backwards):
+    microseconds = (row['created_at'] - EPOCH) // datetime.timedelta(
+        microseconds=1)
+    direction = 'p' if backwards else 'n'
+    return f'{LIST_CALLBACK_PREFIX}{direction}:{microseconds}:{row["id"]}'
+
+
+def decode_position(position):
+    """
+    Return the creation time and the id of the task in the callback data
+    of a button, and whether the page is before the task.
+    """
+    try:
+        direction, microseconds, task_id = position[
+            len(LIST_CALLBACK_PREFIX):].split(':')
+        created_at = EPOCH + datetime.timedelta(
+            microseconds=int(microseconds))
+        task_id = int(task_id)
+    except (ValueError, OverflowError):
+        raise InvalidCursor('Invalid cursor.')
+    if direction not in ('n', 'p'):
+        raise InvalidCursor('Invalid cursor.')
+    return created_at, task_id, direction == 'p'
+
+
+def make_keyboard(buttons):
+    if not buttons:
+        return None
+    markup = types.InlineKeyboardMarkup()
+    markup.row(*(types.InlineKeyboardButton(label, callback_data=data)
+                 for label, data in buttons))
+    return markup
+
+
+@bot.message_handler(commands=['export_tasks'])
+@profiled(bot_handler_metrics)
+def export_user_tasks(message):
+    """
+    Handle the /export_tasks command.
+    Send all the user's tasks as a document, in CSV by default
+    or in the format given after the command.
+    """
+    conversations.delete(message.chat.id, message.from_user.id)
+    arguments = message.text.split()[1:]
+    export_format = arguments[0].lower() if arguments else 'csv'
+    if export_format not in EXPORT_FORMATS:
+        bot.reply_to(message, 'Choose one of the formats: '
+                     + ', '.join(EXPORT_FORMATS) + '.')
+        return
+    user_id = get_user_id(message.from_user.id)
+    with tempfile.SpooledTemporaryFile(EXPORT_MEMORY_SIZE) as file:
+        for line in export_tasks(user_id, export_format):
+            file.write(line.encode())
+        file.seek(0)
+        bot.send_document(message.chat.id, file,
+                          reply_to_message_id=message.message_id,
+                          visible_file_name=f'tasks.{export_format}')
+
+
+REPLY_HANDLERS = {
+    states.CREATE_TASK: save_new_task,
+    states.UPDATE_TASK: modify_task,
+    states.SET_DUE_DATE: save_due_date,
+    states.DELETE_TASK: confirm_task_deletion,
+    states.CONFIRM_DELETION: remove_task,
+}
+
+
+def send_reminders(rows):
+    """
+    Send the reminders of the tasks to their authors using the bot,
+    and wait until they are sent, so the reminder scheduler records
+    them as sent only once they are.
+    """
+    for row in rows:
+        chat_id = get_telegram_id(row['author__username'])
+        if chat_id is None:
+            continue
+        due_at = timezone.localtime(row['due_at']).strftime(DUE_DATE_FORMAT)
+        bot.send_message(chat_id, f'Reminder: the task "{row["title"]}"'
+                                  f' is due at {due_at}.')
+    if bot.outbox is not None:
+        bot.outbox.join()
+
+
+@bot.message_handler(content_types=['text'])
+def handle_reply(message):
+    """
+    Handle a text message that is not a command.
+    Pass it to the handler of the operation the user was asked to reply to.
+    """
+    state = conversations.get(message.chat.id, message.from_user.id)
+    if state is not None:
+        REPLY_HANDLERS[state.operation](message, state)
+
+
+if __name__ == '__main__':
+    if not TOKEN:
+        print('Error: Telegram token not found.'
+              ' Please set the TELEGRAM_TOKEN environment variable.')
+        sys.exit(1)
+    if settings.BOT_METRICS_PORT:
+        start_metrics_server(settings.BOT_METRICS_PORT)
+    bot.remove_webhook()
+    bot.start_outbox(num_workers=settings.BOT_SEND_WORKERS,
+                     queue_size=settings.BOT_SEND_QUEUE_SIZE,
+                     max_retries=settings.BOT_SEND_MAX_RETRIES)
+    try:
+        UpdateDispatcher(bot, num_workers=settings.BOT_WORKERS,
+                         queue_size=settings.BOT_QUEUE_SIZE).polling()
+    finally:
+        bot.stop_outbox()
@@ -1,15 +1,52 @@
 """
 This module contains pytest fixtures for the 'tasks' application.
 It includes fixtures for creating a user, an author, an author client
-and a task.
+and a task, fixtures keeping the task list cache in a temporary
+directory and emptying it between tests, and fixtures loading
+the settings with given environment variables.
 """
 
+import importlib
+import sys
 from datetime import datetime
 
 import pytest
+from django.conf import settings
+from django.test import override_settings
 
+from tasks.cache import task_lists
 from tasks.models import Task
 
+PRODUCTION_SETTINGS = 'taskmaster.settings_production'
+
+
+@pytest.fixture(scope='session', autouse=True)
+def task_cache_location(tmp_path_factory):
+    """
+    Pytest fixture keeping the versions of the task lists
+    in a temporary directory during the tests, so they leave
+    the cache of the project alone, and returning the directory.
+    """
+    location = str(tmp_path_factory.mktemp('task_versions'))
+    caches = {
+        **settings.CACHES,
+        'task_versions': {**settings.CACHES['task_versions'],
+                          'LOCATION': location},
+    }
+    with override_settings(CACHES=caches):
+        yield location
+
+
+@pytest.fixture(autouse=True)
+def clear_task_lists():
+    """
+    Pytest fixture emptying the task list cache before and after
+    each test, since the ids of the users are reused by the next tests.
+    """
+    task_lists.clear()
+    yield
+    task_lists.clear()
+
 
 @pytest.fixture
 def user(client, django_user_model):
@@ -48,3 +85,27 @@ def task(db, author):
         created_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         updated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         author=author)
+
+
+@pytest.fixture
+def load_settings(monkeypatch):
+    """
+    Pytest fixture for importing a settings module again
+    with the given environment variables.
+    """
+    def load(module, **environ):
+        for name, value in environ.items():
+            monkeypatch.setenv(name, value)
+        monkeypatch.delitem(sys.modules, module, raising=False)
+        return importlib.import_module(module)
+
+    return load
+
+
+@pytest.fixture
+def load_production_settings(load_settings):
+    """
+    Pytest fixture for importing the production settings module again
+    with the given environment variables.
+    """
+    return lambda **environ: load_settings(PRODUCTION_SETTINGS, **environ)
@@ -0,0 +1,15 @@
+"""
+This module contains the SQLite database backend of the project.
+It starts transactions with BEGIN IMMEDIATE instead of BEGIN: a deferred
+transaction which reads before it writes fails at once with
+"database is locked" if another connection writes meanwhile, without
+waiting for the busy timeout, while an immediate transaction waits
+for the write lock when it begins.
+"""
+
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -0,0 +1,16 @@
+"""
+This module contains the tuning of the database connections.
+"""
+
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Run the PRAGMA statements of the SQLITE_PRAGMAS setting
+    on a new SQLite connection.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
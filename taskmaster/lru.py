@@ -0,0 +1,68 @@
+"""
+This module contains a thread-safe in-process LRU cache with expiration,
+used to keep hot lookups out of the database.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Mapping of at most `maxsize` keys whose values expire
+    `ttl` seconds after they were stored.
+    The least recently used key is evicted when the cache is full.
+    """
+    def __init__(self, maxsize=10000, ttl=300, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def get(self, key, default=None):
+        """
+        Return the value of the key, or `default` if it is missing
+        or has expired.
+        """
+        with self.lock:
+            item = self.data.get(key, MISSING)
+            if item is not MISSING:
+                value, expires_at = item
+                if expires_at > self.clock():
+                    self.data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """
+        Store the value of the key, evicting the least recently used key
+        if the cache is full.
+        """
+        with self.lock:
+            self.data[key] = (value, self.clock() + self.ttl)
+            self.data.move_to_end(key)
+            if len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Remove the key from the cache if it is there.
+        """
+        with self.lock:
+            self.data.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
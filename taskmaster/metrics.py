@@ -0,0 +1,280 @@
+"""
+This module contains the performance metrics of the project.
+Web requests and bot handlers are profiled: their wall time,
+the number and the duration of their database queries, and for
+requests the rendering time and the size of the response.
+The profiles are aggregated into histograms of this process,
+rendered in the Prometheus text format by the `/metrics` view,
+and the slow ones are logged with their SQL.
+"""
+
+import bisect
+import contextvars
+import functools
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                    0.5, 1, 2.5, 5, 10]
+QUERY_BUCKETS = [0, 1, 2, 3, 5, 10, 20, 50, 100, 200]
+SIZE_BUCKETS = [256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304]
+# Number of the queries kept per profile for the slow request log.
+MAX_LOGGED_QUERIES = 50
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# The profile of the current request or handler. Context variables are
+# copied to the threads running the queries of asynchronous views.
+current_profile = contextvars.ContextVar('current_profile', default=None)
+
+
+class Histogram:
+    """
+    Histogram of observed values per label value,
+    with cumulative counts for the upper bounds of the buckets.
+    """
+    def __init__(self, name, documentation, label, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        # Label value: (counts per bucket and +Inf, sum).
+        self.series = {}
+
+    def observe(self, label_value, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            counts, total = self.series.get(
+                label_value, ([0] * (len(self.buckets) + 1), 0))
+            counts[index] += 1
+            self.series[label_value] = (counts, total + value)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}',
+                 f'# TYPE {self.name} histogram']
+        with self.lock:
+            series = sorted((label_value, list(counts), total)
+                            for label_value, (counts, total)
+                            in self.series.items())
+        for label_value, counts, total in series:
+            labels = f'{self.label}="{escape(label_value)}"'
+            cumulative = 0
+            for bound, count in zip([*self.buckets, '+Inf'], counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}}'
+                             f' {cumulative}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total}')
+            lines.append(f'{self.name}_count{{{labels}}} {cumulative}')
+        return lines
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+
+def escape(value):
+    return (str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+class Profile:
+    """
+    Measurements of a request or a bot handler.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.started_at = time.perf_counter()
+        self.duration = 0
+        self.query_count = 0
+        self.query_duration = 0
+        self.queries = []
+        self.render_duration = None
+        self.response_size = None
+
+    def __call__(self, execute, sql, params, many, context):
+        """
+        Run a query as a database execute wrapper, measuring it.
+        """
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started_at
+            self.query_count += 1
+            self.query_duration += duration
+            if len(self.queries) < MAX_LOGGED_QUERIES:
+                self.queries.append((duration, sql))
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    """
+    Database execute wrapper measuring the queries of the current profile.
+    """
+    current = current_profile.get()
+    if current is None:
+        return execute(sql, params, many, context)
+    return current(execute, sql, params, many, context)
+
+
+def install_execute_wrapper(sender, connection, **kwargs):
+    """
+    Install the execute wrapper on a new database connection.
+    """
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
+
+
+@contextmanager
+def profile(metrics, name=None):
+    """
+    Profile the enclosed code and record the profile in the metrics
+    on exit. The Profile is yielded, so the code can complete it,
+    for example with its name when it is not known in advance.
+    """
+    current = Profile(name)
+    token = current_profile.set(current)
+    try:
+        yield current
+    finally:
+        current_profile.reset(token)
+        current.duration = time.perf_counter() - current.started_at
+        metrics.record(current)
+
+
+class ProfileMetrics:
+    """
+    Histograms of the profiles of web requests or bot handlers,
+    identified by a label such as the view name.
+    """
+    def __init__(self, prefix, label):
+        self.prefix = prefix
+        self.label = label
+        self.duration = Histogram(
+            f'{prefix}_duration_seconds', 'Wall time.', label,
+            DURATION_BUCKETS)
+        self.queries = Histogram(
+            f'{prefix}_queries', 'Number of database queries.', label,
+            QUERY_BUCKETS)
+        self.query_duration = Histogram(
+            f'{prefix}_query_duration_seconds',
+            'Time spent in database queries.', label, DURATION_BUCKETS)
+        self.histograms = [self.duration, self.queries, self.query_duration]
+
+    def record(self, current):
+        """
+        Add the profile to the histograms and log it if it is slow.
+        """
+        self.duration.observe(current.name, current.duration)
+        self.queries.observe(current.name, current.query_count)
+        self.query_duration.observe(current.name, current.query_duration)
+        if (current.duration >= settings.SLOW_REQUEST_SECONDS
+                and random.random() < settings.SLOW_REQUEST_LOG_RATE):
+            log_slow(self.label, current)
+
+
+class RequestMetrics(ProfileMetrics):
+    """
+    Histograms of the profiles of web requests,
+    with their rendering time and response size.
+    """
+    def __init__(self, prefix, label):
+        super().__init__(prefix, label)
+        self.render_duration = Histogram(
+            f'{prefix}_render_duration_seconds',
+            'Time spent rendering the response.', label, DURATION_BUCKETS)
+        self.response_size = Histogram(
+            f'{prefix}_response_size_bytes', 'Size of the response body.',
+            label, SIZE_BUCKETS)
+        self.histograms += [self.render_duration, self.response_size]
+
+    def record(self, current):
+        super().record(current)
+        if current.render_duration is not None:
+            self.render_duration.observe(current.name,
+                                         current.render_duration)
+        if current.response_size is not None:
+            self.response_size.observe(current.name, current.response_size)
+
+
+def profiled(metrics):
+    """
+    Decorator recording the profiles of a function, like a bot handler,
+    under its name.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with profile(metrics, function.__name__):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def log_slow(label, current):
+    queries = '\n'.join(f'  {duration * 1000:.1f} ms {sql}'
+                        for duration, sql in current.queries)
+    logger.warning('Slow %s %s: %.1f ms, %d queries in %.1f ms\n%s',
+                   label, current.name, current.duration * 1000,
+                   current.query_count, current.query_duration * 1000,
+                   queries)
+
+
+request_metrics = RequestMetrics('taskmaster_request', 'view')
+bot_handler_metrics = ProfileMetrics('taskmaster_bot_handler', 'handler')
+# Functions returning more lines of metrics, like counters of other modules.
+collectors = []
+
+
+def render():
+    """
+    Return all the metrics in the Prometheus text format.
+    """
+    lines = []
+    for histogram in [*request_metrics.histograms,
+                      *bot_handler_metrics.histograms]:
+        lines += histogram.render()
+    for collector in collectors:
+        lines += collector()
+    return '\n'.join(lines) + '\n'
+
+
+def render_counter(name, documentation, value):
+    return [f'# HELP {name} {documentation}', f'# TYPE {name} counter',
+            f'{name} {value}']
+
+
+def render_gauge(name, documentation, value):
+    return [f'# HELP {name} {documentation}', f'# TYPE {name} gauge',
+            f'{name} {value}']
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port):
+    """
+    Serve the metrics on the port in a background thread,
+    for processes without the web application, like the polling bot.
+    """
+    server = ThreadingHTTPServer(('', port), MetricsRequestHandler)
+    threading.Thread(target=server.serve_forever, name='MetricsServer',
+                     daemon=True).start()
+    return server
@@ -0,0 +1,59 @@
+"""
+This module contains the middleware of the project.
+"""
+
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from taskmaster import metrics
+
+
+class PerformanceMiddleware:
+    """
+    Middleware profiling every request under the name of its view:
+    wall time, database queries, rendering time and response size.
+    It should come first in MIDDLEWARE to include the other middleware.
+    It supports both synchronous and asynchronous requests,
+    so asynchronous views are not run through a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with metrics.profile(metrics.request_metrics) as current:
+            request.profile = current
+            response = self.get_response(request)
+            self.complete_profile(request, response, current)
+        return response
+
+    async def __acall__(self, request):
+        with metrics.profile(metrics.request_metrics) as current:
+            request.profile = current
+            response = await self.get_response(request)
+            self.complete_profile(request, response, current)
+        return response
+
+    @staticmethod
+    def complete_profile(request, response, current):
+        match = request.resolver_match
+        current.name = match.view_name if match else 'unresolved'
+        if not response.streaming:
+            current.response_size = len(response.content)
+
+    def process_template_response(self, request, response):
+        started_at = time.perf_counter()
+
+        def rendered(response):
+            request.profile.render_duration = (time.perf_counter()
+                                               - started_at)
+
+        response.add_post_render_callback(rendered)
+        return response
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'tasks.apps.TasksConfig',
     'api.apps.ApiConfig',
+    'telegram_bot.apps.TelegramBotConfig',
     'rest_framework',
     'rest_framework.authtoken',
     'djoser',
@@ -46,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'taskmaster.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -79,11 +82,46 @@ WSGI_APPLICATION = 'taskmaster.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# The database is chosen with the DATABASE_ENGINE environment variable:
+# 'sqlite' (the default) or 'postgresql'.
+
+DATABASE_ENGINE = os.getenv('DATABASE_ENGINE', 'sqlite')
+
+if DATABASE_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DATABASE_NAME', 'taskmaster'),
+            'USER': os.getenv('DATABASE_USER', ''),
+            'PASSWORD': os.getenv('DATABASE_PASSWORD', ''),
+            'HOST': os.getenv('DATABASE_HOST', ''),
+            'PORT': os.getenv('DATABASE_PORT', ''),
+            # Every thread keeps its connection open between requests.
+            'CONN_MAX_AGE': int(os.getenv('DATABASE_CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+            # Server-side cursors do not work through a pooler
+            # in transaction mode, like PgBouncer.
+            'DISABLE_SERVER_SIDE_CURSORS': os.getenv(
+                'DATABASE_POOLER', '').lower() in ('1', 'true', 'yes'),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'taskmaster.backends.sqlite3',
+            'NAME': os.getenv('DATABASE_NAME', BASE_DIR / 'db.sqlite3'),
+        }
     }
+
+# PRAGMA statements run on every new SQLite connection.
+# With the write-ahead log, readers and the writer do not block each other,
+# and the log is synchronized to the disk at checkpoints only.
+# A connection waits busy_timeout milliseconds for the lock of another one.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'wal'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'normal'),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 20000)),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
 }
 
 
@@ -124,6 +162,9 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.2/howto/static-files/
 
 STATIC_URL = '/static/'
+# Serve the static files collected to STATIC_ROOT from the application,
+# see taskmaster.settings_production.
+SERVE_STATIC = False
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
@@ -132,11 +173,76 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
 }
 
+# Name of the cache sharing the API tokens between the processes, the tokens
+# are only cached in the process memory if it is empty. A token deleted
+# or a user deactivated in one process is still accepted by the others
+# for API_TOKEN_CACHE_TTL seconds at most.
+API_TOKEN_CACHE = os.getenv('API_TOKEN_CACHE', '')
+API_TOKEN_CACHE_TTL = int(os.getenv('API_TOKEN_CACHE_TTL', 60))
+
 LOGIN_URL = 'tasks:login'
+
+# Dotted path of the task search backend class,
+# by default it is chosen by the database vendor.
+TASK_SEARCH_BACKEND = None
+
+# Caches
+# The task lists are cached in the memory of each process, under
+# versions kept in files shared by the processes of the host, the web
+# application and the bot, so a task changed by one of them invalidates
+# the lists cached by the others. The directory of the versions is set
+# by TASK_CACHE_LOCATION.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'tasks': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tasks',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'task_versions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('TASK_CACHE_LOCATION',
+                              BASE_DIR / 'cache' / 'task_versions'),
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+# Names of the caches of the task lists and of their versions, which must
+# be shared by the processes, and lifetime of the cached lists in seconds.
+# The lists are also invalidated when the tasks change.
+TASK_LIST_CACHE = 'tasks'
+TASK_LIST_VERSION_CACHE = 'task_versions'
+TASK_LIST_CACHE_TIMEOUT = int(os.getenv('TASK_LIST_CACHE_TIMEOUT', 300))
+
+# Performance metrics
+# Requests and bot handlers slower than SLOW_REQUEST_SECONDS are logged
+# with their SQL, with the probability SLOW_REQUEST_LOG_RATE.
+# If METRICS_TOKEN is set, /metrics requires it as a bearer token.
+
+SLOW_REQUEST_SECONDS = float(os.getenv('SLOW_REQUEST_SECONDS', 0.5))
+SLOW_REQUEST_LOG_RATE = float(os.getenv('SLOW_REQUEST_LOG_RATE', 1))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Telegram bot
+BOT_WORKERS = int(os.getenv('BOT_WORKERS', 8))
+BOT_QUEUE_SIZE = int(os.getenv('BOT_QUEUE_SIZE', 1000))
+# Outgoing messages are queued and sent by their own pool of workers.
+BOT_SEND_WORKERS = int(os.getenv('BOT_SEND_WORKERS', 8))
+BOT_SEND_QUEUE_SIZE = int(os.getenv('BOT_SEND_QUEUE_SIZE', 1000))
+BOT_SEND_MAX_RETRIES = int(os.getenv('BOT_SEND_MAX_RETRIES', 5))
+BOT_WEBHOOK_SECRET = os.getenv('BOT_WEBHOOK_SECRET', '')
+# Name of the cache keeping the bot conversation states,
+# the states are kept in the process memory if it is empty.
+BOT_STATE_CACHE = os.getenv('BOT_STATE_CACHE', '')
+# Port serving the metrics of the polling bot, which has no web server.
+BOT_METRICS_PORT = int(os.getenv('BOT_METRICS_PORT', 0))
@@ -0,0 +1,86 @@
+"""
+Django settings for taskmaster in production.
+
+They extend the development settings of taskmaster.settings and are
+selected with the DJANGO_SETTINGS_MODULE environment variable:
+
+    DJANGO_SETTINGS_MODULE=taskmaster.settings_production
+
+Debug mode is off, so long-running workers do not keep the SQL of
+their queries in memory, templates are compiled once per process,
+static files are served with far-future cache headers and responses
+are compressed.
+The DJANGO_SECRET_KEY, DJANGO_ALLOWED_HOSTS and BOT_WEBHOOK_SECRET
+environment variables are required.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from taskmaster.settings import *  # noqa: F401,F403
+from taskmaster.settings import BASE_DIR, MIDDLEWARE, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.getenv('DJANGO_SECRET_KEY', '')
+if not SECRET_KEY:
+    raise ImproperlyConfigured(
+        'Set the DJANGO_SECRET_KEY environment variable.')
+
+# Comma-separated host names, for example 'example.com,www.example.com'.
+ALLOWED_HOSTS = [host.strip() for host
+                 in os.getenv('DJANGO_ALLOWED_HOSTS', '').split(',')
+                 if host.strip()]
+if not ALLOWED_HOSTS:
+    raise ImproperlyConfigured(
+        'Set the DJANGO_ALLOWED_HOSTS environment variable.')
+
+# Secret token of the requests of Telegram to the bot webhook.
+BOT_WEBHOOK_SECRET = os.getenv('BOT_WEBHOOK_SECRET', '')
+if not BOT_WEBHOOK_SECRET:
+    raise ImproperlyConfigured(
+        'Set the BOT_WEBHOOK_SECRET environment variable.')
+
+# Responses larger than 200 bytes are compressed for the clients
+# accepting gzip, after the profiling of the request
+# so the profiled response size is the size sent.
+MIDDLEWARE = [MIDDLEWARE[0], 'django.middleware.gzip.GZipMiddleware',
+              *MIDDLEWARE[1:]]
+
+# Templates are compiled on their first use and kept in memory.
+# The cached loader needs APP_DIRS to be off.
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+# Sessions are read from the database. The cached_db engine would cache
+# them in the default cache, which is local to each process, so the other
+# workers would keep serving a session after a logout or a key rotation.
+SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+
+# Static files are collected to STATIC_ROOT with `collectstatic`,
+# under names including a hash of their content.
+STATIC_ROOT = os.getenv('STATIC_ROOT', BASE_DIR / 'staticfiles')
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': ('django.contrib.staticfiles.storage'
+                    '.ManifestStaticFilesStorage'),
+    },
+}
+# Serve the static files from the application, set it to 0
+# when a web server serves STATIC_ROOT at STATIC_URL.
+SERVE_STATIC = bool(int(os.getenv('SERVE_STATIC', 1)))
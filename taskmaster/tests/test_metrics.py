@@ -0,0 +1,123 @@
+"""
+This module contains tests for the performance metrics.
+"""
+
+import logging
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from taskmaster import metrics
+from tasks.models import Task
+
+METRICS_URL = reverse('metrics')
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    """
+    Pytest fixture emptying the histograms after each test.
+    """
+    yield
+    for histogram in [*metrics.request_metrics.histograms,
+                      *metrics.bot_handler_metrics.histograms]:
+        histogram.clear()
+
+
+def get_samples(client):
+    """
+    Return the samples of the metrics as a dictionary.
+    """
+    response = client.get(METRICS_URL)
+    assert response.status_code == HTTPStatus.OK
+    samples = {}
+    for line in response.content.decode().splitlines():
+        if not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_requests_are_profiled(author_client, author):
+    """
+    Test that the wall time, the queries, the rendering time
+    and the response size of a request are recorded under its view.
+    """
+    Task.objects.bulk_create([Task(title=f'Task {number}', author=author)
+                              for number in range(3)])
+
+    response = author_client.get(reverse('tasks:task_list'))
+    samples = get_samples(author_client)
+
+    labels = '{view="tasks:task_list"}'
+    assert samples[f'taskmaster_request_duration_seconds_count{labels}'] == 1
+    assert samples[f'taskmaster_request_queries_sum{labels}'] >= 1
+    assert samples[
+        f'taskmaster_request_render_duration_seconds_count{labels}'] == 1
+    assert samples[f'taskmaster_request_response_size_bytes_sum{labels}'] == (
+        len(response.content))
+    assert samples['taskmaster_task_list_cache_misses_total'] >= 1
+
+
+def test_slow_requests_are_logged_with_sql(author_client, settings, caplog):
+    """
+    Test that a slow request is logged with its queries.
+    """
+    settings.SLOW_REQUEST_SECONDS = 0
+
+    with caplog.at_level(logging.WARNING, logger='taskmaster.metrics'):
+        author_client.get(reverse('tasks:task_list'))
+
+    assert 'Slow view tasks:task_list' in caplog.text
+    assert 'SELECT' in caplog.text
+
+
+def test_bot_handlers_are_profiled(client, db):
+    """
+    Test that the profiled functions are recorded under their names.
+    """
+    @metrics.profiled(metrics.bot_handler_metrics)
+    def list_tasks():
+        return Task.objects.count()
+
+    list_tasks()
+    samples = get_samples(client)
+
+    labels = '{handler="list_tasks"}'
+    assert samples[f'taskmaster_bot_handler_queries_sum{labels}'] == 1
+    assert samples[
+        f'taskmaster_bot_handler_duration_seconds_bucket'
+        f'{{handler="list_tasks",le="+Inf"}}'] == 1
+
+
+def test_metrics_token(client, settings):
+    """
+    Test that the metrics require the token when it is set.
+    """
+    settings.METRICS_TOKEN = 'secret'
+
+    assert client.get(METRICS_URL).status_code == HTTPStatus.FORBIDDEN
+    response = client.get(METRICS_URL, HTTP_AUTHORIZATION='Bearer secret')
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_asynchronous_requests_are_profiled(author_client, author):
+    """
+    Test that the queries of asynchronous views, run in other threads,
+    are recorded under the view.
+    """
+    token = Token.objects.create(user=author)
+
+    response = async_to_sync(AsyncClient().get)(
+        reverse('api:async-task-list'),
+        headers={'Authorization': f'Token {token.key}'})
+    samples = get_samples(author_client)
+
+    labels = '{view="api:async-task-list"}'
+    assert response.status_code == HTTPStatus.OK
+    assert samples[f'taskmaster_request_duration_seconds_count{labels}'] == 1
+    assert samples[f'taskmaster_request_queries_sum{labels}'] == 3
@@ -0,0 +1,122 @@
+"""
+This module contains tests for the database settings, the production
+settings and the static files view.
+"""
+
+import gzip
+import json
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db.utils import load_backend
+from django.test import Client
+from django.urls import reverse
+
+from tasks.models import Task
+from taskmaster.views import STATIC_MAX_AGE, static_view
+
+
+@pytest.mark.parametrize('pooler, disabled', [
+    ('', False), ('0', False), ('false', False), ('no', False),
+    ('1', True), ('true', True), ('Yes', True),
+])
+def test_postgresql_settings(load_settings, pooler, disabled):
+    """
+    Test that the PostgreSQL database is configured from the environment,
+    its driver is installed, and server-side cursors are disabled
+    behind a pooler only.
+    """
+    base = load_settings('taskmaster.settings', DATABASE_ENGINE='postgresql',
+                         DATABASE_NAME='tasks', DATABASE_POOLER=pooler)
+    database = base.DATABASES['default']
+
+    assert database['ENGINE'] == 'django.db.backends.postgresql'
+    assert database['NAME'] == 'tasks'
+    assert database['DISABLE_SERVER_SIDE_CURSORS'] is disabled
+    assert load_backend(database['ENGINE']).DatabaseWrapper.vendor == (
+        'postgresql')
+
+
+def test_production_settings(load_production_settings):
+    """
+    Test that the production settings turn off debug mode and enable
+    the cached templates and compression, and keep the sessions
+    in the database.
+    """
+    production = load_production_settings(
+        DJANGO_SECRET_KEY='secret',
+        DJANGO_ALLOWED_HOSTS='example.com, www.example.com',
+        BOT_WEBHOOK_SECRET='webhook-secret')
+
+    assert production.DEBUG is False
+    assert production.ALLOWED_HOSTS == ['example.com', 'www.example.com']
+    assert production.MIDDLEWARE[:2] == [
+        'taskmaster.middleware.PerformanceMiddleware',
+        'django.middleware.gzip.GZipMiddleware']
+    assert production.TEMPLATES[0]['OPTIONS']['loaders'][0][0] == (
+        'django.template.loaders.cached.Loader')
+    assert production.SESSION_ENGINE == (
+        'django.contrib.sessions.backends.db')
+
+
+@pytest.mark.parametrize('environ', [
+    {'DJANGO_SECRET_KEY': '', 'DJANGO_ALLOWED_HOSTS': 'example.com',
+     'BOT_WEBHOOK_SECRET': 'webhook-secret'},
+    {'DJANGO_SECRET_KEY': 'secret', 'DJANGO_ALLOWED_HOSTS': ' , ',
+     'BOT_WEBHOOK_SECRET': 'webhook-secret'},
+    {'DJANGO_SECRET_KEY': 'secret', 'DJANGO_ALLOWED_HOSTS': 'example.com',
+     'BOT_WEBHOOK_SECRET': ''},
+])
+def test_production_settings_require_environment(load_production_settings,
+                                                 environ):
+    """
+    Test that the production settings refuse to run with the development
+    secret key, without allowed hosts or without a webhook secret.
+    """
+    with pytest.raises(ImproperlyConfigured):
+        load_production_settings(**environ)
+
+
+def test_large_responses_are_compressed(load_production_settings,
+                                        settings, author):
+    """
+    Test that the responses are compressed for the clients accepting it.
+    """
+    production = load_production_settings(
+        DJANGO_SECRET_KEY='secret', DJANGO_ALLOWED_HOSTS='example.com',
+        BOT_WEBHOOK_SECRET='webhook-secret')
+    settings.MIDDLEWARE = production.MIDDLEWARE
+    Task.objects.bulk_create([Task(title=f'Task {number}', author=author)
+                              for number in range(10)])
+    client = Client()
+    client.force_login(author)
+
+    response = client.get(reverse('tasks:task_list'),
+                          HTTP_ACCEPT_ENCODING='gzip')
+
+    assert response['Content-Encoding'] == 'gzip'
+    assert 'Task 9' in gzip.decompress(response.content).decode()
+
+
+def test_static_files_with_hashed_names_are_cached(
+        load_production_settings, settings, tmp_path, rf):
+    """
+    Test that the static files with a hash in their name are cached
+    for a long time, and the others revalidated.
+    """
+    production = load_production_settings(
+        DJANGO_SECRET_KEY='secret', DJANGO_ALLOWED_HOSTS='example.com',
+        BOT_WEBHOOK_SECRET='webhook-secret')
+    (tmp_path / 'app.css').write_text('body {}')
+    (tmp_path / 'app.0123456789ab.css').write_text('body {}')
+    (tmp_path / 'staticfiles.json').write_text(json.dumps({
+        'version': '1.1', 'paths': {'app.css': 'app.0123456789ab.css'}}))
+    settings.STATIC_ROOT = tmp_path
+    settings.STORAGES = production.STORAGES
+
+    hashed = static_view(rf.get('/'), 'app.0123456789ab.css')
+    unhashed = static_view(rf.get('/'), 'app.css')
+
+    assert hashed['Cache-Control'] == (
+        f'public, max-age={STATIC_MAX_AGE}, immutable')
+    assert unhashed['Cache-Control'] == 'no-cache'
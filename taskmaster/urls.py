@@ -1,16 +1,21 @@
 """
 This module defines the main URL configurations for the project.
 It includes paths for the admin site, the 'tasks' application,
-the 'api' application, and the API documentation.
+the 'api' application, the Telegram bot webhook,
+the performance metrics and the API documentation.
 The API documentation is generated using the drf_yasg library.
+The static files are served too if the SERVE_STATIC setting is set.
 """
 
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path, re_path
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
 
+from taskmaster.views import metrics_view, static_view
+
 schema_view = get_schema_view(
    openapi.Info(
       title='Task Manager',
@@ -28,6 +33,13 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('tasks.urls', namespace='tasks')),
     path('api/v1/', include('api.urls', namespace='api')),
+    path('telegram/', include('telegram_bot.urls', namespace='telegram_bot')),
+    path('metrics', metrics_view, name='metrics'),
     re_path(r'^redoc/$', schema_view.with_ui('redoc', cache_timeout=0),
             name='schema-redoc'),
 ]
+
+if settings.SERVE_STATIC:
+    urlpatterns.append(re_path(
+        rf'^{settings.STATIC_URL.strip("/")}/(?P<path>.+)$', static_view,
+        name='static'))
@@ -0,0 +1,46 @@
+"""
+This module contains the views of the project itself.
+"""
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.cache import patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.views.static import serve
+
+from taskmaster import metrics
+
+# Browsers keep the static files with hashed names for a year.
+STATIC_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def metrics_view(request):
+    """
+    Return the performance metrics of this process
+    in the Prometheus text format.
+    If the METRICS_TOKEN setting is set, the request must be authorized
+    with it as a bearer token.
+    """
+    token = settings.METRICS_TOKEN
+    if token and not constant_time_compare(
+            request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+def static_view(request, path):
+    """
+    Serve a static file collected to STATIC_ROOT.
+    The names of the files of the manifest include a hash of their
+    content, so they never change and are cached for STATIC_MAX_AGE.
+    The other files are revalidated on every use.
+    """
+    response = serve(request, path, document_root=settings.STATIC_ROOT)
+    hashed_names = getattr(staticfiles_storage, 'hashed_files', {})
+    if path in hashed_names.values():
+        patch_cache_control(response, public=True, max_age=STATIC_MAX_AGE,
+                            immutable=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
@@ -1,6 +1,28 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save
 
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        from taskmaster import metrics
+        from taskmaster.db import configure_sqlite
+        from tasks.cache import render_metrics
+        from tasks.models import Task
+        from tasks.search import repair_search_index
+        from tasks.signals import invalidate_task_lists, record_task_deletion
+        post_migrate.connect(repair_search_index, sender=self)
+        post_delete.connect(record_task_deletion, sender=Task,
+                            dispatch_uid='tasks_record_task_deletion')
+        post_save.connect(invalidate_task_lists, sender=Task,
+                          dispatch_uid='tasks_invalidate_task_lists')
+        post_delete.connect(invalidate_task_lists, sender=Task,
+                            dispatch_uid='tasks_invalidate_deleted_task_lists')
+        connection_created.connect(configure_sqlite,
+                                   dispatch_uid='taskmaster_configure_sqlite')
+        metrics.collectors.append(render_metrics)
+        connection_created.connect(metrics.install_execute_wrapper,
+                                   dispatch_uid='taskmaster_execute_wrapper')
@@ -0,0 +1,125 @@
+"""
+This module contains the cache of the task lists of the users.
+The lists are cached under keys including a version number per user,
+which is incremented whenever a task of the user changes,
+so all the cached lists of the user are invalidated at once
+and the lists of the other users are left alone.
+The lists may be kept in the memory of each process, configured by
+the TASK_LIST_CACHE setting, while the versions are kept in a cache
+shared by the processes, configured by the TASK_LIST_VERSION_CACHE
+setting, so the lists cached by a process are invalidated by the others.
+"""
+
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from taskmaster.metrics import render_counter
+
+MISSING = object()
+
+
+class TaskListCache:
+    """
+    Cache of the task lists, or any value computed from the tasks
+    of a user, identified by the user and a tuple of parameters
+    such as the sort order, the search query and the page.
+    The `hits` and `misses` counters are kept per process.
+    """
+    def __init__(self, alias=None, timeout=None, version_alias=None):
+        self.alias = alias
+        self.timeout = timeout
+        self.version_alias = version_alias
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias or settings.TASK_LIST_CACHE]
+
+    @property
+    def versions(self):
+        return caches[self.version_alias
+                      or settings.TASK_LIST_VERSION_CACHE]
+
+    @staticmethod
+    def version_key(user_id):
+        return f'tasks:{user_id}:version'
+
+    def get_version(self, user_id):
+        """
+        Return the version of the task lists of the user.
+        A missing version, never set or evicted, is started
+        from the current time, so it is newer than any lost version.
+        """
+        key = self.version_key(user_id)
+        version = self.versions.get(key)
+        if version is None:
+            self.versions.add(key, time.time_ns(), timeout=None)
+            version = self.versions.get(key)
+        return version
+
+    def make_key(self, user_id, params):
+        digest = hashlib.md5(repr(params).encode()).hexdigest()
+        return f'tasks:{user_id}:{self.get_version(user_id)}:{digest}'
+
+    def get_or_set(self, user_id, params, compute):
+        """
+        Return the cached value for the user and the parameters,
+        computing and caching it with `compute()` if it is missing.
+        """
+        key = self.make_key(user_id, params)
+        value = self.cache.get(key, MISSING)
+        if value is not MISSING:
+            with self.lock:
+                self.hits += 1
+            return value
+        with self.lock:
+            self.misses += 1
+        value = compute()
+        self.cache.set(key, value, self.timeout
+                       or settings.TASK_LIST_CACHE_TIMEOUT)
+        return value
+
+    def invalidate(self, user_id):
+        """
+        Invalidate the cached lists of the user.
+        In a transaction, they are invalidated again after the commit,
+        so lists read concurrently before the commit are not kept.
+        """
+        self.bump_version(user_id)
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: self.bump_version(user_id))
+
+    def bump_version(self, user_id):
+        try:
+            self.versions.incr(self.version_key(user_id))
+        except ValueError:
+            self.get_version(user_id)
+
+    def clear(self):
+        self.cache.clear()
+        self.versions.clear()
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
+
+
+task_lists = TaskListCache()
+
+
+def render_metrics():
+    """
+    Return the counters of the task list cache in the Prometheus format.
+    """
+    return [*render_counter('taskmaster_task_list_cache_hits_total',
+                            'Task lists read from the cache.',
+                            task_lists.hits),
+            *render_counter('taskmaster_task_list_cache_misses_total',
+                            'Task lists missing from the cache.',
+                            task_lists.misses)]
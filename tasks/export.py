@@ -0,0 +1,134 @@
+"""
+This module contains the export of all the tasks of a user
+as JSON, NDJSON (one JSON object per line) or CSV.
+The exports are generated line by line from a database iterator,
+so their memory use does not depend on the number of the tasks
+and they can be streamed to the client as they are produced.
+The exports are iterated synchronously under WSGI and in the bot,
+and asynchronously under ASGI, which would otherwise consume
+a synchronous iterator in a list before sending it.
+"""
+
+import csv
+import json
+
+from tasks.models import Task
+
+# Number of the rows fetched from the database at once.
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FIELDS = ['id', 'title', 'description', 'completed', 'due_at',
+                 'created_at', 'updated_at']
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+EXPORT_FORMATS = list(CONTENT_TYPES)
+
+
+class Echo:
+    """
+    File-like object returning what is written to it,
+    so csv.writer produces the lines instead of writing them.
+    """
+    def write(self, value):
+        return value
+
+
+class NDJSONExporter:
+    """
+    Exporter of the rows as JSON objects, one per line.
+    `start()` and `end()` return the text before and after the rows,
+    and `format()` the lines of a row.
+    """
+    def start(self):
+        return ''
+
+    def format(self, row):
+        return json.dumps(row, ensure_ascii=False) + '\n'
+
+    def end(self):
+        return ''
+
+
+class JSONExporter(NDJSONExporter):
+    """
+    Exporter of the rows as a JSON array.
+    """
+    def __init__(self):
+        self.separator = '[\n'
+
+    def format(self, row):
+        line = self.separator + json.dumps(row, ensure_ascii=False)
+        self.separator = ',\n'
+        return line
+
+    def end(self):
+        return '[]\n' if self.separator == '[\n' else '\n]\n'
+
+
+class CSVExporter(NDJSONExporter):
+    """
+    Exporter of the rows as CSV lines under a header.
+    """
+    def __init__(self):
+        self.writer = csv.writer(Echo())
+
+    def start(self):
+        return self.writer.writerow(EXPORT_FIELDS)
+
+    def format(self, row):
+        return self.writer.writerow([row[name] for name in EXPORT_FIELDS])
+
+
+EXPORTERS = {
+    'json': JSONExporter,
+    'ndjson': NDJSONExporter,
+    'csv': CSVExporter,
+}
+
+
+def get_rows(user_id):
+    """
+    Return the queryset of the rows of the tasks of the user,
+    newest first.
+    """
+    return Task.objects.filter(author_id=user_id).order_by(
+        '-created_at', '-id').values(*EXPORT_FIELDS)
+
+
+def format_dates(row):
+    """
+    Return the row with the datetimes in the ISO 8601 format.
+    """
+    row['created_at'] = row['created_at'].isoformat()
+    row['updated_at'] = row['updated_at'].isoformat()
+    if row['due_at'] is not None:
+        row['due_at'] = row['due_at'].isoformat()
+    return row
+
+
+def export_tasks(user_id, export_format, chunk_size=None):
+    """
+    Iterate over the lines of the export of the tasks of the user
+    in the format, one of EXPORT_FORMATS.
+    """
+    exporter = EXPORTERS[export_format]()
+    yield exporter.start()
+    for row in get_rows(user_id).iterator(
+            chunk_size=chunk_size or EXPORT_CHUNK_SIZE):
+        yield exporter.format(format_dates(row))
+    yield exporter.end()
+
+
+async def aexport_tasks(user_id, export_format, chunk_size=None):
+    """
+    Asynchronous version of `export_tasks()`, reading the rows
+    a chunk at a time without blocking the event loop.
+    """
+    exporter = EXPORTERS[export_format]()
+    yield exporter.start()
+    async for row in get_rows(user_id).aiterator(
+            chunk_size=chunk_size or EXPORT_CHUNK_SIZE):
+        yield exporter.format(format_dates(row))
+    yield exporter.end()
@@ -13,11 +13,16 @@ from tasks.models import Task
 class TaskForm(forms.ModelForm):
     """
     Form for creating a new task.
-    The form includes fields for the task's title and description.
+    The form includes fields for the task's title, description
+    and due date.
     """
     class Meta:
         model = Task
-        fields = ['title', 'description']
+        fields = ['title', 'description', 'due_at']
+        widgets = {
+            'due_at': forms.DateTimeInput(attrs={'type': 'datetime-local'},
+                                          format='%Y-%m-%dT%H:%M'),
+        }
 
 
 class RegistrationForm(UserCreationForm):
@@ -0,0 +1,223 @@
+"""
+This module contains the import of tasks from CSV or NDJSON files,
+such as the exports of the tasks.
+The files are parsed line by line and the valid rows are inserted
+in batches with multi-row statements, so files of any size are imported
+in constant memory. The invalid rows are skipped and reported
+with their line number and their errors.
+"""
+
+import codecs
+import csv
+import json
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from tasks.cache import task_lists
+from tasks.models import Task
+from tasks.search import get_search_backend
+
+IMPORT_BATCH_SIZE = 5000
+IMPORT_FORMATS = ['csv', 'ndjson']
+# Fields read from the rows, the other ones are ignored.
+FIELDS = ['title', 'description', 'completed', 'due_at']
+# Number of the invalid rows reported in detail, all of them are counted.
+MAX_REPORTED_ERRORS = 100
+TITLE_MAX_LENGTH = Task._meta.get_field('title').max_length
+BOOLEANS = {
+    'true': True, '1': True, 'yes': True,
+    'false': False, '0': False, 'no': False, '': False,
+}
+
+
+class InvalidImportFile(ValueError):
+    pass
+
+
+class ImportResult:
+    """
+    The result of an import: the number of the created tasks,
+    the number of the invalid rows and the details of the first of them.
+    """
+    def __init__(self):
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, line, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def as_dict(self):
+        return {'created': self.created, 'error_count': self.error_count,
+                'errors': self.errors}
+
+
+def decode_lines(lines):
+    """
+    Decode the lines of a binary file, like an uploaded file,
+    as UTF-8, ignoring a byte order mark.
+    """
+    return codecs.iterdecode(lines, 'utf-8-sig')
+
+
+def read_csv(lines):
+    """
+    Iterate over the rows of a CSV file with a header as
+    (line number, (title, description, completed, due_at)) pairs.
+    Missing columns are read as None, and invalid rows are returned
+    as their error message.
+    """
+    reader = csv.reader(lines)
+    try:
+        header = next(reader, [])
+    except csv.Error as error:
+        raise InvalidImportFile(f'Invalid CSV header: {error}.')
+    if 'title' not in header:
+        raise InvalidImportFile('The CSV file has no title column.')
+    columns = [header.index(name) if name in header else None
+               for name in FIELDS]
+    width = max(index for index in columns if index is not None) + 1
+    line = reader.line_num + 1
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as error:
+            yield line, f'Invalid CSV row: {error}.'
+        else:
+            if row:
+                if len(row) < width:
+                    row += [None] * (width - len(row))
+                yield line, tuple(None if index is None else row[index]
+                                  for index in columns)
+        line = reader.line_num + 1
+
+
+def read_ndjson(lines):
+    """
+    Iterate over the objects of a NDJSON file as
+    (line number, (title, description, completed, due_at)) pairs.
+    Invalid lines are returned as their error message.
+    """
+    for line, text in enumerate(lines, 1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError:
+            row = None
+        if isinstance(row, dict):
+            yield line, tuple(row.get(name) for name in FIELDS)
+        else:
+            yield line, 'Invalid JSON object.'
+
+
+READERS = {
+    'csv': read_csv,
+    'ndjson': read_ndjson,
+}
+
+
+def clean_row(row):
+    """
+    Return the (title, description, completed, due_at) values of a task
+    from a row, or the errors of the row.
+    Due dates without a time zone are in the current time zone.
+    """
+    if isinstance(row, str):
+        return None, {'non_field_errors': [row]}
+    title, description, completed, due_at = row
+    errors = {}
+    if isinstance(title, str):
+        title = title.strip()
+    if not title or not isinstance(title, str):
+        errors['title'] = ['This field is required.']
+    elif len(title) > TITLE_MAX_LENGTH:
+        errors['title'] = [f'Ensure this field has no more than'
+                           f' {TITLE_MAX_LENGTH} characters.']
+    if description is not None and not isinstance(description, str):
+        errors['description'] = ['Not a valid string.']
+    if completed is None:
+        completed = False
+    elif isinstance(completed, str):
+        completed = BOOLEANS.get(completed.strip().lower(), completed)
+    if not isinstance(completed, bool):
+        errors['completed'] = ['Must be a valid boolean.']
+    if due_at == '':
+        due_at = None
+    if due_at is not None:
+        try:
+            due_at = parse_datetime(due_at)
+        except (TypeError, ValueError):
+            due_at = None
+        if due_at is None:
+            errors['due_at'] = ['Datetime has wrong format.']
+        elif timezone.is_naive(due_at):
+            due_at = timezone.make_aware(due_at)
+    if errors:
+        return None, errors
+    return (title, description, completed, due_at), None
+
+
+def import_tasks(user_id, lines, import_format, batch_size=None):
+    """
+    Import the tasks of the user from the lines of a text file
+    in the format, one of IMPORT_FORMATS, and return an ImportResult.
+    InvalidImportFile is raised if the header of a CSV file is invalid.
+    Every batch is inserted in its own transaction, so a large import
+    does not hold the database lock for long. The import stops at
+    the first line which is not valid UTF-8, keeping the tasks before it.
+    """
+    batch_size = batch_size or IMPORT_BATCH_SIZE
+    result = ImportResult()
+    batch = []
+    line = 0
+    try:
+        try:
+            for line, row in READERS[import_format](lines):
+                fields, errors = clean_row(row)
+                if errors:
+                    result.add_error(line, errors)
+                    continue
+                batch.append(fields)
+                if len(batch) == batch_size:
+                    result.created += insert_batch(user_id, batch)
+                    batch = []
+        except UnicodeDecodeError:
+            result.add_error(line + 1, {
+                'non_field_errors': ['The file is not valid UTF-8.']})
+        if batch:
+            result.created += insert_batch(user_id, batch)
+    finally:
+        if result.created:
+            # The inserts send no post_save signal.
+            task_lists.invalidate(user_id)
+    return result
+
+
+def insert_batch(user_id, rows):
+    """
+    Insert the tasks of the user from
+    (title, description, completed, due_at) rows and return their number.
+    The rows are inserted with executemany() rather than bulk_create(),
+    which prepares every value of every instance through its field
+    and is several times slower for the large batches of an import,
+    and they are added to the search index at once.
+    """
+    adapt_datetime = connection.ops.adapt_datetimefield_value
+    now = adapt_datetime(timezone.now())
+    table = connection.ops.quote_name(Task._meta.db_table)
+    sql = (f'INSERT INTO {table} (title, description, completed, due_at,'
+           f' created_at, updated_at, author_id)'
+           f' VALUES (%s, %s, %s, %s, %s, %s, %s)')
+    with transaction.atomic(), get_search_backend().defer_indexing(
+            connection, Task), connection.cursor() as cursor:
+        cursor.executemany(sql, [
+            (title, description, completed, adapt_datetime(due_at), now, now,
+             user_id) for title, description, completed, due_at in rows])
+    return len(rows)
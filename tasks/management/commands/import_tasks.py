@@ -0,0 +1,52 @@
+"""
+This module contains the command importing tasks from a file.
+"""
+
+import os
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.imports import (IMPORT_BATCH_SIZE, IMPORT_FORMATS,
+                           InvalidImportFile, decode_lines, import_tasks)
+
+
+class Command(BaseCommand):
+    help = ('Import the tasks of a user from a CSV or NDJSON file,'
+            ' like the exports of the tasks.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path of the file to import.')
+        parser.add_argument('--user', required=True,
+                            help='Username of the author of the tasks.')
+        parser.add_argument(
+            '--format', choices=IMPORT_FORMATS,
+            help='Format of the file, guessed from its extension'
+                 ' by default.')
+        parser.add_argument('--batch-size', type=int,
+                            default=IMPORT_BATCH_SIZE,
+                            help='Number of the tasks inserted at once.')
+
+    def handle(self, *args, **options):
+        import_format = options['format'] or os.path.splitext(
+            options['path'])[1].lstrip('.').lower()
+        if import_format not in IMPORT_FORMATS:
+            raise CommandError('Use --format to choose the format among: '
+                               + ', '.join(IMPORT_FORMATS) + '.')
+        user_id = User.objects.filter(
+            username=options['user']).values_list('pk', flat=True).first()
+        if user_id is None:
+            raise CommandError(f'User "{options["user"]}" not found.')
+        try:
+            with open(options['path'], 'rb') as file:
+                result = import_tasks(user_id, decode_lines(file),
+                                      import_format, options['batch_size'])
+        except (OSError, InvalidImportFile) as error:
+            raise CommandError(error)
+        for error in result.errors:
+            self.stderr.write(f'Line {error["line"]}: {error["errors"]}')
+        if result.error_count > len(result.errors):
+            self.stderr.write(f'{result.error_count - len(result.errors)}'
+                              f' more invalid rows.')
+        self.stdout.write(f'{result.created} tasks imported,'
+                          f' {result.error_count} invalid rows skipped.')
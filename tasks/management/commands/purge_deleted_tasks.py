@@ -0,0 +1,16 @@
+"""
+This module contains the command purging the old deleted task records.
+"""
+
+from django.core.management.base import BaseCommand
+
+from tasks.sync import DELETED_TASK_RETENTION, purge_deleted_tasks
+
+
+class Command(BaseCommand):
+    help = (f'Delete the records of the tasks deleted more than'
+            f' {DELETED_TASK_RETENTION.days} days ago.')
+
+    def handle(self, *args, **options):
+        deleted = purge_deleted_tasks()
+        self.stdout.write(f'{deleted} deleted task records purged.')
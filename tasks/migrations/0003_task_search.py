@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from tasks.search import get_search_backend
+
+
+def install_search_index(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    backend = get_search_backend(schema_editor.connection.alias)
+    backend.install(schema_editor, Task)
+
+
+def uninstall_search_index(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    backend = get_search_backend(schema_editor.connection.alias)
+    backend.uninstall(schema_editor, Task)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_task_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0 on 2026-10-18 19:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_author_created_at_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_author_updated_at_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_author_completed_idx',
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['author', '-created_at', '-id'], name='task_author_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['author', '-updated_at', '-id'], name='task_author_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['author', 'completed', 'id'], name='task_author_completed_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0 on 2026-10-18 20:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_deletedtask'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('due_at', models.DateTimeField()),
+                ('task_id', models.BigIntegerField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='due_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completed', False), ('due_at__isnull', False)), fields=['due_at', 'id'], name='task_due_at_idx'),
+        ),
+    ]
@@ -1,12 +1,27 @@
 """
-This module contains the Task model for the tasks application.
+This module contains the models for the tasks application:
+the Task model, the DeletedTask model recording task deletions
+and the ReminderCheckpoint model recording the reminders sent.
 """
 
 from django.db import models
+from django.db.models import Q
 from django.urls import reverse
 from django.contrib.auth.models import User
 
 
+class TaskQuerySet(models.QuerySet):
+    """
+    Queryset of the tasks, recording the deletions of the tasks
+    it deletes with a single insert and invalidating the cached
+    task lists of each of their authors once.
+    """
+    def delete(self):
+        from tasks.signals import batch_deletions
+        with batch_deletions():
+            return super().delete()
+
+
 class Task(models.Model):
     """
     Represents a task.
@@ -19,12 +34,68 @@ class Task(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField(null=True, blank=True)
     completed = models.BooleanField(default=False)
+    due_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    author = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Lookups by author are served by the composite indexes below.
+    author = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # The primary key breaks ties of the keyset pagination.
+            models.Index(fields=['author', '-created_at', '-id'],
+                         name='task_author_created_at_idx'),
+            models.Index(fields=['author', '-updated_at', '-id'],
+                         name='task_author_updated_at_idx'),
+            models.Index(fields=['author', 'completed', 'id'],
+                         name='task_author_completed_idx'),
+            models.Index(fields=['author', 'title'],
+                         name='task_author_title_idx'),
+            # Only the pending reminders are indexed, in the order
+            # they are sent.
+            models.Index(fields=['due_at', 'id'], name='task_due_at_idx',
+                         condition=Q(due_at__isnull=False, completed=False)),
+        ]
 
     def __str__(self):
         return self.title
 
     def get_absolute_url(self):
         return reverse('tasks:task_list')
+
+
+class DeletedTask(models.Model):
+    """
+    Represents a deleted task.
+    It records the id of the task, its author and the time of the deletion,
+    so clients synchronizing their copies of the tasks learn about it.
+    """
+    task_id = models.BigIntegerField()
+    author = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['author', 'deleted_at', 'id'],
+                         name='deletedtask_author_deleted_idx'),
+            models.Index(fields=['deleted_at'],
+                         name='deletedtask_deleted_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'Task {self.task_id}'
+
+
+class ReminderCheckpoint(models.Model):
+    """
+    Records the due date and the id of the last task reminded,
+    so the reminder scheduler resumes after it when restarted.
+    There is a single checkpoint.
+    """
+    due_at = models.DateTimeField()
+    task_id = models.BigIntegerField()
+
+    def __str__(self):
+        return f'Task {self.task_id} due at {self.due_at}'
@@ -0,0 +1,146 @@
+"""
+This module contains the keyset pagination of task lists.
+A page is fetched by comparing the sort key and the primary key of the
+tasks with those of the first or last task of the adjacent page,
+so every page is read from an index with neither OFFSET nor COUNT,
+and deep pages are as fast as the first one.
+"""
+
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+
+ORDERINGS = ['-created_at', 'created_at', '-updated_at', 'updated_at',
+             '-completed', 'completed']
+RELEVANCE = 'relevance'
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class KeysetPage:
+    """
+    A page of a keyset paginated list.
+    The cursors point to the adjacent pages, or are None
+    when there is no such page.
+    """
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginator ordering the queryset by one of the ORDERINGS
+    and then by the primary key in the same direction.
+    """
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.descending = ordering.startswith('-')
+        self.field = queryset.model._meta.get_field(ordering.lstrip('-'))
+        self.pk_name = queryset.model._meta.pk.attname
+
+    def encode_cursor(self, row, backwards):
+        """
+        Return the cursor of the page next to the row, which is
+        a model instance or a dictionary returned by `QuerySet.values()`.
+        """
+        if isinstance(row, dict):
+            value, pk = row[self.field.attname], row[self.pk_name]
+        else:
+            value, pk = getattr(row, self.field.attname), row.pk
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        data = [value, pk, backwards]
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """
+        Return the sort key, the primary key and the direction
+        of the cursor, raising InvalidCursor if it is malformed.
+        """
+        try:
+            value, pk, backwards = json.loads(
+                base64.urlsafe_b64decode(cursor.encode()))
+            value = self.field.to_python(value)
+        except (binascii.Error, ValueError, TypeError, OverflowError,
+                ValidationError):
+            raise InvalidCursor('Invalid cursor.')
+        # bool is a subclass of int, and JSON numbers may be floats.
+        if value is None or type(pk) is not int:
+            raise InvalidCursor('Invalid cursor.')
+        return value, pk, bool(backwards)
+
+    def page(self, cursor=None):
+        """
+        Return the first page, or the page next to the cursor.
+        """
+        queryset, backwards = self.get_page_queryset(cursor)
+        return self.make_page(list(queryset), cursor, backwards)
+
+    async def apage(self, cursor=None):
+        """
+        Asynchronous version of `page()`.
+        """
+        queryset, backwards = self.get_page_queryset(cursor)
+        return self.make_page([row async for row in queryset], cursor,
+                              backwards)
+
+    def get_page_queryset(self, cursor):
+        """
+        Return the queryset of the rows of the page, with one more row
+        telling whether there are more, and the direction of the cursor.
+        """
+        queryset = self.queryset
+        backwards = False
+        if cursor:
+            value, pk, backwards = self.decode_cursor(cursor)
+            lookup = 'lt' if self.descending != backwards else 'gt'
+            # The redundant inclusive bound lets the database seek
+            # in the index instead of filtering the preceding rows.
+            queryset = queryset.filter(
+                Q(**{f'{self.field.name}__{lookup}e': value}),
+                Q(**{f'{self.field.name}__{lookup}': value})
+                | Q(**{f'pk__{lookup}': pk}))
+        if self.descending != backwards:
+            queryset = queryset.order_by(f'-{self.field.name}', '-pk')
+        else:
+            queryset = queryset.order_by(self.field.name, 'pk')
+        return queryset[:self.per_page + 1], backwards
+
+    def make_page(self, rows, cursor, backwards):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.encode_cursor(rows[-1], backwards=False)
+        if rows and has_previous:
+            previous_cursor = self.encode_cursor(rows[0], backwards=True)
+        return KeysetPage(rows, next_cursor, previous_cursor)
@@ -0,0 +1,143 @@
+"""
+This module contains the scheduler of the reminders of the tasks due.
+Instead of scanning the tasks, it reads the next pending reminders
+from the partial index on the due date, a window at a time, and keeps
+them in a heap until they are due. After sending a batch of reminders,
+it records the last one in the checkpoint, so when it is restarted it
+first sends the reminders which fell due in the meantime.
+Only the reminders of a batch being sent when the scheduler stopped
+may be sent twice.
+"""
+
+import heapq
+import threading
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from tasks.models import ReminderCheckpoint, Task
+
+# Reminders due within this time are read into memory.
+REMINDER_WINDOW = timedelta(minutes=5)
+# Number of the reminders read or sent at once.
+REMINDER_BATCH_SIZE = 1000
+# Seconds between the reads of the window, which find the tasks
+# created or given a due date since the previous read.
+REMINDER_POLL_INTERVAL = 10
+REMINDER_FIELDS = ['id', 'title', 'due_at', 'author_id', 'author__username']
+
+
+class ReminderScheduler:
+    """
+    Scheduler calling `notify` with the rows of the tasks falling due,
+    in the order of their due dates, a batch at a time.
+    The heap holds (due date, task id) keys. Tasks completed, deleted
+    or given another due date after their key was read are checked
+    before the reminders are sent, and their stale keys are skipped.
+    Due dates set before the last reminder sent are not reminded.
+    """
+    def __init__(self, notify, window=REMINDER_WINDOW,
+                 batch_size=REMINDER_BATCH_SIZE,
+                 poll_interval=REMINDER_POLL_INTERVAL, clock=timezone.now):
+        self.notify = notify
+        self.window = window
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.heap = []
+        self.scheduled = set()
+        self.checkpoint = None
+
+    def get_checkpoint(self):
+        """
+        Return the key of the last reminder sent.
+        The first time, the reminders are sent from now on.
+        """
+        checkpoint = ReminderCheckpoint.objects.first()
+        if checkpoint is None:
+            checkpoint = ReminderCheckpoint.objects.create(
+                due_at=self.clock(), task_id=0)
+        return checkpoint.due_at, checkpoint.task_id
+
+    def save_checkpoint(self, key):
+        self.checkpoint = key
+        ReminderCheckpoint.objects.update(due_at=key[0], task_id=key[1])
+
+    def get_pending(self):
+        """
+        Return the queryset of the keys of the pending reminders after
+        the checkpoint due before the end of the window, read from
+        the partial index on the due date.
+        """
+        due_at, task_id = self.checkpoint
+        # The redundant inclusive bound lets the database seek
+        # in the index instead of filtering the preceding rows.
+        return Task.objects.filter(
+            Q(due_at__gte=due_at), Q(due_at__gt=due_at) | Q(pk__gt=task_id),
+            due_at__lte=self.clock() + self.window, completed=False,
+        ).order_by('due_at', 'pk').values_list('due_at', 'pk')
+
+    def load(self):
+        """
+        Schedule the pending reminders of the window, `batch_size`
+        at most, and return whether the batch was full.
+        """
+        keys = list(self.get_pending()[:self.batch_size])
+        for key in keys:
+            if key not in self.scheduled:
+                self.scheduled.add(key)
+                heapq.heappush(self.heap, key)
+        return len(keys) == self.batch_size
+
+    def send_due(self):
+        """
+        Send the reminders due, a batch at a time,
+        and return their number.
+        """
+        now = self.clock()
+        sent = 0
+        while self.heap and self.heap[0][0] <= now:
+            batch = []
+            while (self.heap and self.heap[0][0] <= now
+                   and len(batch) < self.batch_size):
+                batch.append(heapq.heappop(self.heap))
+            self.scheduled.difference_update(batch)
+            keys = set(batch)
+            rows = sorted(
+                (row for row in Task.objects.filter(
+                    pk__in=[task_id for _, task_id in batch],
+                    completed=False).values(*REMINDER_FIELDS)
+                 if (row['due_at'], row['id']) in keys),
+                key=lambda row: (row['due_at'], row['id']))
+            if rows:
+                self.notify(rows)
+                sent += len(rows)
+            self.save_checkpoint(batch[-1])
+        return sent
+
+    def step(self):
+        """
+        Read the window, send the reminders due and return the seconds
+        to wait before the next step.
+        """
+        if self.checkpoint is None:
+            self.checkpoint = self.get_checkpoint()
+        full = self.load()
+        self.send_due()
+        if full and not self.heap:
+            return 0
+        delay = self.poll_interval
+        if self.heap:
+            delay = min(delay,
+                        (self.heap[0][0] - self.clock()).total_seconds())
+        return max(delay, 0)
+
+    def run(self, stop=None):
+        """
+        Send the reminders as they fall due until `stop`,
+        a threading.Event, is set.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            stop.wait(self.step())
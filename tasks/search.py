@@ -0,0 +1,231 @@
+"""
+This module contains the full-text search backends of the tasks application.
+A backend filters a task queryset by a search query matching the title
+or the description of the tasks, and orders the results by relevance.
+Every word of the query is matched as a prefix, and all words must match.
+The backend is chosen by the database vendor, unless the
+TASK_SEARCH_BACKEND setting names a backend class.
+"""
+
+import re
+from contextlib import contextmanager, nullcontext
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+WORD_RE = re.compile(r'\w+')
+
+
+def get_terms(query):
+    """
+    Return the words of the search query.
+    """
+    return WORD_RE.findall(query)
+
+
+class ContainsSearchBackend:
+    """
+    Backend matching the query as a case-insensitive substring.
+    It needs no index and is used by databases without full-text search.
+    """
+    def install(self, schema_editor, model):
+        pass
+
+    def uninstall(self, schema_editor, model):
+        pass
+
+    def repair(self, schema_editor, model):
+        pass
+
+    def defer_indexing(self, connection, model):
+        return nullcontext()
+
+    def search(self, queryset, query):
+        return queryset.filter(Q(title__icontains=query) |
+                               Q(description__icontains=query))
+
+
+class SQLiteSearchBackend:
+    """
+    Backend using an SQLite FTS5 table indexing the task titles
+    and descriptions. Triggers keep the table in sync
+    whenever a task is saved or deleted.
+    """
+    fts_table = 'tasks_task_fts'
+    triggers = {
+        'tasks_task_fts_insert': (
+            'AFTER INSERT ON {table} BEGIN'
+            ' INSERT INTO {fts}(rowid, title, description)'
+            ' VALUES (new.id, new.title, new.description); END'),
+        'tasks_task_fts_delete': (
+            'AFTER DELETE ON {table} BEGIN'
+            ' INSERT INTO {fts}({fts}, rowid, title, description)'
+            " VALUES ('delete', old.id, old.title, old.description); END"),
+        'tasks_task_fts_update': (
+            'AFTER UPDATE OF title, description ON {table} BEGIN'
+            ' INSERT INTO {fts}({fts}, rowid, title, description)'
+            " VALUES ('delete', old.id, old.title, old.description);"
+            ' INSERT INTO {fts}(rowid, title, description)'
+            ' VALUES (new.id, new.title, new.description); END'),
+    }
+
+    def install(self, schema_editor, model):
+        """
+        Create the FTS5 table and its triggers and fill the table.
+        """
+        table = model._meta.db_table
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table}'
+            f" USING fts5(title, description, content='{table}',"
+            f" content_rowid='id', tokenize='unicode61 remove_diacritics 2',"
+            f" prefix='2 3')")
+        for name, definition in self.triggers.items():
+            schema_editor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {name} '
+                + definition.format(table=table, fts=self.fts_table))
+        schema_editor.execute(
+            f"INSERT INTO {self.fts_table}({self.fts_table})"
+            f" VALUES ('rebuild')")
+
+    def repair(self, schema_editor, model):
+        """
+        Recreate the triggers if the FTS5 table exists without them.
+        Migrations rebuilding the task table on SQLite drop its triggers,
+        so this is called after every migrate.
+        """
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT type, name FROM sqlite_master"
+                " WHERE (type = 'trigger' AND tbl_name = %s)"
+                " OR (type = 'table' AND name = %s)",
+                [model._meta.db_table, self.fts_table])
+            existing = {name for _, name in cursor.fetchall()}
+        if (self.fts_table in existing
+                and not existing >= self.triggers.keys()):
+            self.install(schema_editor, model)
+
+    @contextmanager
+    def defer_indexing(self, connection, model):
+        """
+        Index the tasks inserted in the block with a single statement
+        at its end rather than one by one with the insert trigger,
+        which is several times faster for large batches.
+        It must be used in a transaction, so other connections never
+        see the table without its trigger.
+        """
+        table = model._meta.db_table
+        name = 'tasks_task_fts_insert'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master"
+                " WHERE type = 'trigger' AND name = %s", [name])
+            if not cursor.fetchone()[0]:
+                yield
+                return
+            cursor.execute(f'SELECT MAX(id) FROM {table}')
+            last_id = cursor.fetchone()[0] or 0
+            cursor.execute(f'DROP TRIGGER {name}')
+            try:
+                yield
+            finally:
+                # The ids are never reused, the new tasks have greater ids.
+                cursor.execute(
+                    f'INSERT INTO {self.fts_table}(rowid, title, description)'
+                    f' SELECT id, title, description FROM {table}'
+                    f' WHERE id > %s', [last_id])
+                cursor.execute(
+                    f'CREATE TRIGGER {name} ' + self.triggers[name].format(
+                        table=table, fts=self.fts_table))
+
+    def uninstall(self, schema_editor, model):
+        for name in self.triggers:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {self.fts_table}')
+
+    def search(self, queryset, query):
+        terms = get_terms(query)
+        if not terms:
+            return ContainsSearchBackend().search(queryset, query)
+        match = ' '.join(f'"{term}"*' for term in terms)
+        table = queryset.model._meta.db_table
+        # The FTS5 table is joined rather than queried in a subquery,
+        # so the full-text match and the rank are computed only once.
+        return queryset.extra(
+            tables=[self.fts_table],
+            where=[f'{self.fts_table}.rowid = "{table}"."id"',
+                   f'{self.fts_table} MATCH %s'],
+            params=[match],
+            select={'search_rank': f'{self.fts_table}.rank'},
+        ).order_by('search_rank', '-created_at')
+
+
+class PostgreSQLSearchBackend:
+    """
+    Backend using PostgreSQL text search over a tsvector
+    of the task title and description, served by a GIN index.
+    """
+    config = 'simple'
+    index_name = 'task_search_vector_idx'
+
+    def get_vector(self):
+        from django.contrib.postgres.search import SearchVector
+        return SearchVector('title', 'description', config=self.config)
+
+    def get_index(self):
+        from django.contrib.postgres.indexes import GinIndex
+        return GinIndex(self.get_vector(), name=self.index_name)
+
+    def install(self, schema_editor, model):
+        schema_editor.add_index(model, self.get_index())
+
+    def uninstall(self, schema_editor, model):
+        schema_editor.remove_index(model, self.get_index())
+
+    def repair(self, schema_editor, model):
+        pass
+
+    def defer_indexing(self, connection, model):
+        return nullcontext()
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        terms = get_terms(query)
+        if not terms:
+            return ContainsSearchBackend().search(queryset, query)
+        search_query = SearchQuery(
+            ' & '.join(f'{term}:*' for term in terms),
+            search_type='raw', config=self.config)
+        vector = self.get_vector()
+        return queryset.annotate(
+            search_vector=vector,
+            search_rank=SearchRank(vector, search_query),
+        ).filter(
+            search_vector=search_query
+        ).order_by('-search_rank', '-created_at')
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgreSQLSearchBackend,
+}
+
+
+def get_search_backend(using=DEFAULT_DB_ALIAS):
+    """
+    Return the search backend for the given database.
+    """
+    if settings.TASK_SEARCH_BACKEND:
+        return import_string(settings.TASK_SEARCH_BACKEND)()
+    vendor = connections[using].vendor
+    return VENDOR_BACKENDS.get(vendor, ContainsSearchBackend)()
+
+
+def repair_search_index(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Make sure the installed search index is complete after migrations.
+    """
+    from tasks.models import Task
+    with connections[using].schema_editor() as schema_editor:
+        get_search_backend(using).repair(schema_editor, Task)
@@ -0,0 +1,67 @@
+"""
+This module contains the signal handlers of the tasks application.
+The tasks deleted together by a queryset are recorded, and the lists
+of their authors invalidated, at once by `batch_deletions()`.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import QuerySet
+
+from tasks.cache import task_lists
+from tasks.models import DeletedTask
+
+# Records of the deletions collected by `batch_deletions()`,
+# None outside of it.
+pending_deletions = ContextVar('pending_deletions', default=None)
+
+
+@contextmanager
+def batch_deletions():
+    """
+    Record the deletions of the tasks deleted in the block
+    with a single insert at its end, in the same transaction,
+    and invalidate the cached task lists of each author once.
+    """
+    deletions = []
+    # The tasks and their records are rolled back together.
+    with transaction.atomic(savepoint=False):
+        token = pending_deletions.set(deletions)
+        try:
+            yield
+        finally:
+            pending_deletions.reset(token)
+        DeletedTask.objects.bulk_create(deletions)
+        for author_id in {deletion.author_id for deletion in deletions}:
+            task_lists.invalidate(author_id)
+
+
+def record_task_deletion(sender, instance, origin=None, **kwargs):
+    """
+    Record the deletion of a task.
+    Nothing is recorded when the task is deleted with its author,
+    since the records of the author are deleted too. The origin of
+    the deletion is the author or a queryset of users.
+    """
+    if isinstance(origin, QuerySet):
+        origin = origin.model
+    if origin is User or isinstance(origin, User):
+        return
+    deletion = DeletedTask(task_id=instance.pk, author_id=instance.author_id)
+    deletions = pending_deletions.get()
+    if deletions is None:
+        deletion.save()
+    else:
+        deletions.append(deletion)
+
+
+def invalidate_task_lists(sender, instance, **kwargs):
+    """
+    Invalidate the cached task lists of the author of a saved
+    or deleted task, unless it is deleted in `batch_deletions()`.
+    """
+    if pending_deletions.get() is None:
+        task_lists.invalidate(instance.author_id)
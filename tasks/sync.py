@@ -0,0 +1,110 @@
+"""
+This module contains the incremental synchronization of tasks.
+A client keeps the cursor returned with the changes and sends it back
+to get the tasks created or updated since, read from the
+(author, updated_at) index, and the ids of the tasks deleted since,
+read from the DeletedTask records.
+"""
+
+import datetime
+
+from django.utils import timezone
+
+from tasks.models import DeletedTask, Task
+from tasks.pagination import InvalidCursor, KeysetPaginator
+
+SYNC_PAGE_SIZE = 500
+# Once a client has caught up, its cursor is moved back by this delay,
+# so changes committed late by concurrent transactions are not missed.
+# The changes of the last seconds are sent again, which is harmless
+# since applying a change twice gives the same result.
+SYNC_OVERLAP = datetime.timedelta(seconds=5)
+# Deleted task records older than this are purged,
+# clients with an older cursor have to synchronize from scratch.
+DELETED_TASK_RETENTION = datetime.timedelta(days=30)
+
+
+class ExpiredCursor(InvalidCursor):
+    pass
+
+
+class TaskChanges:
+    """
+    The changes of the tasks of a user since a cursor.
+    `tasks` are the rows of the changed tasks, `deleted` the ids
+    of the deleted tasks, and `has_more` tells whether there are
+    more changes to fetch with the new `cursor`.
+    """
+    def __init__(self, tasks, deleted, cursor, has_more):
+        self.tasks = tasks
+        self.deleted = deleted
+        self.cursor = cursor
+        self.has_more = has_more
+
+
+def get_changes(author, fields, cursor=None, limit=None):
+    """
+    Return the changes of the tasks of the author since the cursor,
+    with the given fields of the changed tasks.
+    Without a cursor, all the tasks are returned.
+    """
+    limit = limit or SYNC_PAGE_SIZE
+    now = timezone.now()
+    caught_up = now - SYNC_OVERLAP
+    tasks = KeysetPaginator(
+        Task.objects.filter(author=author).values(
+            *dict.fromkeys(['id', 'updated_at', *fields])),
+        'updated_at', limit)
+    deletions = KeysetPaginator(
+        DeletedTask.objects.filter(author=author).values(
+            'id', 'task_id', 'deleted_at'),
+        'deleted_at', limit)
+    if cursor:
+        task_cursor, deletion_cursor = split_cursor(cursor)
+        deleted_since = deletions.decode_cursor(deletion_cursor)[0]
+        # A naive datetime cannot be compared with the current time.
+        if (not isinstance(deleted_since, datetime.datetime)
+                or timezone.is_naive(deleted_since)):
+            raise InvalidCursor('Invalid cursor.')
+        if deleted_since < now - DELETED_TASK_RETENTION:
+            raise ExpiredCursor('Cursor expired, synchronize from scratch.')
+    else:
+        task_cursor = None
+        # Tasks deleted before the first synchronization are irrelevant.
+        deletion_cursor = deletions.encode_cursor(
+            {'deleted_at': caught_up, 'id': 0}, backwards=False)
+    task_page = tasks.page(task_cursor)
+    deletion_page = deletions.page(deletion_cursor)
+    if task_page.has_next():
+        task_cursor = task_page.next_cursor
+    else:
+        task_cursor = tasks.encode_cursor(
+            {'updated_at': caught_up, 'id': 0}, backwards=False)
+    if deletion_page.has_next():
+        deletion_cursor = deletion_page.next_cursor
+    else:
+        deletion_cursor = deletions.encode_cursor(
+            {'deleted_at': caught_up, 'id': 0}, backwards=False)
+    rows = [{name: row[name] for name in fields} for row in task_page]
+    return TaskChanges(rows, [row['task_id'] for row in deletion_page],
+                       f'{task_cursor}.{deletion_cursor}',
+                       task_page.has_next() or deletion_page.has_next())
+
+
+def split_cursor(cursor):
+    try:
+        task_cursor, deletion_cursor = cursor.split('.')
+    except ValueError:
+        raise InvalidCursor('Invalid cursor.')
+    return task_cursor, deletion_cursor
+
+
+def purge_deleted_tasks(now=None):
+    """
+    Delete the records of the tasks deleted before the retention period
+    and return their number.
+    """
+    now = now or timezone.now()
+    deleted, _ = DeletedTask.objects.filter(
+        deleted_at__lt=now - DELETED_TASK_RETENTION).delete()
+    return deleted
@@ -0,0 +1,119 @@
+"""
+This module contains tests for the cache of the task lists.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks.cache import TaskListCache, task_lists
+from tasks.models import Task
+
+URL = reverse('tasks:task_list')
+
+
+def get_titles(client, params=None):
+    response = client.get(URL, params)
+    return [task.title for task in response.context['object_list']]
+
+
+@pytest.mark.parametrize('params', [{}, {'search': 'task',
+                                         'sort_by': 'relevance'}])
+def test_task_list_is_cached(author_client, author, params):
+    """
+    Test that a page of the task list is read from the database once.
+    """
+    Task.objects.create(title='Task', author=author)
+    get_titles(author_client, params)
+
+    with CaptureQueriesContext(connection) as queries:
+        titles = get_titles(author_client, params)
+
+    assert titles == ['Task']
+    assert not [query for query in queries
+                if 'tasks_task' in query['sql']]
+    assert (task_lists.hits, task_lists.misses) == (1, 1)
+
+
+def test_task_list_is_invalidated(author_client, author, django_user_model):
+    """
+    Test that the cached lists of an author are invalidated
+    when a task is created, updated or deleted,
+    and that the lists of the other users are kept.
+    """
+    task = Task.objects.create(title='Task', author=author)
+    other = django_user_model.objects.create(username='other')
+    other_list = task_lists.get_or_set(other.pk, ('test',), lambda: 'cached')
+    get_titles(author_client)
+
+    author_client.post(reverse('tasks:task_update', args=[task.pk]),
+                       {'title': 'Updated', 'description': 'Updated'})
+    assert get_titles(author_client) == ['Updated']
+    Task.objects.create(title='New', author=author)
+    assert get_titles(author_client) == ['New', 'Updated']
+    author_client.post(reverse('tasks:task_delete', args=[task.pk]))
+    assert get_titles(author_client) == ['New']
+    assert task_lists.get_or_set(
+        other.pk, ('test',), lambda: 'computed') == other_list
+
+
+def test_queryset_deletion_invalidates_lists_once(author, django_user_model,
+                                                  monkeypatch):
+    """
+    Test that deleting the tasks of several authors in a queryset
+    invalidates the cached lists of each author once.
+    """
+    other = django_user_model.objects.create(username='other')
+    Task.objects.bulk_create(
+        [Task(title=f'Task {number}', author=user)
+         for number in range(3) for user in (author, other)])
+    invalidated = []
+    monkeypatch.setattr(task_lists, 'invalidate', invalidated.append)
+
+    Task.objects.all().delete()
+
+    assert sorted(invalidated) == sorted([author.pk, other.pk])
+
+
+def test_file_based_cache(settings, tmp_path):
+    """
+    Test that the task lists can be cached in files.
+    """
+    settings.CACHES = {
+        **settings.CACHES,
+        'files': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        },
+    }
+    cache = TaskListCache('files')
+
+    cache.get_or_set(1, ('page',), lambda: ['Task'])
+    cached = cache.get_or_set(1, ('page',), lambda: [])
+    cache.invalidate(1)
+
+    assert cached == ['Task']
+    assert cache.get_or_set(1, ('page',), lambda: []) == []
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_lists_are_invalidated_by_other_processes(settings,
+                                                  task_cache_location):
+    """
+    Test that the lists cached by a process, such as the web application,
+    are invalidated by another one, such as the bot.
+    """
+    task_lists.get_or_set(1, ('page',), lambda: ['Task'])
+
+    subprocess.run(
+        [sys.executable, '-c', 'import django; django.setup();'
+         ' from tasks.cache import task_lists; task_lists.invalidate(1)'],
+        cwd=settings.BASE_DIR, check=True,
+        env={**os.environ, 'TASK_CACHE_LOCATION': task_cache_location})
+
+    assert task_lists.get_or_set(1, ('page',), lambda: []) == []
@@ -1,12 +1,20 @@
 """
 This module contains tests for the 'tasks' application.
-It includes tests for checking the task list for different users
-and verifying the presence of a form in the context.
+It includes tests for checking the task list for different users,
+verifying the presence of a form in the context
+and paginating the task list with cursors.
 """
 
+import base64
+from http import HTTPStatus
+
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from tasks.models import Task
+
 TASK_ID = 1
 
 
@@ -39,3 +47,44 @@ def test_form_in_context(task, author_client, url_name, arg):
     response = author_client.get(url)
 
     assert 'form' in response.context
+
+
+def test_task_list_pages_with_cursors(author_client, author):
+    """
+    Test that the task list is paginated with next and previous cursors
+    without counting the tasks.
+    """
+    for number in range(15):
+        Task.objects.create(title=f'Task {number}', author=author)
+    url = reverse('tasks:task_list')
+
+    with CaptureQueriesContext(connection) as queries:
+        first_page = author_client.get(url)
+    second_page = author_client.get(
+        url, {'cursor': first_page.context['page_obj'].next_cursor})
+    previous_page = author_client.get(
+        url, {'cursor': second_page.context['page_obj'].previous_cursor})
+
+    assert [task.title for task in first_page.context['object_list']] == [
+        f'Task {number}' for number in range(14, 4, -1)]
+    assert [task.title for task in second_page.context['object_list']] == [
+        f'Task {number}' for number in range(4, -1, -1)]
+    assert not second_page.context['page_obj'].has_next()
+    assert list(previous_page.context['object_list']) == list(
+        first_page.context['object_list'])
+    assert b'Page 1 of' not in first_page.content
+    assert not any('COUNT(' in query['sql'] for query in queries)
+
+
+@pytest.mark.parametrize('cursor', [
+    'bad', base64.urlsafe_b64encode(b'[null, 1, false]').decode(),
+    base64.urlsafe_b64encode(b'["2024-01-01", Infinity, false]').decode(),
+])
+def test_task_list_invalid_cursor(author_client, cursor):
+    """
+    Test that the task list with a malformed cursor is not found.
+    """
+    response = author_client.get(reverse('tasks:task_list'),
+                                 {'cursor': cursor})
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
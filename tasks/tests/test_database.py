@@ -0,0 +1,26 @@
+"""
+This module contains tests for the tuning of the SQLite connections.
+"""
+
+from django.db import connections
+
+
+def test_sqlite_connections_are_tuned(db, settings, tmp_path):
+    """
+    Test that the PRAGMA statements of the settings run
+    on every new connection.
+    """
+    settings.SQLITE_PRAGMAS = {'journal_mode': 'wal',
+                               'synchronous': 'normal',
+                               'busy_timeout': 1234}
+    connection = connections['default']
+    new_connection = connection.__class__(
+        {**connection.settings_dict, 'NAME': str(tmp_path / 'db.sqlite3')})
+    try:
+        with new_connection.cursor() as cursor:
+            values = [cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                      for name in settings.SQLITE_PRAGMAS]
+    finally:
+        new_connection.close()
+
+    assert values == ['wal', 1, 1234]
@@ -0,0 +1,59 @@
+"""
+This module contains tests for the import of tasks from files.
+"""
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from tasks.models import Task
+
+
+def test_import_tasks_command(tmp_path, author, capsys):
+    """
+    Test that the command imports a file in batches
+    and reports the invalid rows.
+    """
+    path = tmp_path / 'tasks.csv'
+    path.write_text('title,completed\n'
+                    + ''.join(f'Task {number},false\n' for number in range(5))
+                    + ',false\n', encoding='utf-8')
+
+    call_command('import_tasks', str(path), user=author.username,
+                 batch_size=2)
+
+    captured = capsys.readouterr()
+    assert Task.objects.filter(author=author).count() == 5
+    assert '5 tasks imported, 1 invalid rows skipped.' in captured.out
+    assert 'Line 7' in captured.err
+
+
+def test_import_stops_at_invalid_utf8(tmp_path, author, capsys):
+    """
+    Test that the rows before a line which is not UTF-8 are imported.
+    """
+    path = tmp_path / 'tasks.ndjson'
+    path.write_bytes(b'{"title": "Shopping"}\n\xff\xfe\n'
+                     b'{"title": "Cleaning"}\n')
+
+    call_command('import_tasks', str(path), user=author.username)
+
+    assert list(Task.objects.values_list('title', flat=True)) == ['Shopping']
+    assert 'not valid UTF-8' in capsys.readouterr().err
+
+
+@pytest.mark.parametrize('path, options, message', [
+    ('tasks.txt', {'user': 'author'}, '--format'),
+    ('tasks.csv', {'user': 'nobody'}, 'not found'),
+    ('missing.csv', {'user': 'author'}, 'No such file'),
+])
+def test_import_tasks_command_errors(tmp_path, author, path, options,
+                                     message):
+    """
+    Test that the command fails without a known format,
+    an existing user or an existing file.
+    """
+    (tmp_path / 'tasks.txt').write_text('title\n')
+    (tmp_path / 'tasks.csv').write_text('title\n')
+
+    with pytest.raises(CommandError, match=message):
+        call_command('import_tasks', str(tmp_path / path), **options)
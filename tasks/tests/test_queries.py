@@ -0,0 +1,38 @@
+"""
+This module contains query count regression tests for the task list.
+The number of queries of a page must not grow with the number of tasks.
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks.cache import task_lists
+from tasks.models import Task
+
+
+def count_queries(client, url, params=None):
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url, params)
+    return len(queries)
+
+
+@pytest.mark.parametrize('params', [{}, {'search': 'task'},
+                                    {'search': 'task',
+                                     'sort_by': 'relevance'},
+                                    {'sort_by': 'completed'}])
+def test_task_list_query_count_is_constant(author_client, author, params):
+    """
+    Test that the task list runs as many queries for a full page
+    as for a single task.
+    """
+    url = reverse('tasks:task_list')
+    Task.objects.create(title='Task', author=author)
+    queries_for_one_task = count_queries(author_client, url, params)
+    Task.objects.bulk_create([Task(title=f'Task {number}', author=author)
+                              for number in range(20)])
+    # bulk_create() sends no signal invalidating the cached lists.
+    task_lists.invalidate(author.pk)
+
+    assert count_queries(author_client, url, params) == queries_for_one_task
@@ -0,0 +1,128 @@
+"""
+This module contains tests for the scheduler of the task reminders.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from tasks.models import ReminderCheckpoint, Task
+from tasks.reminders import ReminderScheduler
+
+START = timezone.now().replace(microsecond=0)
+
+
+class Clock:
+    def __init__(self):
+        self.now = START
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, **kwargs):
+        self.now += timedelta(**kwargs)
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+def make_scheduler(clock, sent, **kwargs):
+    return ReminderScheduler(
+        lambda rows: sent.extend(row['title'] for row in rows),
+        clock=clock, **kwargs)
+
+
+def create_task(author, title, minutes, **kwargs):
+    return Task.objects.create(
+        title=title, author=author,
+        due_at=START + timedelta(minutes=minutes), **kwargs)
+
+
+def test_reminders_are_sent_when_due(author, clock, sent):
+    """
+    Test that the reminders of the pending tasks are sent in the order
+    of their due dates once they are due, and only once.
+    """
+    create_task(author, 'Second', 2)
+    create_task(author, 'First', 1)
+    create_task(author, 'Completed', 1, completed=True)
+    Task.objects.create(title='No due date', author=author)
+    scheduler = make_scheduler(clock, sent, poll_interval=300)
+
+    assert scheduler.step() == 60
+    clock.advance(minutes=1)
+    scheduler.step()
+    assert sent == ['First']
+    clock.advance(minutes=5)
+    scheduler.step()
+    scheduler.step()
+
+    assert sent == ['First', 'Second']
+
+
+def test_reminders_missed_while_stopped_are_sent(author, clock, sent):
+    """
+    Test that a restarted scheduler sends the reminders which fell due
+    while it was stopped, in batches, but not those it already sent.
+    """
+    create_task(author, 'Sent', 1)
+    scheduler = make_scheduler(clock, sent)
+    scheduler.step()
+    clock.advance(minutes=1)
+    scheduler.step()
+    for number in range(5):
+        create_task(author, f'Missed {number}', 2 + number)
+    clock.advance(hours=1)
+
+    scheduler = make_scheduler(clock, sent, batch_size=2)
+    delays = [scheduler.step() for _ in range(3)]
+
+    assert sent == ['Sent'] + [f'Missed {number}' for number in range(5)]
+    assert delays[:2] == [0, 0]
+    checkpoint = ReminderCheckpoint.objects.get()
+    assert checkpoint.task_id == Task.objects.get(title='Missed 4').pk
+
+
+def test_changed_tasks_are_rescheduled(author, clock, sent):
+    """
+    Test that a task given another due date after its reminder was read
+    is reminded at the new date, and a completed one is not reminded.
+    """
+    moved = create_task(author, 'Moved', 1)
+    completed = create_task(author, 'Completed', 1)
+    scheduler = make_scheduler(clock, sent)
+    scheduler.step()
+    moved.due_at = START + timedelta(minutes=3)
+    moved.save()
+    completed.completed = True
+    completed.save()
+
+    clock.advance(minutes=2)
+    scheduler.step()
+    assert sent == []
+    clock.advance(minutes=1)
+    scheduler.step()
+
+    assert sent == ['Moved']
+
+
+def test_pending_reminders_are_read_from_index(author, clock, sent):
+    """
+    Test that the pending reminders are read from the partial index
+    on the due date rather than by scanning the tasks.
+    """
+    scheduler = make_scheduler(clock, sent)
+    scheduler.checkpoint = scheduler.get_checkpoint()
+
+    plan = scheduler.get_pending()[:scheduler.batch_size].explain()
+
+    assert 'task_due_at_idx' in plan
+    assert 'TEMP B-TREE' not in plan
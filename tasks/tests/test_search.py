@@ -0,0 +1,72 @@
+"""
+This module contains tests for the task search of the 'tasks' application.
+It includes tests for prefix matching, ranking and keeping
+the search index in sync with the tasks.
+"""
+
+import pytest
+from django.urls import reverse
+
+from tasks.models import Task
+from tasks.search import ContainsSearchBackend, get_search_backend
+
+
+def search(author_client, query, **params):
+    url = reverse('tasks:task_list')
+    response = author_client.get(url, {'search': query, **params})
+    return [task.title for task in response.context['object_list']]
+
+
+@pytest.fixture
+def tasks(db, author):
+    """
+    Pytest fixture for creating tasks to search.
+    """
+    return [
+        Task.objects.create(title='Groceries', description='Buy milk',
+                            author=author),
+        Task.objects.create(title='Milk the cow',
+                            description='Milk, milk and milk',
+                            author=author),
+        Task.objects.create(title='Report', description='Quarterly report',
+                            author=author),
+    ]
+
+
+def test_search_matches_prefixes_ranked(author_client, tasks):
+    """
+    Test that the search matches word prefixes in titles and descriptions
+    and puts the most relevant tasks first.
+    """
+    assert search(author_client, 'mil', sort_by='relevance') == [
+        'Milk the cow', 'Groceries']
+    assert search(author_client, 'quart rep') == ['Report']
+
+
+def test_search_follows_task_changes(author_client, tasks):
+    """
+    Test that the search index is updated when tasks change.
+    """
+    tasks[2].description = 'Annual summary'
+    tasks[2].save()
+    tasks[0].delete()
+
+    assert search(author_client, 'quarterly') == []
+    assert search(author_client, 'annual') == ['Report']
+    assert search(author_client, 'milk') == ['Milk the cow']
+
+
+def test_search_only_returns_own_tasks(user, tasks):
+    """
+    Test that users do not find the tasks of other users.
+    """
+    assert search(user, 'milk') == []
+
+
+def test_search_backend_setting(settings):
+    """
+    Test that the search backend can be chosen in the settings.
+    """
+    settings.TASK_SEARCH_BACKEND = 'tasks.search.ContainsSearchBackend'
+
+    assert isinstance(get_search_backend(), ContainsSearchBackend)
@@ -4,16 +4,23 @@ It includes views for registering a user, viewing and updating a user profile,
 and creating, updating, deleting and listing tasks.
 """
 
+from functools import partial
+
+from django.core.paginator import Page
+from django.http import Http404
 from django.urls import reverse, reverse_lazy
 from django.views.generic import (CreateView, DetailView, UpdateView,
                                   DeleteView, ListView)
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.forms import UserChangeForm
 from django.contrib.auth.models import User
-from django.db.models import Q
 
+from tasks.cache import task_lists
 from tasks.models import Task
 from tasks.forms import TaskForm, RegistrationForm
+from tasks.pagination import (ORDERINGS, RELEVANCE, InvalidCursor,
+                              KeysetPage, KeysetPaginator)
+from tasks.search import get_search_backend
 
 
 class TaskAuthorMixin(UserPassesTestMixin):
@@ -86,7 +93,7 @@ class TaskUpdateView(TaskAuthorMixin, UpdateView):
     """
     model = Task
     template_name = 'tasks/task_update.html'
-    fields = ['title', 'description', 'completed']
+    fields = ['title', 'description', 'completed', 'due_at']
 
 
 class TaskDeleteView(TaskAuthorMixin, DeleteView):
@@ -103,24 +110,90 @@ class TaskDeleteView(TaskAuthorMixin, DeleteView):
 class TaskListView(ListView):
     """
     View for listing all tasks for the current user.
+    The list is paginated with next and previous cursors,
+    except for search results ordered by relevance,
+    which are paginated with page numbers.
+    The pages are cached per user until a task of the user changes.
     """
     model = Task
     template_name = 'tasks/task_list.html'
     paginate_by = 10
+    list_fields = ['id', 'title', 'description', 'completed', 'due_at',
+                   'created_at', 'updated_at', 'author__username']
+
+    def get_sort_by(self):
+        sort_by = self.request.GET.get('sort_by', '-created_at')
+        if sort_by in ORDERINGS:
+            return sort_by
+        if sort_by == RELEVANCE and self.request.GET.get('search'):
+            return RELEVANCE
+        return '-created_at'
 
     def get_queryset(self):
         queryset = super().get_queryset()
         if self.request.user.is_authenticated:
-            queryset = queryset.filter(author=self.request.user)
+            # Load only the columns rendered by the template,
+            # with the author in the same query.
+            queryset = queryset.filter(
+                author=self.request.user).select_related('author').only(
+                    *self.list_fields)
             # Get the query parameters for filtering and sorting
             search_query = self.request.GET.get('search', '')
-            sort_by = self.request.GET.get('sort_by', '-created_at')
+            sort_by = self.get_sort_by()
             if search_query:
-                queryset = queryset.filter(
-                    Q(title__icontains=search_query) |
-                    Q(description__icontains=search_query))
-            if sort_by in ['-created_at', '-updated_at', '-completed']:
+                # Search results are ordered by relevance
+                # unless another order is chosen.
+                queryset = get_search_backend().search(queryset, search_query)
+            if sort_by != RELEVANCE:
                 queryset = queryset.order_by(sort_by)
         else:
             queryset = Task.objects.none()
         return queryset
+
+    def paginate_queryset(self, queryset, page_size):
+        sort_by = self.get_sort_by()
+        paginate = partial(self.paginate_tasks, queryset, page_size, sort_by)
+        if self.request.user.is_authenticated:
+            params = ('web', sort_by, self.request.GET.get('search', ''),
+                      self.request.GET.get('cursor'),
+                      self.request.GET.get('page'), page_size)
+            pagination = task_lists.get_or_set(self.request.user.pk, params,
+                                               paginate)
+        else:
+            pagination = paginate()
+        if sort_by == RELEVANCE:
+            object_list, count, number = pagination
+            paginator = self.get_paginator(queryset, page_size)
+            # The number of tasks is cached with the page.
+            paginator.count = count
+            page = Page(object_list, number, paginator)
+        else:
+            paginator = KeysetPaginator(queryset, sort_by, page_size)
+            page = KeysetPage(*pagination)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def paginate_tasks(self, queryset, page_size, sort_by):
+        """
+        Return the tasks of the page with what is needed
+        to build the page again: the number of tasks and the page number
+        for relevance order, the cursors otherwise.
+        """
+        if sort_by == RELEVANCE:
+            _, page, object_list, _ = super().paginate_queryset(
+                queryset, page_size)
+            return list(object_list), page.paginator.count, page.number
+        paginator = KeysetPaginator(queryset, sort_by, page_size)
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        return page.object_list, page.next_cursor, page.previous_cursor
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Query parameters kept by the pagination links.
+        params = self.request.GET.copy()
+        params.pop('cursor', None)
+        params.pop('page', None)
+        context['query_string'] = params.urlencode()
+        return context
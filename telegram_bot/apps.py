@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_delete
+
+
+class TelegramBotConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'telegram_bot'
+
+    def ready(self):
+        from django.contrib.auth.models import User
+
+        from telegram_bot.users import forget_user
+        post_delete.connect(forget_user, sender=User,
+                            dispatch_uid='telegram_bot_forget_user')
@@ -0,0 +1,62 @@
+"""
+This module contains the TeleBot subclass used by the Task Manager bot.
+"""
+
+import telebot
+
+from taskmaster import metrics
+from telegram_bot.outbox import Outbox
+from telegram_bot.ratelimit import SendRateLimiter
+
+
+class RateLimitedTeleBot(telebot.TeleBot):
+    """
+    TeleBot that never exceeds the Telegram flood limits.
+    Once its outbox is started, messages and message edits are queued
+    and sent by the outbox workers, which wait for the rate limiter.
+    Otherwise they are sent right away after waiting for it.
+    Documents are always sent right away, since their files belong
+    to the caller.
+    """
+    def __init__(self, token, rate_limiter=None, **kwargs):
+        super().__init__(token, **kwargs)
+        self.rate_limiter = rate_limiter or SendRateLimiter()
+        self.outbox = None
+
+    def start_outbox(self, **kwargs):
+        """
+        Start sending the messages through an outbox
+        created with the keyword arguments.
+        """
+        self.outbox = Outbox(self.rate_limiter, **kwargs)
+        self.outbox.start()
+        metrics.collectors.append(self.outbox.render_metrics)
+
+    def stop_outbox(self):
+        """
+        Send the queued messages and stop the outbox.
+        """
+        outbox, self.outbox = self.outbox, None
+        outbox.stop()
+        metrics.collectors.remove(outbox.render_metrics)
+
+    def send_message(self, chat_id, text, *args, **kwargs):
+        send = super().send_message
+        if self.outbox is not None:
+            return self.outbox.put(chat_id, send, chat_id, text, *args,
+                                   **kwargs)
+        self.rate_limiter.acquire(chat_id)
+        return send(chat_id, text, *args, **kwargs)
+
+    def send_document(self, chat_id, document, *args, **kwargs):
+        self.rate_limiter.acquire(chat_id)
+        return super().send_document(chat_id, document, *args, **kwargs)
+
+    def edit_message_text(self, text, chat_id=None, *args, **kwargs):
+        send = super().edit_message_text
+        if self.outbox is not None and chat_id is not None:
+            return self.outbox.put(chat_id, send, text, chat_id, *args,
+                                   **kwargs)
+        if chat_id is not None:
+            self.rate_limiter.acquire(chat_id)
+        return send(text, chat_id, *args, **kwargs)
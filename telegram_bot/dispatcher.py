@@ -0,0 +1,136 @@
+"""
+This module contains the dispatcher that handles Telegram updates
+concurrently with a pool of worker threads.
+"""
+
+import logging
+import queue
+import threading
+import time
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NUM_WORKERS = 8
+DEFAULT_QUEUE_SIZE = 1000
+POLLING_TIMEOUT = 20
+POLLING_ERROR_DELAY = 3
+
+
+def get_chat_id(update):
+    """
+    Return the id of the chat the update belongs to,
+    or 0 if the update is not related to a chat.
+    """
+    message = update.message or update.edited_message
+    if message is None and update.callback_query is not None:
+        message = update.callback_query.message
+        if message is None:
+            return update.callback_query.from_user.id
+    if message is None:
+        return 0
+    return message.chat.id
+
+
+class UpdateDispatcher:
+    """
+    Distributes updates among a pool of worker threads.
+    Every worker has its own queue and updates from the same chat
+    always go to the same worker, so they are handled in the order
+    they were received, while different chats are handled concurrently.
+    The queues are bounded: when they are full, dispatching blocks
+    and the bot stops fetching new updates until the workers catch up.
+    """
+    def __init__(self, bot, num_workers=DEFAULT_NUM_WORKERS,
+                 queue_size=DEFAULT_QUEUE_SIZE):
+        self.bot = bot
+        self.queues = [queue.Queue(maxsize=queue_size)
+                       for _ in range(num_workers)]
+        self.workers = []
+
+    def start(self):
+        """
+        Start the worker threads.
+        """
+        for index, updates in enumerate(self.queues):
+            worker = threading.Thread(target=self._work, args=(updates,),
+                                      name=f'UpdateWorker-{index}',
+                                      daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def stop(self):
+        """
+        Let the workers finish the queued updates and stop them.
+        """
+        for updates in self.queues:
+            updates.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.workers = []
+
+    def dispatch(self, update):
+        """
+        Put the update into the queue of the worker serving its chat.
+        """
+        index = hash(get_chat_id(update)) % len(self.queues)
+        self.queues[index].put(update)
+
+    def try_dispatch(self, update):
+        """
+        Put the update into the queue of the worker serving its chat
+        without blocking. Return False if the queue is full.
+        """
+        index = hash(get_chat_id(update)) % len(self.queues)
+        try:
+            self.queues[index].put_nowait(update)
+        except queue.Full:
+            return False
+        return True
+
+    def _work(self, updates):
+        while True:
+            update = updates.get()
+            if update is None:
+                updates.task_done()
+                return
+            close_old_connections()
+            try:
+                self.bot.process_new_updates([update])
+            except Exception:
+                logger.exception('Failed to process update %s',
+                                 update.update_id)
+            finally:
+                close_old_connections()
+                updates.task_done()
+
+    def join(self):
+        """
+        Block until all dispatched updates have been processed.
+        """
+        for updates in self.queues:
+            updates.join()
+
+    def polling(self, timeout=POLLING_TIMEOUT):
+        """
+        Fetch updates with long polling and dispatch them
+        until the process is interrupted.
+        """
+        self.start()
+        offset = None
+        try:
+            while True:
+                try:
+                    updates = self.bot.get_updates(
+                        offset=offset, timeout=timeout,
+                        long_polling_timeout=timeout)
+                except Exception:
+                    logger.exception('Failed to get updates')
+                    time.sleep(POLLING_ERROR_DELAY)
+                    continue
+                for update in updates:
+                    self.dispatch(update)
+                    offset = update.update_id + 1
+        finally:
+            self.stop()
@@ -0,0 +1,69 @@
+"""
+This module contains the command posting fake updates to the bot webhook.
+It is used to try the webhook locally without Telegram.
+"""
+
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from telegram_bot.views import SECRET_TOKEN_HEADER
+
+
+def make_update(update_id, chat_id, text):
+    """
+    Return the JSON of an update with a private text message.
+    """
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Test'},
+            'text': text,
+            'entities': [{'type': 'bot_command', 'offset': 0,
+                          'length': len(text.split()[0])}],
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = 'Post fake /start and /list_tasks updates to the bot webhook.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', default='http://127.0.0.1:8000/telegram/webhook/')
+        parser.add_argument('--count', type=int, default=100)
+        parser.add_argument('--chats', type=int, default=10)
+        parser.add_argument('--concurrency', type=int, default=10)
+
+    def handle(self, *args, **options):
+        headers = {'Content-Type': 'application/json'}
+        if settings.BOT_WEBHOOK_SECRET:
+            headers[SECRET_TOKEN_HEADER] = settings.BOT_WEBHOOK_SECRET
+
+        def post(update_id):
+            text = '/start' if update_id % 2 else '/list_tasks'
+            data = json.dumps(make_update(
+                update_id, 10 ** 6 + update_id % options['chats'], text))
+            request = urllib.request.Request(
+                options['url'], data=data.encode(), headers=headers)
+            try:
+                with urllib.request.urlopen(request) as response:
+                    return response.status
+            except urllib.error.HTTPError as error:
+                return error.code
+
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            statuses = list(executor.map(post, range(1, options['count'] + 1)))
+        elapsed = time.perf_counter() - started_at
+        accepted = statuses.count(200)
+        self.stdout.write(
+            f'Posted {len(statuses)} updates in {elapsed:.2f}s'
+            f' ({len(statuses) / elapsed:.0f}/s), {accepted} accepted.')
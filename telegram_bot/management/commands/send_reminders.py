@@ -0,0 +1,44 @@
+"""
+This module contains the command sending the reminders of the tasks
+due to their authors through the bot.
+Only one instance of the command should run at a time.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.reminders import (REMINDER_BATCH_SIZE, REMINDER_POLL_INTERVAL,
+                             REMINDER_WINDOW, ReminderScheduler)
+
+
+class Command(BaseCommand):
+    help = 'Send the reminders of the tasks as they fall due, until stopped.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--window', type=int,
+            default=int(REMINDER_WINDOW.total_seconds()),
+            help='Seconds ahead of which the reminders are read.')
+        parser.add_argument('--batch-size', type=int,
+                            default=REMINDER_BATCH_SIZE)
+        parser.add_argument('--poll-interval', type=float,
+                            default=REMINDER_POLL_INTERVAL)
+
+    def handle(self, *args, **options):
+        # Importing the bot module registers the handlers.
+        from bot import bot, send_reminders
+        bot.start_outbox(num_workers=settings.BOT_SEND_WORKERS,
+                         queue_size=settings.BOT_SEND_QUEUE_SIZE,
+                         max_retries=settings.BOT_SEND_MAX_RETRIES)
+        scheduler = ReminderScheduler(
+            send_reminders, window=timedelta(seconds=options['window']),
+            batch_size=options['batch_size'],
+            poll_interval=options['poll_interval'])
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            bot.stop_outbox()
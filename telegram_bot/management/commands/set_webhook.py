@@ -0,0 +1,34 @@
+"""
+This module contains the command registering the bot webhook in Telegram.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Register the URL of the bot webhook in Telegram.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'url', nargs='?',
+            help='Public URL of the webhook, for example'
+                 ' https://example.com/telegram/webhook/.'
+                 ' Without it the webhook is removed.')
+        parser.add_argument('--max-connections', type=int, default=40)
+
+    def handle(self, *args, **options):
+        if options['url'] and not settings.BOT_WEBHOOK_SECRET:
+            raise CommandError('Set the BOT_WEBHOOK_SECRET environment'
+                               ' variable, the webhook refuses updates'
+                               ' without it.')
+        from bot import bot
+        if options['url']:
+            bot.set_webhook(
+                url=options['url'],
+                max_connections=options['max_connections'],
+                secret_token=settings.BOT_WEBHOOK_SECRET)
+            self.stdout.write(f'Webhook set to {options["url"]}.')
+        else:
+            bot.remove_webhook()
+            self.stdout.write('Webhook removed.')
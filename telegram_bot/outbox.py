@@ -0,0 +1,200 @@
+"""
+This module contains the outbox of the bot: the queue of its outgoing
+requests to the Telegram Bot API, sent by a pool of worker threads,
+so handlers return as soon as their replies are queued and a slow
+or throttled API call does not hold a handler.
+Every worker sends over its own keep-alive HTTP session of telebot,
+waits for the rate limiter, and retries the requests refused with 429
+after the `retry_after` delay given by Telegram, and the failed ones
+with an exponential backoff.
+"""
+
+import logging
+import queue
+import random
+import threading
+import time
+
+import requests
+from telebot.apihelper import ApiHTTPException, ApiTelegramException
+
+from taskmaster import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NUM_WORKERS = 8
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+TOO_MANY_REQUESTS = 429
+
+
+def get_retry_after(error):
+    """
+    Return the delay in seconds requested by Telegram with a 429 error.
+    """
+    parameters = error.result_json.get('parameters') or {}
+    return parameters.get('retry_after', 1)
+
+
+class Outbox:
+    """
+    Bounded queue of the outgoing requests, drained by worker threads.
+    Requests to the same chat always go to the same worker,
+    so the messages of a chat are delivered in order.
+    When the queues are full, queueing blocks, and so do the handlers
+    and in turn the dispatcher, until the workers catch up.
+    A 429 error pauses all the workers, since Telegram limits the bot
+    as a whole.
+    """
+    def __init__(self, rate_limiter, num_workers=DEFAULT_NUM_WORKERS,
+                 queue_size=DEFAULT_QUEUE_SIZE,
+                 max_retries=DEFAULT_MAX_RETRIES, sleep=time.sleep,
+                 clock=time.monotonic):
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.sleep = sleep
+        self.clock = clock
+        self.queues = [queue.Queue(maxsize=queue_size)
+                       for _ in range(num_workers)]
+        self.workers = []
+        self.lock = threading.Lock()
+        self.paused_until = 0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.latency = metrics.Histogram(
+            'taskmaster_bot_send_latency_seconds',
+            'Time from queueing to delivery of the outgoing requests.',
+            'method', metrics.DURATION_BUCKETS)
+
+    def start(self):
+        """
+        Start the worker threads.
+        """
+        for index, requests_queue in enumerate(self.queues):
+            worker = threading.Thread(target=self._work,
+                                      args=(requests_queue,),
+                                      name=f'SendWorker-{index}',
+                                      daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def stop(self):
+        """
+        Let the workers send the queued requests and stop them.
+        """
+        for requests_queue in self.queues:
+            requests_queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.workers = []
+
+    def join(self):
+        """
+        Block until all queued requests have been sent or given up.
+        """
+        for requests_queue in self.queues:
+            requests_queue.join()
+
+    def put(self, chat_id, send, *args, **kwargs):
+        """
+        Queue the call of `send`, a method of the bot sending a request
+        to the chat, with the arguments.
+        """
+        index = hash(chat_id) % len(self.queues)
+        self.queues[index].put((chat_id, send, args, kwargs, self.clock()))
+
+    @property
+    def depth(self):
+        return sum(requests_queue.qsize() for requests_queue in self.queues)
+
+    def _work(self, requests_queue):
+        while True:
+            request = requests_queue.get()
+            if request is None:
+                requests_queue.task_done()
+                return
+            try:
+                self.deliver(*request)
+            except Exception:
+                logger.exception('Failed to send a request to chat %s',
+                                 request[0])
+                self.count('failed')
+            finally:
+                requests_queue.task_done()
+
+    def deliver(self, chat_id, send, args, kwargs, queued_at):
+        """
+        Send the request, retrying it after 429 errors, server errors
+        and network errors up to `max_retries` times.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.wait_for_pause()
+            self.rate_limiter.acquire(chat_id)
+            try:
+                send(*args, **kwargs)
+            except ApiTelegramException as error:
+                if error.error_code == TOO_MANY_REQUESTS:
+                    delay = max(get_retry_after(error), self.backoff(attempt))
+                    self.pause(delay)
+                elif error.error_code >= 500:
+                    delay = self.backoff(attempt)
+                else:
+                    raise
+            except (ApiHTTPException, requests.RequestException):
+                delay = self.backoff(attempt)
+            else:
+                self.count('sent')
+                self.latency.observe(send.__name__,
+                                     self.clock() - queued_at)
+                return
+            if attempt == self.max_retries:
+                break
+            self.count('retried')
+            self.sleep(delay)
+        logger.warning('Gave up sending a request to chat %s after %d'
+                       ' attempts', chat_id, self.max_retries + 1)
+        self.count('failed')
+
+    def backoff(self, attempt):
+        """
+        Return the delay before the retry after the attempt,
+        doubling with every attempt, with jitter.
+        """
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+        return delay * random.uniform(0.5, 1)
+
+    def pause(self, delay):
+        with self.lock:
+            self.paused_until = max(self.paused_until, self.clock() + delay)
+
+    def wait_for_pause(self):
+        with self.lock:
+            delay = self.paused_until - self.clock()
+        if delay > 0:
+            self.sleep(delay)
+
+    def count(self, name):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def render_metrics(self):
+        """
+        Return the metrics of the outbox in the Prometheus format.
+        """
+        return [
+            *metrics.render_gauge('taskmaster_bot_send_queue_depth',
+                                  'Outgoing requests waiting in the queue.',
+                                  self.depth),
+            *metrics.render_counter('taskmaster_bot_sent_total',
+                                    'Outgoing requests sent.', self.sent),
+            *metrics.render_counter('taskmaster_bot_send_retries_total',
+                                    'Outgoing requests retried.',
+                                    self.retried),
+            *metrics.render_counter('taskmaster_bot_send_failures_total',
+                                    'Outgoing requests given up.',
+                                    self.failed),
+            *self.latency.render(),
+        ]
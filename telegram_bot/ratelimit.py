@@ -0,0 +1,108 @@
+"""
+This module contains token bucket rate limiters used to throttle
+outgoing requests to the Telegram Bot API.
+The limits follow the Telegram recommendations: no more than one message
+per second in a private chat, twenty messages per minute in a group
+and thirty messages per second overall.
+"""
+
+import threading
+import time
+
+GLOBAL_MESSAGES_PER_SECOND = 30
+CHAT_MESSAGES_PER_SECOND = 1
+GROUP_MESSAGES_PER_SECOND = 20 / 60
+MAX_IDLE_CHAT_BUCKETS = 10000
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+    Tokens are refilled continuously at `rate` tokens per second
+    up to `capacity`. A token is reserved even when the bucket is empty,
+    and the caller is told how long to wait before using it,
+    so waiting callers are served in the order they arrived.
+    """
+    def __init__(self, rate, capacity=1, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.updated_at = clock()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take a token and return the number of seconds
+        to wait before it may be used.
+        """
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def is_full(self):
+        """
+        Return True if the bucket would be full at the current moment.
+        """
+        with self.lock:
+            elapsed = self.clock() - self.updated_at
+            return self.tokens + elapsed * self.rate >= self.capacity
+
+    def acquire(self):
+        """
+        Block until a token is available.
+        """
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+
+class SendRateLimiter:
+    """
+    Rate limiter for outgoing messages.
+    Each chat has its own bucket, and all chats share a global bucket.
+    Buckets of idle chats are discarded once there are too many of them.
+    """
+    def __init__(self, global_rate=GLOBAL_MESSAGES_PER_SECOND,
+                 chat_rate=CHAT_MESSAGES_PER_SECOND,
+                 group_rate=GROUP_MESSAGES_PER_SECOND, clock=time.monotonic):
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.clock = clock
+        self.global_bucket = TokenBucket(global_rate, capacity=global_rate,
+                                         clock=clock)
+        self.chat_buckets = {}
+        self.lock = threading.Lock()
+
+    def get_chat_bucket(self, chat_id):
+        """
+        Return the bucket of the given chat, creating it if necessary.
+        Group chats have negative ids and a lower rate.
+        """
+        with self.lock:
+            bucket = self.chat_buckets.get(chat_id)
+            if bucket is None:
+                if len(self.chat_buckets) >= MAX_IDLE_CHAT_BUCKETS:
+                    self.chat_buckets = {
+                        key: value
+                        for key, value in self.chat_buckets.items()
+                        if not value.is_full()}
+                is_group = isinstance(chat_id, int) and chat_id < 0
+                rate = self.group_rate if is_group else self.chat_rate
+                bucket = TokenBucket(rate, clock=self.clock)
+                self.chat_buckets[chat_id] = bucket
+            return bucket
+
+    def acquire(self, chat_id):
+        """
+        Block until a message may be sent to the given chat.
+        """
+        self.get_chat_bucket(chat_id).acquire()
+        self.global_bucket.acquire()
@@ -0,0 +1,95 @@
+"""
+This module contains the storages of the bot conversation states.
+When a command needs a reply, the bot stores the pending operation
+and, if it is already known, the primary key of the task,
+so the reply is routed to its handler with a single lookup.
+States are kept in the process memory by default, or in a Django cache
+(for example a database or file-based one) configured by
+the BOT_STATE_CACHE setting, which the webhook requires.
+"""
+
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+
+from taskmaster.lru import LRUCache
+
+CREATE_TASK = 'create_task'
+UPDATE_TASK = 'update_task'
+DELETE_TASK = 'delete_task'
+CONFIRM_DELETION = 'confirm_deletion'
+SET_DUE_DATE = 'set_due_date'
+
+STATE_TTL = 24 * 60 * 60
+MAX_MEMORY_STATES = 100000
+
+State = namedtuple('State', ['operation', 'task_id'], defaults=[None])
+
+
+class MemoryStateStorage:
+    """
+    Storage keeping the states in the process memory.
+    """
+    def __init__(self, maxsize=MAX_MEMORY_STATES, ttl=STATE_TTL):
+        self.states = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, chat_id, user_id):
+        return self.states.get((chat_id, user_id))
+
+    def set(self, chat_id, user_id, state):
+        self.states.set((chat_id, user_id), state)
+
+    def delete(self, chat_id, user_id):
+        self.states.delete((chat_id, user_id))
+
+
+class CacheStateStorage:
+    """
+    Storage keeping the states in a Django cache,
+    so they survive restarts and are shared between processes.
+    """
+    def __init__(self, alias, ttl=STATE_TTL):
+        self.cache = caches[alias]
+        self.ttl = ttl
+
+    @staticmethod
+    def make_key(chat_id, user_id):
+        return f'bot_state:{chat_id}:{user_id}'
+
+    def get(self, chat_id, user_id):
+        state = self.cache.get(self.make_key(chat_id, user_id))
+        return State(*state) if state is not None else None
+
+    def set(self, chat_id, user_id, state):
+        self.cache.set(self.make_key(chat_id, user_id), tuple(state),
+                       self.ttl)
+
+    def delete(self, chat_id, user_id):
+        self.cache.delete(self.make_key(chat_id, user_id))
+
+
+def get_state_storage():
+    """
+    Return the state storage configured in the settings.
+    """
+    if settings.BOT_STATE_CACHE:
+        return CacheStateStorage(settings.BOT_STATE_CACHE)
+    return MemoryStateStorage()
+
+
+def check_shared_state_storage():
+    """
+    Raise ImproperlyConfigured unless the states are kept in a cache
+    shared between the processes. The webhook may be served by several
+    processes, and the reply to a command may reach another process
+    than the command.
+    """
+    alias = settings.BOT_STATE_CACHE
+    if not alias or isinstance(caches[alias], LocMemCache):
+        raise ImproperlyConfigured(
+            'The bot webhook requires BOT_STATE_CACHE to name a cache'
+            ' shared between the processes, such as a database'
+            ' or file-based cache.')
@@ -0,0 +1,203 @@
+"""
+This module contains pytest fixtures for the 'telegram_bot' application.
+It includes a fake Telegram Bot API and a factory of incoming updates.
+"""
+
+import itertools
+import json
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+import pytest
+from telebot import apihelper, types
+
+from telegram_bot.users import user_ids
+
+CHAT_ID = 1001
+
+
+class FakeResponse:
+    """
+    Minimal stand-in for a `requests` response of the Telegram Bot API.
+    """
+    status_code = 200
+
+    def __init__(self, result):
+        self.text = json.dumps({'ok': True, 'result': result})
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class FakeTelegramAPI:
+    """
+    Records the requests made by the bot and answers them successfully.
+    """
+    def __init__(self):
+        self.requests = []
+        # (method name, file name, content) of the uploaded files.
+        self.files = []
+        self.message_ids = itertools.count(1)
+
+    def __call__(self, method, url, params=None, files=None, **kwargs):
+        method_name = url.rsplit('/', 1)[-1]
+        self.requests.append((method_name, params or {}))
+        for name, file in (files or {}).items():
+            if isinstance(file, tuple):
+                name, file = file
+            self.files.append((method_name, name, file.read()))
+        params = params or {}
+        return FakeResponse({
+            'message_id': next(self.message_ids),
+            'date': 0,
+            'chat': {'id': int(params.get('chat_id', CHAT_ID)),
+                     'type': 'private'},
+            'text': params.get('text', ''),
+        })
+
+    @property
+    def sent_texts(self):
+        return [params.get('text') for method_name, params in self.requests
+                if method_name == 'sendMessage']
+
+
+@pytest.fixture
+def telegram_api(monkeypatch):
+    """
+    Pytest fixture replacing the Telegram Bot API with a fake one.
+    """
+    fake_api = FakeTelegramAPI()
+    monkeypatch.setattr(apihelper, 'CUSTOM_REQUEST_SENDER', fake_api)
+    return fake_api
+
+
+class TelegramServerHandler(BaseHTTPRequestHandler):
+    """
+    Handler of the fake Telegram Bot API server, answering with
+    the queued error responses of the method, then successfully.
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        server = self.server
+        # telebot sends the parameters in the query string.
+        path, _, query = self.path.partition('?')
+        method_name = path.rsplit('/', 1)[-1]
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        params = dict(parse_qsl(query))
+        with server.lock:
+            errors = server.errors.get(method_name)
+            status, body = errors.popleft() if errors else (200, {
+                'ok': True, 'result': {
+                    'message_id': 1, 'date': 0,
+                    'chat': {'id': int(params.get('chat_id', CHAT_ID)),
+                             'type': 'private'}}})
+            server.requests.append((method_name, params, status))
+            server.client_ports.add(self.client_address[1])
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def telegram_server(monkeypatch):
+    """
+    Pytest fixture serving a fake Telegram Bot API over HTTP
+    on a local port, used by the bot instead of the real one.
+    Responses are queued in `errors` by method name, and the requests
+    are recorded with the client ports of their connections.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), TelegramServerHandler)
+    server.lock = threading.Lock()
+    server.errors = {}
+    server.requests = []
+    server.client_ports = set()
+
+    def add_error(method_name, status, body):
+        server.errors.setdefault(method_name, deque()).append(
+            (status, body))
+
+    server.add_error = add_error
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(
+        apihelper, 'API_URL',
+        f'http://127.0.0.1:{server.server_address[1]}/bot{{0}}/{{1}}')
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_update():
+    """
+    Pytest fixture returning a factory of incoming text message updates.
+    """
+    update_ids = itertools.count(1)
+
+    def factory(text, chat_id=CHAT_ID, user_id=CHAT_ID, reply_to_text=None):
+        update_id = next(update_ids)
+        message = {
+            'message_id': update_id,
+            'date': 0,
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': {'id': user_id, 'is_bot': False, 'first_name': 'User'},
+            'text': text,
+        }
+        if text.startswith('/'):
+            message['entities'] = [{'type': 'bot_command', 'offset': 0,
+                                    'length': len(text.split()[0])}]
+        if reply_to_text is not None:
+            message['reply_to_message'] = {
+                'message_id': 0,
+                'date': 0,
+                'chat': {'id': chat_id, 'type': 'private'},
+                'text': reply_to_text,
+            }
+        return types.Update.de_json({'update_id': update_id,
+                                     'message': message})
+
+    return factory
+
+
+@pytest.fixture
+def make_callback():
+    """
+    Pytest fixture returning a factory of callback query updates
+    sent by the inline buttons of a message of the bot.
+    """
+    update_ids = itertools.count(10 ** 6)
+
+    def factory(data, message_id=1, chat_id=CHAT_ID, user_id=CHAT_ID):
+        update_id = next(update_ids)
+        return types.Update.de_json({'update_id': update_id,
+                                     'callback_query': {
+            'id': str(update_id),
+            'from': {'id': user_id, 'is_bot': False, 'first_name': 'User'},
+            'message': {'message_id': message_id, 'date': 0,
+                        'chat': {'id': chat_id, 'type': 'private'},
+                        'text': ''},
+            'chat_instance': str(chat_id),
+            'data': data,
+        }})
+
+    return factory
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    """
+    Pytest fixture emptying the user cache, since the test database
+    is rolled back without deleting the cached users.
+    """
+    user_ids.clear()
+    yield
+    user_ids.clear()
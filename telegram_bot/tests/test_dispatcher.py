@@ -0,0 +1,83 @@
+"""
+This module contains tests for the update dispatcher and the rate limiters
+of the 'telegram_bot' application.
+"""
+
+import threading
+
+import pytest
+
+from telegram_bot.dispatcher import UpdateDispatcher, get_chat_id
+from telegram_bot.ratelimit import SendRateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingBot:
+    def __init__(self):
+        self.handled = []
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def process_new_updates(self, updates):
+        with self.lock:
+            self.handled.extend(updates)
+            self.threads.add(threading.current_thread().name)
+
+
+def test_updates_of_one_chat_keep_their_order(make_update):
+    """
+    Test that the updates of a chat are handled in the order
+    they were dispatched, while several chats use several workers.
+    """
+    bot = RecordingBot()
+    dispatcher = UpdateDispatcher(bot, num_workers=4)
+    updates = [make_update(str(number), chat_id=chat_id)
+               for number in range(50) for chat_id in range(1, 9)]
+
+    dispatcher.start()
+    for update in updates:
+        dispatcher.dispatch(update)
+    dispatcher.join()
+    dispatcher.stop()
+
+    assert len(bot.handled) == len(updates)
+    assert len(bot.threads) > 1
+    for chat_id in range(1, 9):
+        texts = [update.message.text for update in bot.handled
+                 if get_chat_id(update) == chat_id]
+        assert texts == [str(number) for number in range(50)]
+
+
+def test_token_bucket_spaces_out_requests():
+    """
+    Test that the token bucket makes callers wait once it is empty.
+    """
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+
+    delays = [bucket.reserve() for _ in range(4)]
+    clock.now = 10
+    delay_after_refill = bucket.reserve()
+
+    assert delays == [0, 0, pytest.approx(0.5), pytest.approx(1.0)]
+    assert delay_after_refill == 0
+
+
+def test_group_chats_have_lower_rate():
+    """
+    Test that group chats are limited to twenty messages per minute.
+    """
+    limiter = SendRateLimiter(clock=FakeClock())
+
+    limiter.get_chat_bucket(-1).reserve()
+    limiter.get_chat_bucket(1).reserve()
+
+    assert limiter.get_chat_bucket(-1).reserve() == pytest.approx(3)
+    assert limiter.get_chat_bucket(1).reserve() == pytest.approx(1)
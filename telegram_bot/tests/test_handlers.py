@@ -0,0 +1,307 @@
+"""
+This module contains tests for the handlers of the Telegram bot.
+It includes tests for creating, listing and deleting tasks
+through the bot commands.
+"""
+
+import datetime
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+import bot as task_bot
+from tasks.cache import task_lists
+from tasks.models import DeletedTask, Task
+from telegram_bot.ratelimit import SendRateLimiter
+from telegram_bot.states import MemoryStateStorage
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def bot_setup(monkeypatch):
+    """
+    Pytest fixture giving the bot a token for the fake Telegram API
+    and lifting the rate limits.
+    """
+    monkeypatch.setattr(task_bot.bot, 'token', '1:TEST')
+    monkeypatch.setattr(task_bot, 'conversations', MemoryStateStorage())
+    monkeypatch.setattr(task_bot.bot, 'rate_limiter',
+                        SendRateLimiter(global_rate=10 ** 6,
+                                        chat_rate=10 ** 6))
+
+
+def test_start_creates_user(telegram_api, make_update,
+                            django_user_model):
+    """
+    Test that the /start command registers the Telegram user.
+    """
+    task_bot.bot.process_new_updates([make_update('/start')])
+
+    assert django_user_model.objects.filter(username='1001').exists()
+    assert telegram_api.sent_texts[0].startswith('Hello!')
+
+
+def test_create_and_list_tasks(telegram_api, make_update):
+    """
+    Test that a task created through the bot is listed by /list_tasks.
+    """
+    task_bot.bot.process_new_updates([make_update('/start')])
+    task_bot.bot.process_new_updates([make_update('/create_task')])
+    task_bot.bot.process_new_updates([make_update('Shopping buy milk')])
+    task_bot.bot.process_new_updates([make_update('/list_tasks')])
+
+    assert Task.objects.filter(title='Shopping',
+                               description='buy milk').exists()
+    assert telegram_api.sent_texts[-1] == '[ ] Shopping'
+
+
+def test_update_task_changes_description(telegram_api, make_update):
+    """
+    Test that /update_task replaces the description of the task.
+    """
+    task_bot.bot.process_new_updates([make_update('/create_task')])
+    task_bot.bot.process_new_updates([make_update('Shopping buy milk')])
+    task_bot.bot.process_new_updates([make_update('/update_task')])
+    task_bot.bot.process_new_updates([make_update('Cleaning wash')])
+    task_bot.bot.process_new_updates([make_update('Shopping buy bread')])
+
+    assert telegram_api.sent_texts[-2:] == ['Task not found.',
+                                            'Task updated.']
+    assert Task.objects.get(title='Shopping').description == 'buy bread'
+
+
+def test_delete_task_after_confirmation(telegram_api, make_update,
+                                        django_assert_num_queries):
+    """
+    Test that the task chosen with /delete_task is deleted
+    once the user confirms it, without looking it up by title again,
+    and that the deletion is recorded for the synchronization.
+    """
+    task_bot.bot.process_new_updates([make_update('/create_task')])
+    task_bot.bot.process_new_updates([make_update('Old task')])
+    task_bot.bot.process_new_updates([make_update('/delete_task')])
+    task_bot.bot.process_new_updates([make_update('Old')])
+    task_bot.bot.process_new_updates([make_update('maybe')])
+
+    task_id = Task.objects.get().pk
+
+    # The task is fetched, deleted, and its deletion recorded.
+    with django_assert_num_queries(3):
+        task_bot.bot.process_new_updates([make_update('Yes')])
+
+    assert telegram_api.sent_texts[-3:] == [
+        'Are you sure you want to delete the task "Old"?'
+        ' Reply with Yes or No.',
+        'Invalid response. Please reply with Yes or No.',
+        'Task deleted.']
+    assert not Task.objects.exists()
+    assert DeletedTask.objects.get().task_id == task_id
+
+
+def test_text_without_pending_operation_is_ignored(telegram_api,
+                                                   make_update):
+    """
+    Test that the bot does not answer text it did not ask for.
+    """
+    task_bot.bot.process_new_updates([make_update('Hello')])
+
+    assert telegram_api.requests == []
+
+
+def test_list_tasks_query_count_is_constant(telegram_api, make_update,
+                                            django_user_model):
+    """
+    Test that /list_tasks runs as many queries for many tasks
+    as for a single task.
+    """
+    task_bot.bot.process_new_updates([make_update('/start')])
+    author = django_user_model.objects.get(username='1001')
+    Task.objects.create(title='Task', author=author)
+    with CaptureQueriesContext(connection) as queries_for_one_task:
+        task_bot.bot.process_new_updates([make_update('/list_tasks')])
+    Task.objects.bulk_create([Task(title=f'Task {number}', author=author)
+                              for number in range(20)])
+    # bulk_create() sends no signal invalidating the cached lists.
+    task_lists.invalidate(author.pk)
+
+    with CaptureQueriesContext(connection) as queries:
+        task_bot.bot.process_new_updates([make_update('/list_tasks')])
+
+    assert len(queries) == len(queries_for_one_task)
+
+
+def test_list_tasks_is_cached_until_tasks_change(telegram_api, make_update):
+    """
+    Test that the task list is rendered once
+    and again after a task is created.
+    """
+    task_bot.bot.process_new_updates([make_update('/start')])
+    task_bot.bot.process_new_updates([make_update('/list_tasks')])
+    with CaptureQueriesContext(connection) as queries:
+        task_bot.bot.process_new_updates([make_update('/list_tasks')])
+    task_bot.bot.process_new_updates([make_update('/create_task')])
+    task_bot.bot.process_new_updates([make_update('Shopping buy milk')])
+    task_bot.bot.process_new_updates([make_update('/list_tasks')])
+
+    assert len(queries) == 0
+    assert telegram_api.sent_texts[1:3] == ['No tasks.', 'No tasks.']
+    assert telegram_api.sent_texts[-1] == '[ ] Shopping'
+
+
+def test_export_tasks_sends_document(telegram_api, make_update):
+    """
+    Test that /export_tasks sends the tasks of the user as a CSV file,
+    or in the format given after the command.
+    """
+    task_bot.bot.process_new_updates([make_update('/create_task')])
+    task_bot.bot.process_new_updates([make_update('Shopping buy milk')])
+    task_bot.bot.process_new_updates([make_update('/export_tasks')])
+    task_bot.bot.process_new_updates([make_update('/export_tasks ndjson')])
+    task_bot.bot.process_new_updates([make_update('/export_tasks xml')])
+
+    (_, csv_name, csv_file), (_, ndjson_name, ndjson_file) = (
+        telegram_api.files)
+    assert csv_name == 'tasks.csv'
+    assert csv_file.decode().splitlines()[0] == (
+        'id,title,description,completed,due_at,created_at,updated_at')
+    assert 'Shopping,buy milk,False' in csv_file.decode()
+    assert ndjson_name == 'tasks.ndjson'
+    assert json.loads(ndjson_file)['title'] == 'Shopping'
+    assert telegram_api.sent_texts[-1].startswith('Choose one of the formats')
+
+
+def get_buttons(params):
+    """
+    Return the inline buttons of a sent message as a dictionary
+    of callback data by label.
+    """
+    if 'reply_markup' not in params:
+        return {}
+    return {button['text']: button['callback_data'] for button
+            in json.loads(params['reply_markup'])['inline_keyboard'][0]}
+
+
+@pytest.fixture
+def bot_author(django_user_model):
+    """
+    Pytest fixture creating the user of the bot chat.
+    """
+    return django_user_model.objects.create(username='1001')
+
+
+def create_tasks(author, titles):
+    Task.objects.bulk_create([Task(title=title, author=author)
+                              for title in titles])
+    task_lists.invalidate(author.pk)
+
+
+def test_list_tasks_pages(telegram_api, make_update, make_callback,
+                          bot_author):
+    """
+    Test that /list_tasks sends the first page of the tasks
+    and that the buttons replace it with the next and previous pages.
+    """
+    create_tasks(bot_author, [f'Task {number}' for number in range(65)])
+
+    task_bot.bot.process_new_updates([make_update('/list_tasks')])
+    _, first_page = telegram_api.requests[-1]
+    task_bot.bot.process_new_updates(
+        [make_callback(get_buttons(first_page)['Next »'])])
+    _, second_page = [request for request in telegram_api.requests
+                      if request[0] == 'editMessageText'][-1]
+    task_bot.bot.process_new_updates(
+        [make_callback(get_buttons(second_page)['Next »'])])
+    _, last_page = telegram_api.requests[-2]
+    task_bot.bot.process_new_updates(
+        [make_callback(get_buttons(last_page)['« Previous'])])
+    _, previous_page = telegram_api.requests[-2]
+
+    assert first_page['text'].splitlines()[0] == '[ ] Task 64'
+    assert len(first_page['text'].splitlines()) == task_bot.LIST_PAGE_SIZE
+    assert list(get_buttons(first_page)) == ['Next »']
+    assert second_page['text'].splitlines()[0] == '[ ] Task 34'
+    assert list(get_buttons(second_page)) == ['« Previous', 'Next »']
+    assert last_page['text'].splitlines() == [
+        f'[ ] Task {number}' for number in range(4, -1, -1)]
+    assert list(get_buttons(last_page)) == ['« Previous']
+    assert previous_page['text'] == second_page['text']
+    assert telegram_api.requests[-1][0] == 'answerCallbackQuery'
+
+
+def test_list_tasks_pages_fit_in_messages(telegram_api, make_update,
+                                          make_callback, bot_author):
+    """
+    Test that pages too long for a message are shortened,
+    and that the next pages start after the last task shown.
+    """
+    titles = [f'{number:03} ' + 'x' * 196 for number in range(40)]
+    create_tasks(bot_author, titles)
+
+    task_bot.bot.process_new_updates([make_update('/list_tasks')])
+    _, first_page = telegram_api.requests[-1]
+    task_bot.bot.process_new_updates(
+        [make_callback(get_buttons(first_page)['Next »'])])
+    _, second_page = telegram_api.requests[-2]
+    task_bot.bot.process_new_updates(
+        [make_callback(get_buttons(second_page)['« Previous'])])
+    _, previous_page = telegram_api.requests[-2]
+
+    first_lines = first_page['text'].splitlines()
+    assert len(first_page['text']) <= task_bot.MAX_MESSAGE_LENGTH
+    # Lines of 204 characters: 19 of them fit in 4096 characters.
+    assert len(first_lines) == 19
+    assert first_lines[-1][4:7] == '021'
+    assert second_page['text'].splitlines()[0][4:7] == '020'
+    assert len(second_page['text'].splitlines()) == 19
+    assert previous_page['text'] == first_page['text']
+
+
+def test_list_tasks_invalid_button(telegram_api, make_callback, bot_author):
+    """
+    Test that a button with invalid data is answered with an error.
+    """
+    task_bot.bot.process_new_updates([make_callback('tasks:x:1:1')])
+
+    method_name, params = telegram_api.requests[-1]
+    assert method_name == 'answerCallbackQuery'
+    assert params['text'] == 'Invalid page.'
+
+
+def test_due_task_sets_due_date(telegram_api, make_update):
+    """
+    Test that /due_task sets the due date of the task
+    in the local time of the project.
+    """
+    task_bot.bot.process_new_updates([make_update('/create_task')])
+    task_bot.bot.process_new_updates([make_update('Shopping buy milk')])
+    task_bot.bot.process_new_updates([make_update('/due_task')])
+    task_bot.bot.process_new_updates([make_update('Shopping tomorrow 9:30')])
+    task_bot.bot.process_new_updates(
+        [make_update('Shopping 2030-01-02 09:30')])
+
+    assert telegram_api.sent_texts[-2:] == [
+        'Invalid due date, enter it as YYYY-MM-DD HH:MM.', 'Due date set.']
+    due_at = timezone.localtime(Task.objects.get(title='Shopping').due_at)
+    assert due_at.strftime(task_bot.DUE_DATE_FORMAT) == '2030-01-02 09:30'
+
+
+def test_send_reminders_to_bot_users(telegram_api, bot_author, author):
+    """
+    Test that reminders are sent to the chats of the users of the bot
+    and skipped for the users of the website.
+    """
+    due_at = timezone.make_aware(datetime.datetime(2030, 1, 2, 9, 30))
+    rows = [{'id': 1, 'title': 'Shopping', 'due_at': due_at,
+             'author_id': bot_author.pk, 'author__username': '1001'},
+            {'id': 2, 'title': 'Cleaning', 'due_at': due_at,
+             'author_id': author.pk, 'author__username': 'author'}]
+
+    task_bot.send_reminders(rows)
+
+    assert [(params['chat_id'], params['text'])
+            for _, params in telegram_api.requests] == [
+        ('1001', 'Reminder: the task "Shopping" is due at 2030-01-02 09:30.')]
@@ -0,0 +1,128 @@
+"""
+This module contains tests for the outbox of the Telegram bot.
+"""
+
+import pytest
+from telebot.apihelper import ApiTelegramException
+
+from taskmaster import metrics
+from telegram_bot import outbox as outbox_module
+from telegram_bot.client import RateLimitedTeleBot
+from telegram_bot.outbox import Outbox
+from telegram_bot.ratelimit import SendRateLimiter
+
+
+def make_rate_limiter():
+    return SendRateLimiter(global_rate=10 ** 6, chat_rate=10 ** 6)
+
+
+def telegram_error(error_code, **parameters):
+    return ApiTelegramException('sendMessage', None, {
+        'ok': False, 'error_code': error_code, 'description': 'Error',
+        'parameters': parameters})
+
+
+class FakeSender:
+    """
+    Send method raising the queued errors, then succeeding.
+    """
+    __name__ = 'send_message'
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+
+
+@pytest.fixture
+def sleeps():
+    return []
+
+
+@pytest.fixture
+def outbox(sleeps):
+    """
+    Pytest fixture for an outbox recording its sleeps instead of sleeping.
+    """
+    return Outbox(make_rate_limiter(), num_workers=1, max_retries=2,
+                  sleep=sleeps.append)
+
+
+def test_too_many_requests_are_retried_after_delay(outbox, sleeps):
+    """
+    Test that a request refused with 429 is sent again
+    after the delay given by Telegram.
+    """
+    send = FakeSender(telegram_error(429, retry_after=3))
+
+    outbox.deliver(1, send, (), {}, outbox.clock())
+
+    assert send.calls == 2
+    assert sleeps[0] >= 3
+    assert (outbox.sent, outbox.retried, outbox.failed) == (1, 1, 0)
+
+
+def test_failed_requests_are_given_up(outbox, sleeps):
+    """
+    Test that server errors are retried with a growing backoff
+    up to the maximum number of retries.
+    """
+    send = FakeSender(*[telegram_error(502)] * 3)
+
+    outbox.deliver(1, send, (), {}, outbox.clock())
+
+    assert send.calls == 3
+    assert len(sleeps) == 2
+    assert (outbox.sent, outbox.retried, outbox.failed) == (0, 2, 1)
+
+
+def test_client_errors_are_not_retried(outbox):
+    """
+    Test that requests refused for another reason are not retried.
+    """
+    send = FakeSender(telegram_error(400))
+
+    with pytest.raises(ApiTelegramException):
+        outbox.deliver(1, send, (), {}, outbox.clock())
+
+    assert send.calls == 1
+
+
+def test_messages_are_sent_through_fake_server(telegram_server,
+                                               monkeypatch):
+    """
+    Test that queued messages are delivered in order per chat over
+    keep-alive connections, and that a 429 pauses the sending.
+    """
+    monkeypatch.setattr(outbox_module, 'BACKOFF_BASE', 0.01)
+    telegram_server.add_error('sendMessage', 429, {
+        'ok': False, 'error_code': 429, 'description': 'Too Many Requests',
+        'parameters': {'retry_after': 0}})
+    bot = RateLimitedTeleBot('1:TEST', rate_limiter=make_rate_limiter(),
+                             threaded=False)
+    bot.start_outbox(num_workers=2)
+
+    try:
+        for number in range(10):
+            for chat_id in (1, 2, 3):
+                assert bot.send_message(chat_id, f'{number}') is None
+        bot.outbox.join()
+        rendered = metrics.render()
+    finally:
+        bot.stop_outbox()
+
+    delivered = [(params['chat_id'], params['text']) for _, params, status
+                 in telegram_server.requests if status == 200]
+    for chat_id in ('1', '2', '3'):
+        assert [text for chat, text in delivered if chat == chat_id] == [
+            str(number) for number in range(10)]
+    assert len(telegram_server.requests) == 31
+    assert len(telegram_server.client_ports) <= 2
+    assert 'taskmaster_bot_sent_total 30' in rendered
+    assert 'taskmaster_bot_send_retries_total 1' in rendered
+    assert 'taskmaster_bot_send_queue_depth 0' in rendered
+    assert bot.outbox is None
@@ -0,0 +1,55 @@
+"""
+This module contains tests for resolving Telegram users.
+"""
+
+import pytest
+
+from telegram_bot.users import UserIdCache, resolve_user, user_ids
+
+pytestmark = pytest.mark.django_db
+
+
+def test_resolved_user_is_cached(django_assert_num_queries,
+                                 django_user_model):
+    """
+    Test that a user is looked up in the database only once.
+    """
+    user_id, created = resolve_user(42)
+
+    with django_assert_num_queries(0):
+        assert resolve_user(42) == (user_id, False)
+    assert created is True
+    assert django_user_model.objects.get(pk=user_id).username == '42'
+
+
+def test_deleted_user_is_forgotten(django_user_model):
+    """
+    Test that deleting a user removes it from the cache.
+    """
+    user_id, _ = resolve_user(42)
+
+    django_user_model.objects.get(pk=user_id).delete()
+
+    assert user_ids.get('42') is None
+    assert resolve_user(42)[1] is True
+
+
+def test_deleted_user_is_forgotten_by_other_processes(settings, tmp_path,
+                                                      django_user_model):
+    """
+    Test that with a shared cache, a user deleted by a process is
+    forgotten by the others, whose memory does not keep it.
+    """
+    settings.CACHES = {**settings.CACHES, 'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path),
+    }}
+    settings.BOT_STATE_CACHE = 'shared'
+    other_process = UserIdCache()
+    user_id, _ = resolve_user(42)
+    assert other_process.get('42') == user_id
+
+    django_user_model.objects.get(pk=user_id).delete()
+
+    assert other_process.get('42') is None
+    assert resolve_user(42)[1] is True
@@ -0,0 +1,126 @@
+"""
+This module contains tests for the webhook of the Telegram bot.
+"""
+
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+
+from telegram_bot import views
+
+UPDATE = {
+    'update_id': 1,
+    'message': {
+        'message_id': 1,
+        'date': 0,
+        'chat': {'id': 1001, 'type': 'private'},
+        'from': {'id': 1001, 'is_bot': False, 'first_name': 'User'},
+        'text': '/start',
+    },
+}
+
+
+class FakeDispatcher:
+    def __init__(self, accept=True):
+        self.accept = accept
+        self.updates = []
+
+    def try_dispatch(self, update):
+        if self.accept:
+            self.updates.append(update)
+        return self.accept
+
+
+SECRET = 'secret'
+
+
+@pytest.fixture
+def dispatcher(monkeypatch, settings):
+    """
+    Pytest fixture replacing the webhook dispatcher with a fake one,
+    and setting the secret token of the webhook.
+    """
+    settings.BOT_WEBHOOK_SECRET = SECRET
+    fake_dispatcher = FakeDispatcher()
+    monkeypatch.setattr(views, 'get_dispatcher', lambda: fake_dispatcher)
+    return fake_dispatcher
+
+
+def post_update(client, data, **headers):
+    headers.setdefault(views.SECRET_TOKEN_HEADER, SECRET)
+    return client.post(reverse('telegram_bot:webhook'), data,
+                       content_type='application/json', headers=headers)
+
+
+def test_webhook_queues_update(client, dispatcher):
+    """
+    Test that an update posted to the webhook is queued for the handlers.
+    """
+    response = post_update(client, json.dumps(UPDATE))
+
+    assert response.status_code == HTTPStatus.OK
+    assert [update.message.text for update in dispatcher.updates] == [
+        '/start']
+
+
+@pytest.mark.parametrize('data', ['not json', '[]', '{}'])
+def test_webhook_rejects_invalid_update(client, dispatcher, data):
+    """
+    Test that malformed updates are rejected.
+    """
+    response = post_update(client, data)
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert dispatcher.updates == []
+
+
+@pytest.mark.parametrize('secret, secret_header, expected_status',
+                         [(SECRET, '', HTTPStatus.FORBIDDEN),
+                          (SECRET, 'wrong', HTTPStatus.FORBIDDEN),
+                          (SECRET, SECRET, HTTPStatus.OK),
+                          ('', '', HTTPStatus.FORBIDDEN)])
+def test_webhook_checks_secret_token(client, dispatcher, settings, secret,
+                                     secret_header, expected_status):
+    """
+    Test that the webhook only accepts requests with the secret token,
+    and none without a secret.
+    """
+    settings.BOT_WEBHOOK_SECRET = secret
+
+    response = post_update(client, json.dumps(UPDATE),
+                           **{views.SECRET_TOKEN_HEADER: secret_header})
+
+    assert response.status_code == expected_status
+    assert len(dispatcher.updates) == (expected_status == HTTPStatus.OK)
+
+
+def test_webhook_reports_full_queue(client, dispatcher):
+    """
+    Test that the webhook asks Telegram to retry when the queue is full.
+    """
+    dispatcher.accept = False
+
+    response = post_update(client, json.dumps(UPDATE))
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+
+@pytest.mark.parametrize('caches, alias', [
+    ({}, ''),
+    ({'states': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+     'states'),
+])
+def test_webhook_requires_shared_state_cache(settings, caches, alias):
+    """
+    Test that the webhook refuses to start the bot with conversation
+    states kept in the memory of each process.
+    """
+    settings.CACHES = {**settings.CACHES, **caches}
+    settings.BOT_STATE_CACHE = alias
+
+    with pytest.raises(ImproperlyConfigured):
+        views.get_dispatcher()
@@ -0,0 +1,13 @@
+"""
+This module defines the URL routes for the 'telegram_bot' application.
+"""
+
+from django.urls import path
+
+from telegram_bot.views import webhook
+
+app_name = 'telegram_bot'
+
+urlpatterns = [
+    path('webhook/', webhook, name='webhook'),
+]
@@ -0,0 +1,102 @@
+"""
+This module resolves Telegram users to the users of the Task Manager.
+A Telegram user is stored as a User whose username is the Telegram id.
+The primary keys of resolved users are cached, so handlers can filter
+tasks by `author_id` without querying auth_user.
+"""
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+
+from taskmaster.lru import LRUCache
+
+USER_CACHE_SIZE = 100000
+USER_CACHE_TTL = 600
+
+
+class UserIdCache:
+    """
+    Cache of the primary keys of the users by username.
+    They are kept in the cache named by the BOT_STATE_CACHE setting
+    if it is set, which is shared by the processes, so a user deleted
+    by a process is forgotten by the others. Otherwise they are kept
+    in the process memory, and the users deleted by other processes
+    are forgotten after USER_CACHE_TTL seconds.
+    """
+    def __init__(self, maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL):
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+
+    @property
+    def shared(self):
+        alias = settings.BOT_STATE_CACHE
+        return caches[alias] if alias else None
+
+    @staticmethod
+    def make_key(username):
+        return f'bot_user:{username}'
+
+    def get(self, username):
+        if self.shared is not None:
+            return self.shared.get(self.make_key(username))
+        return self.local.get(username)
+
+    def set(self, username, user_id):
+        if self.shared is not None:
+            self.shared.set(self.make_key(username), user_id, self.ttl)
+        else:
+            self.local.set(username, user_id)
+
+    def delete(self, username):
+        self.local.delete(username)
+        if self.shared is not None:
+            self.shared.delete(self.make_key(username))
+
+    def clear(self):
+        """
+        Empty the cache of the process, the shared cache
+        also keeps the conversation states.
+        """
+        self.local.clear()
+
+
+user_ids = UserIdCache()
+
+
+def resolve_user(telegram_id):
+    """
+    Return the primary key of the user with the given Telegram id
+    and whether the user has just been created.
+    """
+    username = str(telegram_id)
+    user_id = user_ids.get(username)
+    if user_id is not None:
+        return user_id, False
+    user, created = User.objects.get_or_create(username=username)
+    user_ids.set(username, user.pk)
+    return user.pk, created
+
+
+def get_user_id(telegram_id):
+    """
+    Return the primary key of the user with the given Telegram id,
+    creating the user on first sight.
+    """
+    return resolve_user(telegram_id)[0]
+
+
+def get_telegram_id(username):
+    """
+    Return the Telegram id of the user with the username,
+    or None if the user does not use the bot.
+    """
+    return int(username) if username.isdigit() else None
+
+
+def forget_user(sender, instance, **kwargs):
+    """
+    Remove a deleted user from the cache, and from the shared cache
+    so the other processes forget it too.
+    """
+    user_ids.delete(instance.username)
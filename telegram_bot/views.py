@@ -0,0 +1,78 @@
+"""
+This module contains the webhook view of the 'telegram_bot' application.
+Telegram posts every update to the webhook, the view puts it into
+the dispatcher queue and responds immediately, while the bot handlers
+run in the dispatcher worker threads.
+"""
+
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.http import (HttpResponse, HttpResponseBadRequest,
+                         HttpResponseForbidden)
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from telebot import types
+
+from telegram_bot.dispatcher import UpdateDispatcher
+from telegram_bot.states import check_shared_state_storage
+
+logger = logging.getLogger(__name__)
+
+SECRET_TOKEN_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    """
+    Return the dispatcher of this process, starting it on first use.
+    """
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            check_shared_state_storage()
+            # Importing the bot module registers the handlers.
+            from bot import bot
+            bot.start_outbox(num_workers=settings.BOT_SEND_WORKERS,
+                             queue_size=settings.BOT_SEND_QUEUE_SIZE,
+                             max_retries=settings.BOT_SEND_MAX_RETRIES)
+            _dispatcher = UpdateDispatcher(
+                bot, num_workers=settings.BOT_WORKERS,
+                queue_size=settings.BOT_QUEUE_SIZE)
+            _dispatcher.start()
+        return _dispatcher
+
+
+@csrf_exempt
+@require_POST
+async def webhook(request):
+    """
+    Accept an update from Telegram and queue it for the bot handlers.
+    Updates without the secret token are refused, and all of them
+    when no secret is set, since anyone could post updates on behalf
+    of any Telegram user. Respond with 503 when the queue is full,
+    so Telegram delivers the update again later.
+    """
+    secret = settings.BOT_WEBHOOK_SECRET
+    if not secret:
+        logger.error('BOT_WEBHOOK_SECRET is not set, update refused')
+        return HttpResponseForbidden()
+    if not constant_time_compare(
+            request.headers.get(SECRET_TOKEN_HEADER, ''), secret):
+        return HttpResponseForbidden()
+    try:
+        update = types.Update.de_json(json.loads(request.body))
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return HttpResponseBadRequest()
+    if update is None:
+        return HttpResponseBadRequest()
+    if not get_dispatcher().try_dispatch(update):
+        logger.warning('Update queue is full, update %s rejected',
+                       update.update_id)
+        return HttpResponse(status=503)
+    return HttpResponse()